@@ -0,0 +1,135 @@
+"""
+Time to first token with the stable prompt prefix sent inline vs. cached.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_context_cache [--calls 200] [--prefix-tokens 3000]
+
+Builds real /chat prompts with RAGService and sends them to an in-process
+stub provider (llm_stub_server) whose time to first token grows with every
+prompt token it has to prefill (``--prefill-us-per-token``). Cached tokens
+cost ``--cached-prefill-ratio`` of that. The stub needs a prefix of at
+least 1024 tokens to cache, like the real providers, and today's prefix
+is shorter. So it is padded with example exchanges up to ``--prefix-tokens``,
+standing in for a longer system prompt. No network or API key is needed.
+
+Scenarios:
+  inline          the whole prompt as one user message (no caching possible)
+  gemini cache    prefix as a cachedContents handle managed by ContextCache
+  openai prefix   prefix as the system message; the stub caches repeats itself
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from backend.benchmarks.llm_stub_server import Faults, StreamingASGITransport, create_app
+from backend.services.context_cache import ContextCache
+from backend.services.llm_client import GeminiClient, OpenAIClient
+from backend.services.prompt_budget import count_tokens
+from backend.services.rag_service import Prompt, RAGService
+
+_CATEGORIES = ("Stable", "Mild Stress", "Moderate Distress", "High Risk", "Depression Risk")
+_MESSAGES = (
+    "I can't sleep before my exams and my mind keeps racing.",
+    "Work has been overwhelming and I snapped at my partner today.",
+    "I feel kind of flat lately, nothing seems worth doing.",
+    "Had a decent day actually, just wanted to check in.",
+)
+_CHUNK = {"text": "Box breathing: breathe in for four counts, hold for four, out for four, hold for four. Repeat."}
+_EXAMPLE = (
+    'Example exchange. User: "I keep replaying that meeting in my head." '
+    'Assistant: "Replaying it like that can be exhausting. What part keeps coming back to you?"\n'
+)
+
+
+def _prompts(prefix_tokens: int) -> list[Prompt]:
+    rag = RAGService(embedder=object(), preload=False)
+    prompts = []
+    for i, category in enumerate(_CATEGORIES):
+        prompt = rag._build_prompt(
+            _MESSAGES[i % len(_MESSAGES)], "sadness", 0.7, "venting", 55, 0.1, "none",
+            category, "en", [_CHUNK], [{"user": "Hi", "assistant": "Hi, how are you today?"}],
+        )
+        prefix = prompt.prefix
+        while count_tokens(prefix) < prefix_tokens:
+            prefix += "\n" + _EXAMPLE
+        prompts.append(Prompt(prefix, prompt.suffix))
+    return prompts
+
+
+async def _scenario(args, label: str, prompts: list[Prompt], mode: str) -> None:
+    faults = Faults(
+        latency_ms=args.latency_ms, jitter_ms=20.0, token_ms=2.0,
+        prefill_us_per_token=args.prefill_us_per_token, cached_prefill_ratio=args.cached_prefill_ratio,
+    )
+    app = create_app(faults, seed=3)
+    transport = StreamingASGITransport(app)
+    if mode == "openai":
+        client = OpenAIClient("", "stub", base_url="http://stub/v1", transport=transport)
+    else:
+        client = GeminiClient("stub", "stub", base_url="http://stub/v1beta", transport=transport)
+        if mode == "gemini":
+            client.cache = ContextCache(client.create_cache, client.extend_cache, client.delete_cache, ttl_s=600)
+
+    gate = asyncio.Semaphore(args.concurrency)
+    ttft: list[float] = []
+
+    async def call(i: int) -> None:
+        prompt = prompts[i % len(prompts)]
+        async with gate:
+            started = time.perf_counter()
+            if mode == "inline":
+                stream = client.stream(prompt.text, max_tokens=40)
+            else:
+                stream = client.stream(prompt.suffix, max_tokens=40, system=prompt.prefix)
+            async for _ in stream:
+                ttft.append(time.perf_counter() - started)
+                break
+            await stream.aclose()
+
+    await asyncio.gather(*(call(i) for i in range(args.calls)))
+    cache_stats = client.cache.stats() if mode == "gemini" else None
+    if mode == "gemini":
+        await client.cache.aclose()
+    await client.aclose()
+
+    counts = app.state.counts
+    ordered = sorted(ttft)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    uncached = counts["prompt_tokens"] - counts["cached_tokens"]
+    print(
+        f"  {label:<16} ttft p50 {statistics.median(ordered) * 1000:>6.0f}   p95 {p95 * 1000:>6.0f} ms"
+        f"   uncached input {uncached / max(1, counts['prompt_tokens']):>4.0%}"
+        f" ({uncached:,} of {counts['prompt_tokens']:,} tokens)"
+    )
+    if cache_stats:
+        print("      handles: " + ", ".join(f"{k} {cache_stats[k]}" for k in ("created", "hit", "miss", "failed")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--prefix-tokens", type=int, default=3000, help="pad the stable prefix to this size")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="stub time to first token before prefill")
+    parser.add_argument("--prefill-us-per-token", type=float, default=250.0)
+    parser.add_argument("--cached-prefill-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+    logging.getLogger("backend").setLevel(logging.ERROR)
+
+    real = _prompts(0)
+    prompts = _prompts(args.prefix_tokens)
+    print(
+        f"prefix today: {min(map(count_tokens, (p.prefix for p in real)))}-"
+        f"{max(map(count_tokens, (p.prefix for p in real)))} tokens | benchmarked: "
+        f"{count_tokens(prompts[0].prefix)} prefix + ~{count_tokens(prompts[0].suffix)} suffix tokens, "
+        f"{len(prompts)} distinct prefixes\n"
+    )
+    asyncio.run(_scenario(args, "inline", prompts, "inline"))
+    asyncio.run(_scenario(args, "gemini cache", prompts, "gemini"))
+    asyncio.run(_scenario(args, "openai prefix", prompts, "openai"))
+
+
+if __name__ == "__main__":
+    main()
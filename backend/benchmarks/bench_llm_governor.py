@@ -0,0 +1,89 @@
+"""
+A /chat traffic spike against a rate-limited LLM, with and without the governor.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_llm_governor [--light-users 40] [--provider-rpm 30]
+
+Uses the local fake provider (LLM_PROVIDERS=fake); no network or API key.
+One heavy user fires ``--heavy`` messages, then every light user sends one,
+all at the same moment. The fake provider answers 429 to calls beyond
+``--provider-rpm`` per minute, like a real quota.
+
+Ungoverned, every call goes straight to the provider: the first burst
+succeeds in arrival order (mostly the heavy user), and everything after it
+fails with a 429. Governed, the RPM bucket sits just under the quota, users
+are served round-robin, and calls that can't be admitted within
+LLM_QUEUE_DEADLINE_MS get the fallback at once.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from backend.services import llm_service
+from backend.services.llm_client import FakeLLMClient
+from backend.services.llm_governor import LLMGovernor, LLMRejected
+
+PROMPT = "x" * 4000   # ~1k prompt tokens
+
+
+async def _call(user: str) -> tuple[str, str, float]:
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        async for _ in llm_service.astream_llm_response(PROMPT, category="Mild Stress", user=user):
+            pass
+    except LLMRejected as exc:
+        outcome = f"fallback ({exc.reason})"
+    except Exception as exc:
+        outcome = f"provider error ({getattr(exc, 'status', type(exc).__name__)})"
+    return user, outcome, time.perf_counter() - started
+
+
+async def _spike(args, governor: LLMGovernor) -> None:
+    llm_service._client = FakeLLMClient(latency_s=args.latency_ms / 1000, token_s=0.005, rpm=args.provider_rpm)
+    llm_service.governor = governor
+    users = ["heavy"] * args.heavy + [f"light-{i}" for i in range(args.light_users)]
+    results = await asyncio.gather(*(_call(u) for u in users))
+
+    by_outcome: dict[str, list[float]] = {}
+    for _, outcome, seconds in results:
+        by_outcome.setdefault(outcome, []).append(seconds)
+    for outcome, times in sorted(by_outcome.items()):
+        p95 = sorted(times)[int(len(times) * 0.95) - 1] if len(times) > 1 else times[0]
+        print(
+            f"  {outcome:<26} {len(times):>4}   p50 {statistics.median(times) * 1000:>6.0f} ms"
+            f"   p95 {p95 * 1000:>6.0f} ms"
+        )
+    served_light = sum(1 for u, o, _ in results if o == "ok" and u != "heavy")
+    served_heavy = sum(1 for u, o, _ in results if o == "ok" and u == "heavy")
+    print(f"  answered by the LLM: heavy user {served_heavy}/{args.heavy}, "
+          f"light users {served_light}/{args.light_users}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--heavy", type=int, default=30, help="messages from the one heavy user")
+    parser.add_argument("--light-users", type=int, default=40, help="users sending one message each")
+    parser.add_argument("--provider-rpm", type=int, default=30, help="fake provider quota (calls/min)")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fake provider time to first token")
+    parser.add_argument("--concurrency", type=int, default=8, help="governor LLM_MAX_CONCURRENCY")
+    parser.add_argument("--deadline-ms", type=float, default=3000.0, help="governor LLM_QUEUE_DEADLINE_MS")
+    args = parser.parse_args()
+
+    total = args.heavy + args.light_users
+    print(f"{total} simultaneous calls | provider quota {args.provider_rpm}/min\n")
+
+    print("ungoverned (concurrency unbounded, no rate limit):")
+    asyncio.run(_spike(args, LLMGovernor(max_concurrency=total, queue_deadline_s=3600, max_queue=total)))
+
+    rpm = max(1, int(args.provider_rpm * 0.9))
+    print(f"\ngoverned (concurrency {args.concurrency}, {rpm} rpm, deadline {args.deadline_ms:.0f} ms):")
+    asyncio.run(_spike(args, LLMGovernor(
+        max_concurrency=args.concurrency, rpm=rpm,
+        queue_deadline_s=args.deadline_ms / 1000, max_queue=total,
+    )))
+
+
+if __name__ == "__main__":
+    main()
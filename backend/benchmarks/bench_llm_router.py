@@ -0,0 +1,94 @@
+"""
+Time to first token across LLM providers: one provider, failover, hedging.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_llm_router [--calls 200] [--hedge-ms 500]
+
+Two in-process stub providers (llm_stub_server), no network or API key:
+``gemini`` is usually fast but stalls on ``--tail-rate`` of calls and fails
+``--error-rate`` of them; ``local`` (an OpenAI-compatible endpoint) is
+slower but steady. Each scenario builds a fresh LLMRouter and streams
+``--calls`` replies, ``--concurrency`` at a time. The last scenario takes
+gemini down completely to show its circuit breaker opening.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from backend.benchmarks.llm_stub_server import Faults, StreamingASGITransport, create_app
+from backend.services.llm_client import GeminiClient, OpenAIClient
+from backend.services.llm_router import CircuitBreaker, LLMRouter, Provider
+
+
+def _providers(args, names: list[str], *, gemini_down: bool = False) -> list[Provider]:
+    gemini = Faults(
+        latency_ms=args.fast_ms, tail_rate=args.tail_rate, tail_ms=args.tail_ms,
+        error_rate=1.0 if gemini_down else args.error_rate,
+    )
+    local = Faults(latency_ms=args.steady_ms, jitter_ms=20.0)
+    clients = {
+        "gemini": lambda: GeminiClient("stub", "gemini-stub", transport=StreamingASGITransport(create_app(gemini, seed=1))),
+        "local":  lambda: OpenAIClient("", "local-stub", transport=StreamingASGITransport(create_app(local, seed=2))),
+    }
+    return [Provider(name, clients[name](), breaker=CircuitBreaker(5, 60.0)) for name in names]
+
+
+async def _scenario(args, label: str, names: list[str], hedge_ms: float = 0.0, gemini_down: bool = False):
+    router = LLMRouter(_providers(args, names, gemini_down=gemini_down), hedge_after_s=hedge_ms / 1000)
+    gate = asyncio.Semaphore(args.concurrency)
+    ttft: list[float] = []
+    failed = 0
+
+    async def call() -> None:
+        nonlocal failed
+        async with gate:
+            started = time.perf_counter()
+            stream = router.stream("How do I calm down before an exam?", max_tokens=40)
+            try:
+                await stream.__anext__()
+                ttft.append(time.perf_counter() - started)
+            except Exception:
+                failed += 1
+            finally:
+                await stream.aclose()
+
+    await asyncio.gather(*(call() for _ in range(args.calls)))
+    await router.aclose()
+
+    ordered = sorted(ttft) or [0.0]
+    p = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    print(
+        f"  {label:<30} answered {len(ttft):>4}/{args.calls}   ttft p50 {statistics.median(ordered) * 1000:>6.0f}"
+        f"   p95 {p(0.95):>6.0f}   p99 {p(0.99):>6.0f} ms"
+    )
+    for provider in router.stats()["providers"]:
+        print(f"      {provider['name']:<8} breaker {provider['breaker']:<9} p95 {provider['p95_ttft_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--fast-ms", type=float, default=250.0, help="gemini stub usual time to first token")
+    parser.add_argument("--tail-rate", type=float, default=0.1, help="share of gemini calls that stall")
+    parser.add_argument("--tail-ms", type=float, default=3000.0, help="gemini stall length")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of gemini calls answered 503")
+    parser.add_argument("--steady-ms", type=float, default=600.0, help="local stub time to first token")
+    parser.add_argument("--hedge-ms", type=float, default=350.0, help="LLM_HEDGE_AFTER_MS for the hedged run")
+    args = parser.parse_args()
+    logging.getLogger("backend").setLevel(logging.ERROR)   # one failover warning per injected fault
+
+    print(
+        f"gemini stub: {args.fast_ms:.0f} ms, {args.tail_rate:.0%} stall {args.tail_ms:.0f} ms, "
+        f"{args.error_rate:.0%} errors | local stub: {args.steady_ms:.0f} ms\n"
+    )
+    asyncio.run(_scenario(args, "gemini only", ["gemini"]))
+    asyncio.run(_scenario(args, "gemini -> local (failover)", ["gemini", "local"]))
+    asyncio.run(_scenario(args, f"hedged after {args.hedge_ms:.0f} ms", ["gemini", "local"], args.hedge_ms))
+    asyncio.run(_scenario(args, "gemini down, failover", ["gemini", "local"], gemini_down=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Microbenchmark: unified signal engine vs the previous per-service regex scanning.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_signal_engine
+
+"legacy" reproduces what one /chat turn used to do: CrisisService scanned
+its tiers twice (predict + classify_tier), EmotionService ran its keyword /
+intensifier / negation / hopeless batteries, MentalHealthMatrix ran the
+hopeless findall, and BehavioralService ran uncompiled re.search strings.
+"engine" is one SignalEngine.scan_uncached() per message.
+
+The second table scans adversarially long inputs to show linear scaling.
+"""
+import re
+import time
+
+from backend.services.signal_engine import (
+    BEHAVIORAL,
+    CRISIS_ACTIVE,
+    CRISIS_DISTRESS,
+    CRISIS_PASSIVE,
+    EMOTION_HOPELESS,
+    EMOTION_INTENSIFIER,
+    EMOTION_KEYWORD,
+    EMOTION_NEGATION,
+    MATRIX_HOPELESS,
+    signal_engine,
+)
+
+MESSAGES = [
+    "hi",
+    "I feel stressed about my exams and I can't sleep",
+    "I'm so anxious, what if I fail everything?",
+    "Honestly I've been crying all day and I feel empty and numb",
+    "nobody cares and I feel like giving up, what's the point",
+    "I want to kill myself",
+    "work is fine, just tired after a long week of meetings and deadlines",
+    "I've stopped going out, I don't want to see anyone, I just stay home and drink",
+]
+
+
+def _legacy_tables():
+    def group(name):
+        return [(re.compile(r.source, re.I), r) for r in signal_engine.rules if r.group == name]
+
+    return {
+        "crisis":   [group(CRISIS_ACTIVE), group(CRISIS_PASSIVE), group(CRISIS_DISTRESS)],
+        "keywords": group(EMOTION_KEYWORD),
+        "intens":   group(EMOTION_INTENSIFIER)[0][0],
+        "neg":      group(EMOTION_NEGATION)[0][0],
+        "hopeless": group(EMOTION_HOPELESS)[0][0],
+        "matrix":   group(MATRIX_HOPELESS)[0][0],
+        "behav":    [(r.source, r.weight) for r in signal_engine.rules if r.group == BEHAVIORAL],
+    }
+
+
+def legacy_scan(text: str, t: dict) -> None:
+    for _ in range(2):                          # predict() + classify_tier()
+        lowered = text.lower()
+        for tier in t["crisis"]:
+            if any(p.search(lowered) for p, _ in tier):
+                break
+    lowered = text.strip().lower()              # EmotionService
+    for p, _ in t["keywords"]:
+        len(p.findall(lowered))
+    t["intens"].search(lowered)
+    t["neg"].search(lowered)
+    t["hopeless"].search(text)
+    len(t["matrix"].findall(text))              # MentalHealthMatrix
+    lowered = text.lower()                      # BehavioralService
+    for source, _ in t["behav"]:
+        re.search(source, lowered)
+
+
+def _bench(fn, texts, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1e6
+
+
+def main():
+    tables = _legacy_tables()
+    rounds = 2000
+
+    legacy_us = _bench(lambda x: legacy_scan(x, tables), MESSAGES, rounds)
+    engine_us = _bench(signal_engine.scan_uncached, MESSAGES, rounds)
+    memo_us   = _bench(signal_engine.scan, MESSAGES, rounds)
+
+    print(f"{'per-message scan':<28} {'µs':>10}")
+    print(f"{'legacy (per service)':<28} {legacy_us:>10.1f}")
+    print(f"{'engine (uncached)':<28} {engine_us:>10.1f}")
+    print(f"{'engine (memo hit)':<28} {memo_us:>10.1f}")
+
+    print(f"\n{'adversarial length':<20} {'ms':>10} {'µs/KB':>10}")
+    for size in (1_000, 10_000, 100_000, 1_000_000):
+        # Near-miss prefixes + long whitespace runs: worst case for \s+ rules
+        unit = "want   to   kill   my   so   no   reason   to   "
+        text = (unit * (size // len(unit) + 1))[:size]
+        started = time.perf_counter()
+        signal_engine.scan_uncached(text)
+        elapsed = time.perf_counter() - started
+        print(f"{size:<20} {elapsed * 1000:>10.1f} {elapsed * 1e6 / (size / 1000):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
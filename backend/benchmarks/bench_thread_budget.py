@@ -0,0 +1,128 @@
+"""
+Throughput of concurrent classifier forward passes at different thread budgets.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_thread_budget [--seconds 3]
+
+Each row runs ``concurrency`` worker threads, the way the inference executor
+does, each calling the workload in a loop with torch intra-op threads set
+to ``threads``. The workload is the emotion classifier when its checkpoint
+loads. Otherwise it is a stand-in DistilBERT-sized encoder layer, or a
+numpy matmul when torch is not installed. concurrency * threads above the
+core count is oversubscription. Compare those rows with the budget
+ThreadBudget.from_settings() picks, which is marked with *.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from backend.config import settings
+from backend.services.thread_budget import ThreadBudget, available_cpus
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+TEXTS = [
+    "I feel stressed about my exams and I can't sleep",
+    "I'm so anxious, what if I fail everything?",
+    "Honestly I've been crying all day and I feel empty and numb",
+    "work is fine, just tired after a long week of meetings and deadlines",
+] * 4   # one 16-message micro-batch
+
+
+def _workload():
+    """(name, fn) for one micro-batch forward pass."""
+    if torch is not None:
+        try:
+            from backend.services.inference_backend import load_classifier
+
+            classifier = load_classifier(settings.EMOTION_MODEL_PATH)
+            return f"emotion classifier ({classifier.backend})", lambda: classifier.predict_proba(TEXTS)
+        except Exception as exc:
+            print(f"emotion classifier unavailable ({exc}); using a stand-in encoder layer")
+
+        layer = torch.nn.TransformerEncoderLayer(d_model=768, nhead=12, dim_feedforward=3072, batch_first=True)
+        layer.eval()
+        batch = torch.randn(len(TEXTS), 48, 768)
+
+        def forward():
+            with torch.inference_mode():
+                layer(batch)
+        return "encoder layer (768d, 16x48 tokens)", forward
+
+    a = np.random.rand(len(TEXTS) * 48, 768).astype(np.float32)
+    b = np.random.rand(768, 3072).astype(np.float32)
+    return "numpy matmul (no torch)", lambda: a @ b
+
+
+def _set_threads(threads: int):
+    if torch is not None:
+        torch.set_num_threads(threads)
+        return None
+    if threadpool_limits is not None:
+        return threadpool_limits(limits=threads, user_api="blas")
+    return None
+
+
+def _run(fn, concurrency: int, seconds: float) -> tuple[float, float]:
+    """(batches/s, p50 ms) with *concurrency* threads calling fn for *seconds*."""
+    latencies: list[float] = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def worker():
+        local = []
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            fn()
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000 if latencies else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of each row")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    planned = ThreadBudget.from_settings()
+    name, fn = _workload()
+    fn()   # warm-up: lazy init, allocator
+
+    print(f"workload: {name} | cores: {cpus} | INFERENCE_WORKERS: {settings.INFERENCE_WORKERS}")
+    print(f"\n{'concurrency':>11} {'threads':>8} {'oversub':>8} {'batches/s':>10} {'msgs/s':>8} {'p50 ms':>8}")
+    for concurrency in sorted({1, settings.INFERENCE_WORKERS}):
+        for threads in sorted({1, 2, max(1, cpus // concurrency), cpus}):
+            limits = _set_threads(threads)
+            rate, p50 = _run(fn, concurrency, args.seconds)
+            if limits is not None:
+                limits.restore_original_limits()
+            marker = "*" if (concurrency, threads) == (settings.INFERENCE_WORKERS, planned.torch_intra) else " "
+            print(
+                f"{concurrency:>11} {threads:>7}{marker} {concurrency * threads / cpus:>7.1f}x "
+                f"{rate:>10.1f} {rate * len(TEXTS):>8.0f} {p50:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
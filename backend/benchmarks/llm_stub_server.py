@@ -0,0 +1,305 @@
+"""
+Local stand-in LLM providers with injectable latency and errors.
+
+    python -m backend.benchmarks.llm_stub_server --port 8301 --latency-ms 800 --error-rate 0.2
+
+Serves both wire formats the router speaks, streaming a canned reply:
+
+POST /v1beta/models/{model}:streamGenerateContent?alt=sse   Gemini (GEMINI_BASE_URL)
+POST /v1/chat/completions                                   OpenAI-compatible
+                                                            (OPENAI_BASE_URL, LLM_LOCAL_BASE_URL)
+POST/PATCH/DELETE /v1beta/cachedContents[/{id}]             Gemini explicit context caches
+PUT  /stub/faults   {"error_rate": 1.0, ...}   change the injected faults live
+GET  /stub/faults   current faults and call counts
+
+Point a provider at it, e.g. ``LLM_PROVIDERS=gemini,local`` with
+``GEMINI_BASE_URL=http://127.0.0.1:8301/v1beta`` and a second stub as
+``LLM_LOCAL_BASE_URL=http://127.0.0.1:8302/v1``, then take a provider down
+with ``curl -X PUT localhost:8301/stub/faults -d '{"error_rate": 1}'``.
+
+With ``--prefill-us-per-token`` set, time to first token grows with the
+prompt tokens not served from cache. A Gemini ``cachedContent`` handle, or
+an OpenAI system message repeated within ``--cache-ttl-s`` (automatic
+prefix caching), costs ``--cached-prefill-ratio`` of that. Both need
+``--cache-min-tokens``, like the real providers. Usage is reported in the
+stream (``usageMetadata`` / ``usage``), so llm_input_tokens_total works.
+
+In-process, ``StreamingASGITransport(create_app(...))`` serves a stub to a
+GeminiClient / OpenAIClient without sockets (bench_llm_router uses this).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.services.prompt_budget import count_tokens
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on local env
+    httpx = None
+
+_REPLY = (
+    "That sounds like a lot to carry right now. It makes sense that you feel stretched thin. "
+    "One small thing that might help is pausing for a slow breath before the next task. "
+    "What feels most pressing to you at the moment?"
+)
+
+
+@dataclass
+class Faults:
+    latency_ms:           float = 200.0    # time to first token
+    jitter_ms:            float = 50.0     # uniform +/- on latency_ms
+    tail_rate:            float = 0.0      # share of calls that stall for tail_ms instead
+    tail_ms:              float = 3000.0
+    error_rate:           float = 0.0      # share of calls answered with error_status
+    error_status:         int = 503
+    token_ms:             float = 10.0     # gap between streamed words
+    prefill_us_per_token: float = 0.0      # added to time to first token per uncached prompt token
+    cached_prefill_ratio: float = 0.1      # cost of a cached token relative to an uncached one
+    cache_min_tokens:     int = 1024       # shorter prefixes are never cached
+    cache_ttl_s:          float = 600.0    # automatic (OpenAI-style) prefix cache lifetime
+
+
+def create_app(faults: Faults | None = None, *, seed: int | None = None) -> FastAPI:
+    faults = faults or Faults()
+    rng = random.Random(seed)
+    counts = {"calls": 0, "errors": 0, "tails": 0, "prompt_tokens": 0, "cached_tokens": 0}
+    caches: dict[str, tuple[int, float]] = {}   # cachedContents id -> (tokens, expires)
+    prefixes: dict[str, float] = {}             # automatic cache: prefix hash -> expires
+    app = FastAPI(title="LLM stub provider")
+
+    def first_token_delay(uncached: int, cached: int) -> float:
+        if rng.random() < faults.tail_rate:
+            counts["tails"] += 1
+            return faults.tail_ms / 1000
+        jitter = rng.uniform(-faults.jitter_ms, faults.jitter_ms)
+        prefill = faults.prefill_us_per_token * (uncached + cached * faults.cached_prefill_ratio) / 1000
+        return max(0.0, faults.latency_ms + jitter + prefill) / 1000
+
+    def reply(max_tokens: int, prompt_tokens: int, cached_tokens: int, encode, usage) -> StreamingResponse | JSONResponse:
+        counts["calls"] += 1
+        if rng.random() < faults.error_rate:
+            counts["errors"] += 1
+            return JSONResponse({"error": {"message": "injected fault"}}, status_code=faults.error_status)
+        counts["prompt_tokens"] += prompt_tokens
+        counts["cached_tokens"] += cached_tokens
+        delay = first_token_delay(prompt_tokens - cached_tokens, cached_tokens)
+
+        async def events():
+            await asyncio.sleep(delay)
+            for i, word in enumerate(_REPLY.split()[:max_tokens]):
+                if i:
+                    await asyncio.sleep(faults.token_ms / 1000)
+                yield encode(word if i == 0 else " " + word)
+            if usage:
+                yield usage(prompt_tokens, cached_tokens)
+            if encode is _openai_event:
+                yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    def cache_error(status: int, message: str) -> JSONResponse:
+        return JSONResponse({"error": {"code": status, "message": message}}, status_code=status)
+
+    @app.post("/v1beta/models/{target}")
+    async def gemini(target: str, request: Request):
+        if not target.endswith(":streamGenerateContent"):
+            return JSONResponse({"error": {"message": "only streamGenerateContent is stubbed"}}, status_code=404)
+        body = await request.json()
+        prompt = count_tokens(_gemini_text(body.get("contents", ())))
+        cached = 0
+        if body.get("cachedContent"):
+            entry = caches.get(body["cachedContent"].rpartition("/")[2])
+            if entry is None or entry[1] < time.monotonic():
+                return cache_error(404, f"CachedContent not found: {body['cachedContent']}")
+            cached = entry[0]
+        elif body.get("systemInstruction"):
+            prompt += count_tokens(_gemini_text([body["systemInstruction"]]))
+        max_tokens = body.get("generationConfig", {}).get("maxOutputTokens", 256)
+        return reply(max_tokens, prompt + cached, cached, _gemini_event, _gemini_usage)
+
+    @app.post("/v1beta/cachedContents")
+    async def create_cache(request: Request):
+        body = await request.json()
+        tokens = count_tokens(_gemini_text([body.get("systemInstruction", {})] + body.get("contents", [])))
+        if tokens < faults.cache_min_tokens:
+            return cache_error(400, f"Cached content is too small: {tokens} < {faults.cache_min_tokens} tokens")
+        cache_id = hashlib.sha256(f"{time.monotonic()}{rng.random()}".encode()).hexdigest()[:12]
+        caches[cache_id] = (tokens, time.monotonic() + _seconds(body.get("ttl", "3600s")))
+        return {"name": f"cachedContents/{cache_id}", "model": body.get("model"), "usageMetadata": {"totalTokenCount": tokens}}
+
+    @app.patch("/v1beta/cachedContents/{cache_id}")
+    async def extend_cache(cache_id: str, request: Request):
+        if cache_id not in caches:
+            return cache_error(404, f"CachedContent not found: {cache_id}")
+        caches[cache_id] = (caches[cache_id][0], time.monotonic() + _seconds((await request.json()).get("ttl", "3600s")))
+        return {"name": f"cachedContents/{cache_id}"}
+
+    @app.delete("/v1beta/cachedContents/{cache_id}")
+    async def delete_cache(cache_id: str):
+        caches.pop(cache_id, None)
+        return {}
+
+    @app.post("/v1/chat/completions")
+    async def openai(request: Request):
+        body = await request.json()
+        messages = body.get("messages", ())
+        prompt = sum(count_tokens(m.get("content") or "") for m in messages)
+        cached = 0
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        system_tokens = count_tokens(system)
+        if system_tokens >= faults.cache_min_tokens:
+            key, now = hashlib.sha256(system.encode()).hexdigest(), time.monotonic()
+            if prefixes.get(key, 0.0) > now:
+                cached = system_tokens
+            prefixes[key] = now + faults.cache_ttl_s
+        usage = _openai_usage if (body.get("stream_options") or {}).get("include_usage") else None
+        return reply(body.get("max_tokens") or 256, prompt, cached, _openai_event, usage)
+
+    @app.get("/stub/faults")
+    async def get_faults():
+        return {"faults": asdict(faults), **counts}
+
+    @app.put("/stub/faults")
+    async def put_faults(request: Request):
+        for key, value in (await request.json()).items():
+            if hasattr(faults, key):
+                setattr(faults, key, type(getattr(faults, key))(value))
+        return {"faults": asdict(faults), **counts}
+
+    app.state.faults = faults
+    app.state.counts = counts
+    return app
+
+
+def _gemini_text(contents) -> str:
+    return "\n".join(part.get("text", "") for content in contents for part in content.get("parts", ()))
+
+
+def _seconds(ttl: str) -> float:
+    return float(ttl.rstrip("s"))
+
+
+def _gemini_event(text: str) -> str:
+    return "data: " + json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}) + "\n\n"
+
+
+def _openai_event(text: str) -> str:
+    return "data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": text}}]}) + "\n\n"
+
+
+def _gemini_usage(prompt_tokens: int, cached_tokens: int) -> str:
+    usage = {"promptTokenCount": prompt_tokens, "cachedContentTokenCount": cached_tokens}
+    return "data: " + json.dumps({"candidates": [], "usageMetadata": usage}) + "\n\n"
+
+
+def _openai_usage(prompt_tokens: int, cached_tokens: int) -> str:
+    usage = {"prompt_tokens": prompt_tokens, "prompt_tokens_details": {"cached_tokens": cached_tokens}}
+    return "data: " + json.dumps({"choices": [], "usage": usage}) + "\n\n"
+
+
+if httpx is not None:
+
+    class StreamingASGITransport(httpx.AsyncBaseTransport):
+        """
+        Runs an ASGI app in-process and streams its body as it is sent.
+        ``httpx.ASGITransport`` buffers the whole response, which would hide
+        time to first token.
+        """
+
+        def __init__(self, app):
+            self.app = app
+
+        async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+            body = await request.aread()
+            scope = {
+                "type":         "http",
+                "asgi":         {"version": "3.0"},
+                "http_version": "1.1",
+                "method":       request.method,
+                "scheme":       request.url.scheme,
+                "path":         request.url.path,
+                "raw_path":     request.url.raw_path.split(b"?")[0],
+                "query_string": request.url.query,
+                "root_path":    "",
+                "headers":      [(k.lower(), v) for k, v in request.headers.raw],
+                "server":       (request.url.host, request.url.port or 80),
+                "client":       ("127.0.0.1", 0),
+            }
+            loop = asyncio.get_running_loop()
+            started: asyncio.Future = loop.create_future()
+            chunks: asyncio.Queue = asyncio.Queue()
+            disconnected = asyncio.Event()
+            request_sent = False
+
+            async def receive():
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    started.set_result((message["status"], message.get("headers", [])))
+                elif message["type"] == "http.response.body":
+                    if message.get("body"):
+                        chunks.put_nowait(message["body"])
+                    if not message.get("more_body", False):
+                        chunks.put_nowait(None)
+
+            def finished(task: asyncio.Task) -> None:
+                chunks.put_nowait(None)
+                if not started.done():
+                    exc = None if task.cancelled() else task.exception()
+                    started.set_exception(exc or RuntimeError("ASGI app ended without a response"))
+
+            task = asyncio.ensure_future(self.app(scope, receive, send))
+            task.add_done_callback(finished)
+            status, headers = await started
+            return httpx.Response(status, headers=headers, stream=_ASGIBody(chunks, task, disconnected))
+
+    class _ASGIBody(httpx.AsyncByteStream):
+        def __init__(self, chunks: asyncio.Queue, task: asyncio.Task, disconnected: asyncio.Event):
+            self._chunks       = chunks
+            self._task         = task
+            self._disconnected = disconnected
+
+        async def __aiter__(self):
+            while (chunk := await self._chunks.get()) is not None:
+                yield chunk
+
+        async def aclose(self) -> None:
+            self._disconnected.set()
+            if not self._task.done():
+                self._task.cancel()
+                try:
+                    await self._task
+                except BaseException:
+                    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8301)
+    for name, default in asdict(Faults()).items():
+        parser.add_argument("--" + name.replace("_", "-"), type=type(default), default=default)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    faults = Faults(**{name: getattr(args, name) for name in asdict(Faults())})
+    uvicorn.run(create_app(faults, seed=args.seed), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,16 +45,126 @@ class Settings(BaseSettings):
     # -- LLM Config ------------------------------------------------------------
     LLM_MODEL: str = "gemini-2.5-flash-lite"
     LLM_TEMPERATURE: float = 0.3
-    LLM_MAX_TOKENS: int = 1024
+    LLM_MAX_TOKENS: int = 1024               # hard cap; /chat asks for the category budget below
+    LLM_TOKENS_PER_SENTENCE: int = 40        # output budget per sentence of the category's target
+    LLM_TOKENS_HEADROOM: int = 32
+    LLM_TIMEOUT_S: float = 20.0              # async client: connect / pool wait / gap between chunks
+    LLM_MAX_CONNECTIONS: int = 32            # pooled keep-alive connections to the provider
+    LLM_FAKE_LATENCY_MS: float = 300.0       # fake provider: time to first token
+    LLM_FAKE_RPM: int = 0                    # fake provider: 429 beyond this many calls/min; 0 = never
+
+    # -- LLM routing -----------------------------------------------------------
+    # Providers in preference order: gemini, openai, local (any OpenAI-compatible
+    # server), fake (local stand-in, no network). Unconfigured ones are skipped.
+    LLM_PROVIDERS: str = "gemini"
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    LLM_LOCAL_BASE_URL: str = "http://127.0.0.1:8080/v1"
+    LLM_LOCAL_MODEL: str = "local"
+    LLM_LOCAL_API_KEY: str = ""
+    LLM_HEDGE_AFTER_MS: float = 0.0          # start the next provider if no token by then; 0 = off
+    LLM_BREAKER_FAILURES: int = 5            # consecutive failures that open a provider's breaker
+    LLM_BREAKER_RESET_S: float = 30.0        # open breaker lets one probe call through after this
+    LLM_TTFT_MAX_AGE_S: float = 300.0        # TTFT samples older than this drop out of a provider's p95
+
+    # -- LLM context cache -----------------------------------------------------
+    # Provider-side caching of the stable prompt prefix (Gemini explicit caches;
+    # OpenAI-compatible providers cache repeated prefixes on their own)
+    LLM_CONTEXT_CACHE: bool = True
+    LLM_CONTEXT_CACHE_TTL_S: float = 3600.0
+    LLM_CONTEXT_CACHE_REFRESH_S: float = 300.0   # extend a handle used within this long of expiry
+    LLM_CONTEXT_CACHE_MIN_TOKENS: int = 1024     # provider minimum; shorter prefixes go inline
+
+    # -- LLM governor ----------------------------------------------------------
+    # Admission control in front of the provider; set the limits just under
+    # the provider quota. Calls that can't be admitted within the deadline get
+    # the safe fallback reply at once.
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_RPM_LIMIT: int = 0                   # requests per minute; 0 = unlimited
+    LLM_TPM_LIMIT: int = 0                   # prompt + output tokens per minute; 0 = unlimited
+    LLM_QUEUE_DEADLINE_MS: float = 4000.0
+    LLM_QUEUE_MAX: int = 256
 
     # -- ML Models -------------------------------------------------------------
     EMOTION_MODEL_PATH: str = str(_BASE_DIR / "backend" / "models" / "emotion")
     CRISIS_MODEL_PATH: str = str(_BASE_DIR / "backend" / "models" / "crisis")
     SENTENCE_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    INTENT_PROTOTYPES_PATH: str = str(_BASE_DIR / "backend" / "models" / "intent_prototypes.npz")
+    INTENT_EXEMPLARS_PATH: str = ""          # optional JSON {intent: [examples]} to extend _INTENTS
+    INTENT_SCORING: str = "centroid"         # centroid | knn
+    INTENT_KNN_K: int = 3
     FAISS_INDEX_PATH: str = str(_BASE_DIR / "backend" / "rag" / "faiss_index.index")
     RAG_METADATA_PATH: str = str(_BASE_DIR / "backend" / "rag" / "metadata.json")
     RAG_DOCUMENTS_PATH: str = str(_BASE_DIR / "backend" / "rag" / "cbt_documents")
     WHISPER_MODEL_SIZE: str = "tiny"
+    WHISPER_WARMUP: bool = True           # load + warm Whisper at startup instead of on first request
+    # Classifier runtime: torch | torch-int8 | onnx | onnx-int8
+    # (ONNX artifacts come from `python -m backend.training.export_onnx`)
+    INFERENCE_BACKEND: str = "torch"
+    # Shared-encoder emotion + crisis checkpoint (training/train_multitask.py).
+    # When set, both services use its heads instead of the two separate models.
+    MULTITASK_MODEL_PATH: str = ""
+
+    # -- Inference server ------------------------------------------------------
+    # local: models load in this process. remote: call backend/inference_server.py
+    INFERENCE_MODE: str = "local"
+    INFERENCE_URL: str = "unix:///tmp/mindcare-inference.sock"   # or http://127.0.0.1:8100
+    INFERENCE_TIMEOUT_S: float = 5.0
+    INFERENCE_MAX_CONNECTIONS: int = 32
+
+    # -- Inference batching ----------------------------------------------------
+    INFERENCE_BATCH_MAX_SIZE: int = 16
+    INFERENCE_BATCH_MAX_WAIT_MS: float = 4.0
+
+    # -- Executors -------------------------------------------------------------
+    # Separate bounded thread pools so voice uploads can't starve chat inference.
+    # Work beyond workers + queue is shed (503 / keyword-only fallback).
+    INFERENCE_WORKERS: int = 4               # micro-batch forward passes + FAISS retrieval
+    INFERENCE_QUEUE_MAX: int = 64            # per micro-batcher, items waiting for a batch
+    STT_WORKERS: int = 2
+    STT_QUEUE_MAX: int = 8
+    TTS_WORKERS: int = 2
+    TTS_QUEUE_MAX: int = 16
+
+    # -- CPU thread budget -----------------------------------------------------
+    # Per-library thread counts, applied once at startup; 0 = derive from cores
+    THREAD_BUDGET_CPUS: int = 0              # cores to budget for; 0 = this process's affinity mask
+    THREAD_AFFINITY: str = ""                # e.g. "0-7": pin the process to these cores
+    THREADS_TORCH: int = 0                   # intra-op per forward pass; 0 = cpus // INFERENCE_WORKERS
+    THREADS_WHISPER: int = 0                 # CTranslate2 cpu_threads; 0 = cpus // STT_WORKERS
+    THREADS_FAISS: int = 1                   # OpenMP threads per index.search
+    THREADS_BLAS: int = 1                    # numpy BLAS pool (needs threadpoolctl)
+    TOKENIZERS_PARALLELISM: bool = False     # HF fast tokenizers; batches are already concurrent
+
+    # -- Pre-fork serving (python -m backend.prefork) --------------------------
+    PREFORK_WORKERS: int = 0                 # 0 = one per core
+    PREFORK_WORKER_MEMORY_MB: int = 600      # private (non-shared) RSS budget per worker; self-check warns above
+
+    # -- Analysis cache --------------------------------------------------------
+    ANALYSIS_CACHE_SIZE: int = 4096          # 0 disables
+    ANALYSIS_CACHE_TTL_SECONDS: float = 3600.0
+
+    # -- User context cache ----------------------------------------------------
+    USER_CONTEXT_CACHE_SIZE: int = 10000     # users; 0 disables
+    USER_CONTEXT_TTL_SECONDS: float = 900.0  # bounds staleness from other workers' writes
+    # Turns / MHI values / emotions kept in each user_state document (min 7)
+    USER_STATE_RECENT: int = 10
+
+    # -- Persistence queue -----------------------------------------------------
+    # Write-behind for conversation turns: /chat returns once the turn is queued
+    PERSIST_WRITE_BEHIND: bool = True
+    PERSIST_BATCH_SIZE: int = 100            # turns per insert_many
+    PERSIST_FLUSH_MS: float = 200.0          # max time a turn waits for its batch
+    PERSIST_MAX_PENDING: int = 5000          # queued turns before /chat waits (backpressure)
+    PERSIST_SYNC_CRISIS: bool = False        # wait up to CHAT_DB_TIMEOUT_S for active / passive crisis turns' writes
+
+    # -- Chat pipeline ---------------------------------------------------------
+    # Per-stage timeouts (seconds); a timed-out stage falls back instead of failing /chat
+    CHAT_ANALYSIS_TIMEOUT_S: float = 10.0     # fallback: keyword / rule analysis
+    CHAT_DB_TIMEOUT_S: float = 3.0            # profile + history reads; fallback: neutral defaults
+    CHAT_RETRIEVAL_TIMEOUT_S: float = 2.0     # fallback: no retrieved context
+    CHAT_LLM_TIMEOUT_S: float = 30.0          # fallback: safety-service fallback reply
 
     # -- Thresholds ------------------------------------------------------------
     CRISIS_PROBABILITY_THRESHOLD: float = 0.65
@@ -72,6 +182,15 @@ class Settings(BaseSettings):
     RAG_CHUNK_SIZE: int = 512
     RAG_CHUNK_OVERLAP: int = 64
 
+    # -- Prompt budget ---------------------------------------------------------
+    # Token caps for the RAG prompt; instructions and session metadata are never cut
+    PROMPT_MAX_TOKENS: int = 1800            # whole prompt
+    PROMPT_CONTEXT_TOKENS: int = 700         # retrieved chunks (trimmed first)
+    PROMPT_HISTORY_TOKENS: int = 400         # recent conversation (trimmed next)
+    PROMPT_MESSAGE_TOKENS: int = 500         # the user's message
+    PROMPT_MIN_CHUNK_TOKENS: int = 40        # a clipped chunk shorter than this is dropped instead
+    PROMPT_TOKENIZER: str = "cl100k_base"    # tiktoken encoding; estimate when unavailable
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
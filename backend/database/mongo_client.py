@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any
 
 try:
@@ -14,6 +15,7 @@ except ImportError:  # pragma: no cover - depends on local env
     _HAS_MOTOR = False
 
 from backend.config import settings
+from backend.services.metrics import MONGO_OP_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -48,13 +50,94 @@ class _SyncCollectionAdapter:
     async def insert_one(self, *args, **kwargs):
         return self._collection.insert_one(*args, **kwargs)
 
+    async def insert_many(self, *args, **kwargs):
+        return self._collection.insert_many(*args, **kwargs)
+
     async def update_one(self, *args, **kwargs):
         return self._collection.update_one(*args, **kwargs)
 
+    async def replace_one(self, *args, **kwargs):
+        return self._collection.replace_one(*args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return self._collection.bulk_write(*args, **kwargs)
+
     def find(self, *args, **kwargs):
         return _SyncCursorAdapter(self._collection.find(*args, **kwargs))
 
 
+class _TimedCursor:
+    def __init__(self, cursor, seconds):
+        self._cursor  = cursor
+        self._seconds = seconds
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, value: int):
+        self._cursor = self._cursor.limit(value)
+        return self
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        started = time.perf_counter()
+        try:
+            return await self._cursor.to_list(length=length)
+        finally:
+            self._seconds.observe(time.perf_counter() - started)
+
+
+class _TimedCollection:
+    """
+    Records per-collection, per-operation latency into mongo_op_seconds.
+    Histogram children are bound once here so each call only times itself.
+    Anything not wrapped is passed straight through to the collection.
+    """
+
+    _OPS = (
+        "find_one", "insert_one", "insert_many", "update_one", "replace_one",
+        "bulk_write", "create_index", "find",
+    )
+
+    def __init__(self, collection, name: str):
+        self._collection = collection
+        self._seconds = {op: MONGO_OP_SECONDS.labels(name, op) for op in self._OPS}
+
+    async def _timed(self, op: str, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await getattr(self._collection, op)(*args, **kwargs)
+        finally:
+            self._seconds[op].observe(time.perf_counter() - started)
+
+    async def create_index(self, *args, **kwargs):
+        return await self._timed("create_index", *args, **kwargs)
+
+    async def find_one(self, *args, **kwargs):
+        return await self._timed("find_one", *args, **kwargs)
+
+    async def insert_one(self, *args, **kwargs):
+        return await self._timed("insert_one", *args, **kwargs)
+
+    async def insert_many(self, *args, **kwargs):
+        return await self._timed("insert_many", *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        return await self._timed("update_one", *args, **kwargs)
+
+    async def replace_one(self, *args, **kwargs):
+        return await self._timed("replace_one", *args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return await self._timed("bulk_write", *args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        return _TimedCursor(self._collection.find(*args, **kwargs), self._seconds["find"])
+
+    def __getattr__(self, name: str):
+        return getattr(self._collection, name)
+
+
 class Database:
     """
     Singleton MongoDB connection manager.
@@ -76,9 +159,10 @@ class Database:
             )
             db_handle = self.client[settings.MONGO_DB_NAME]
             self.db = db_handle
-            self.users = db_handle["users"]
-            self.conversations = db_handle["conversations"]
-            self.assessments = db_handle["assessments"]
+            self.users = _TimedCollection(db_handle["users"], "users")
+            self.conversations = _TimedCollection(db_handle["conversations"], "conversations")
+            self.assessments = _TimedCollection(db_handle["assessments"], "assessments")
+            self.user_state = _TimedCollection(db_handle["user_state"], "user_state")
         else:
             self.client = SyncMongoClient(
                 settings.MONGO_URI,
@@ -89,9 +173,16 @@ class Database:
             )
             db_handle = self.client[settings.MONGO_DB_NAME]
             self.db = db_handle
-            self.users = _SyncCollectionAdapter(db_handle["users"])
-            self.conversations = _SyncCollectionAdapter(db_handle["conversations"])
-            self.assessments = _SyncCollectionAdapter(db_handle["assessments"])
+            self.users = _TimedCollection(_SyncCollectionAdapter(db_handle["users"]), "users")
+            self.conversations = _TimedCollection(
+                _SyncCollectionAdapter(db_handle["conversations"]), "conversations",
+            )
+            self.assessments = _TimedCollection(
+                _SyncCollectionAdapter(db_handle["assessments"]), "assessments",
+            )
+            self.user_state = _TimedCollection(
+                _SyncCollectionAdapter(db_handle["user_state"]), "user_state",
+            )
             logger.warning("motor not installed; using pymongo compatibility mode")
 
     # -- Lifecycle -------------------------------------------------------------
@@ -0,0 +1,185 @@
+"""
+Standalone inference server: the emotion and crisis classifiers, MiniLM,
+intent prototypes and FAISS retrieval behind a local HTTP API. With
+INFERENCE_MODE=remote the API workers call it instead of loading models.
+
+    python -m backend.inference_server --uds /tmp/mindcare-inference.sock
+    python -m backend.inference_server --port 8100          # 127.0.0.1 only
+
+POST /v1/analyze   {"texts": [...]}               emotion, crisis, intent and
+                                                  embedding for each text
+POST /v1/retrieve  {"query": ..., "embedding": ...}  CBT context chunks
+GET  /v1/status    model load state + version; 503 until every model settles
+GET  /metrics      Prometheus metrics (batch sizes, inference time, queue depth)
+
+Texts from concurrent client batches are merged into shared micro-batches,
+so several API workers still get one forward pass per model.
+"""
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from backend.config import settings
+from backend.services import metrics, thread_budget
+from backend.services.crisis_service import CrisisService
+from backend.services.embedding_service import EmbeddingService
+from backend.services.emotion_service import EmotionService
+from backend.services.executors import BoundedExecutor
+from backend.services.inference_batcher import InferenceBatcher
+from backend.services.inference_protocol import (
+    ANALYZE_PATH,
+    RETRIEVE_PATH,
+    STATUS_PATH,
+    decode_vector,
+    encode_analysis,
+)
+from backend.services.intent_service import IntentService
+from backend.services.model_lifecycle import ModelLifecycle
+from backend.services.rag_service import RAGService
+
+_WARMUP_TEXT = "I have been feeling a bit stressed about work lately"
+
+embedding_service = EmbeddingService(preload=False)
+emotion_service   = EmotionService(preload=False)
+crisis_service    = CrisisService(preload=False)
+intent_service    = IntentService(embedding_service, preload=False)
+rag_service       = RAGService(embedding_service, preload=False)
+
+inference_executor = BoundedExecutor(
+    "inference", workers=settings.INFERENCE_WORKERS, max_queue=settings.INFERENCE_QUEUE_MAX,
+)
+
+
+def _batcher(name: str, batch_fn) -> InferenceBatcher:
+    return InferenceBatcher(
+        name, batch_fn,
+        max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+        max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+        executor=inference_executor,
+    )
+
+
+emotion_batcher   = _batcher("emotion", emotion_service.predict_many)
+crisis_batcher    = _batcher("crisis", crisis_service.assess_many)
+embedding_batcher = _batcher("embedding", embedding_service.encode_many)
+
+model_lifecycle = ModelLifecycle()
+model_lifecycle.register(
+    "embedding", embedding_service.load,
+    warmup=lambda: embedding_service.encode_many([_WARMUP_TEXT]),
+    available=lambda: embedding_service.available,
+)
+model_lifecycle.register(
+    "emotion", emotion_service.load,
+    warmup=lambda: emotion_service.predict_many([_WARMUP_TEXT]),
+    available=lambda: emotion_service.available,
+)
+model_lifecycle.register(
+    "crisis", crisis_service.load,
+    warmup=lambda: crisis_service.assess_many([_WARMUP_TEXT]),
+    available=lambda: crisis_service.available,
+)
+model_lifecycle.register(
+    "intent", intent_service.load,
+    warmup=lambda: intent_service.predict_many([_WARMUP_TEXT]),
+    available=lambda: intent_service.available,
+    after=("embedding",),
+)
+model_lifecycle.register(
+    "rag", rag_service.load,
+    warmup=lambda: rag_service.retrieve_context(_WARMUP_TEXT),
+    available=lambda: rag_service.available,
+    after=("embedding",),
+)
+
+
+def _model_version() -> str:
+    return "|".join((
+        emotion_service.model_version,
+        crisis_service.model_version,
+        intent_service.model_version,
+        embedding_service.model_version,
+    ))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    thread_budget.apply()
+    model_lifecycle.start()
+    yield
+    await model_lifecycle.close()
+    for batcher in (emotion_batcher, crisis_batcher, embedding_batcher):
+        await batcher.close()
+    inference_executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title=f"{settings.APP_NAME} inference", version=settings.APP_VERSION, lifespan=lifespan)
+
+
+class AnalyzeRequest(BaseModel):
+    texts: list[str]
+
+
+class RetrieveRequest(BaseModel):
+    query:     str
+    embedding: str | None = None   # base64 float32, see inference_protocol
+
+
+@app.post(ANALYZE_PATH)
+async def analyze(body: AnalyzeRequest):
+    texts = body.texts
+    emotions, crises, embeddings = await asyncio.gather(
+        asyncio.gather(*(emotion_batcher.submit(t) for t in texts)),
+        asyncio.gather(*(crisis_batcher.submit(t) for t in texts)),
+        asyncio.gather(*(embedding_batcher.submit(t) for t in texts)),
+    )
+    intents = intent_service.predict_many(texts, embeddings)
+    return {
+        "model_version": _model_version(),
+        "results": [
+            encode_analysis(e, c, i, v) for e, c, i, v in zip(emotions, crises, intents, embeddings)
+        ],
+    }
+
+
+@app.post(RETRIEVE_PATH)
+async def retrieve(body: RetrieveRequest):
+    chunks = await inference_executor.run(
+        rag_service.retrieve_context, body.query, decode_vector(body.embedding),
+    )
+    return {"model_version": _model_version(), "chunks": chunks}
+
+
+@app.get(STATUS_PATH)
+async def status():
+    state = model_lifecycle.status()
+    state["model_version"] = _model_version()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uds", help="serve on this Unix socket (preferred)")
+    parser.add_argument("--port", type=int, default=8100, help="localhost TCP port when --uds is not given")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.uds:
+        uvicorn.run(app, uds=args.uds, log_level=args.log_level)
+    else:
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
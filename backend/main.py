@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from functools import partial
+from typing import Any, AsyncIterator
 
 from fastapi import FastAPI, Query, Depends, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from bson import ObjectId
 
 from backend.auth.auth_router import router as auth_router
@@ -27,6 +32,7 @@ try:
 except Exception as exc:  # pragma: no cover - depends on optional libs
     report_router = None
 
+from backend.services.embedding_service import EmbeddingService
 from backend.services.emotion_service import EmotionService
 from backend.services.crisis_service import CrisisService
 from backend.services.intent_service import IntentService
@@ -36,7 +42,19 @@ from backend.services.safety_service import SafetyService
 from backend.services.behavioral_service import BehavioralService
 from backend.services.screening_service import ScreeningService
 from backend.services.history_service import HistoryService
+from backend.services.user_context_cache import UserContextCache
+from backend.services.user_state_service import UserStateService, week_key
+from backend.services.persistence_queue import PersistenceQueue
 from backend.services.multilingual_voice_service import MultilingualVoiceService
+from backend.services.inference_batcher import InferenceBatcher
+from backend.services.executors import BoundedExecutor, Overloaded
+from backend.services.inference_client import InferenceClient
+from backend.services.analysis_cache import AnalysisBundle, AnalysisCache
+from backend.services.model_lifecycle import ModelLifecycle
+from backend.services.signal_engine import SignalScan, signal_engine
+from backend.services.stage_graph import Stage, StageGraph
+from backend.services import llm_service, metrics, prompt_budget, thread_budget
+from backend.services.process_memory import memory_usage
 
 
 # -- Logging -------------------------------------------------------------------
@@ -49,18 +67,259 @@ logger = logging.getLogger(__name__)
 
 
 # -- Services (instantiated once at startup, reused for every request) ---------
+# Model-backed services start empty (keyword / rule fallbacks) and are loaded
+# + warmed in the background by model_lifecycle once the server is up.
 
-emotion_service    = EmotionService()
-crisis_service     = CrisisService()
-intent_service     = IntentService()
+embedding_service  = EmbeddingService(preload=False)    # one MiniLM shared by intent + RAG
+emotion_service    = EmotionService(preload=False)
+crisis_service     = CrisisService(preload=False)
+intent_service     = IntentService(embedding_service, preload=False)
 matrix_service     = MentalHealthMatrix()
-rag_service        = RAGService()
+rag_service        = RAGService(embedding_service, preload=False)
 safety_service     = SafetyService()
 behavioral_service = BehavioralService()
 screening_service  = ScreeningService()
-history_service    = HistoryService(db.conversations)
+user_state_service = UserStateService(db.user_state, db.conversations)
+history_service    = HistoryService(db.conversations, user_state_service)
 voice_service      = MultilingualVoiceService()
 
+# Bounded, per-workload thread pools: a burst of voice uploads can't starve
+# classifier inference, and overload is shed, not queued. LLM calls are
+# native async (llm_service) and hold no thread.
+inference_executor = BoundedExecutor(
+    "inference", workers=settings.INFERENCE_WORKERS, max_queue=settings.INFERENCE_QUEUE_MAX,
+)
+stt_executor = BoundedExecutor("stt", workers=settings.STT_WORKERS, max_queue=settings.STT_QUEUE_MAX)
+tts_executor = BoundedExecutor("tts", workers=settings.TTS_WORKERS, max_queue=settings.TTS_QUEUE_MAX)
+_EXECUTORS = (inference_executor, stt_executor, tts_executor)
+
+# Micro-batchers: concurrent /chat turns share one padded forward pass per model
+emotion_batcher = InferenceBatcher(
+    "emotion", emotion_service.predict_many,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+    max_queue=settings.INFERENCE_QUEUE_MAX,
+    executor=inference_executor,
+)
+crisis_batcher = InferenceBatcher(
+    "crisis", crisis_service.assess_many,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+    max_queue=settings.INFERENCE_QUEUE_MAX,
+    executor=inference_executor,
+)
+embedding_batcher = InferenceBatcher(
+    "embedding", embedding_service.encode_many,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+    max_queue=settings.INFERENCE_QUEUE_MAX,
+    executor=inference_executor,
+)
+
+# Out-of-process inference (INFERENCE_MODE=remote): the models run in
+# backend/inference_server.py and one RPC per micro-batch returns the whole
+# analysis; the local services above keep only their keyword / rule fallbacks
+inference_client = (
+    InferenceClient(
+        settings.INFERENCE_URL,
+        timeout=settings.INFERENCE_TIMEOUT_S,
+        max_connections=settings.INFERENCE_MAX_CONNECTIONS,
+    )
+    if settings.INFERENCE_MODE == "remote" else None
+)
+remote_batcher = InferenceBatcher(
+    "remote", inference_client.analyze_many,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+    max_queue=settings.INFERENCE_QUEUE_MAX,
+    executor=inference_executor,
+) if inference_client is not None else None
+
+_BATCHERS = tuple(
+    b for b in (emotion_batcher, crisis_batcher, embedding_batcher, remote_batcher) if b is not None
+)
+
+
+# Conversation turns are written behind the response in batches; lifespan
+# drains the queue on shutdown
+persistence_queue = PersistenceQueue(
+    db.conversations, db.users, user_state_service,
+    max_batch=settings.PERSIST_BATCH_SIZE,
+    max_wait_ms=settings.PERSIST_FLUSH_MS,
+    max_pending=settings.PERSIST_MAX_PENDING,
+)
+
+
+# Per-user profile and screening totals; written through by /assessment.
+# Recent turns are read from user_state each turn (any worker may have
+# written the last one).
+async def _load_user_context(user_id):
+    return await db.users.find_one(
+        {"_id": user_id},
+        {"phq2_total": 1, "gad2_total": 1, "name": 1, "email": 1},
+    )
+
+
+user_context_cache = UserContextCache(
+    _load_user_context,
+    max_users=settings.USER_CONTEXT_CACHE_SIZE,
+    ttl_seconds=settings.USER_CONTEXT_TTL_SECONDS,
+)
+
+
+# Background model loading + warm-up; /health/ready reports progress.
+# ONNX Runtime sessions start their thread pools on construction, so under
+# the pre-fork server (backend/prefork.py) each worker loads its own.
+_WARMUP_TEXT = "I have been feeling a bit stressed about work lately"
+_CLASSIFIERS_FORK_SAFE = not settings.INFERENCE_BACKEND.startswith("onnx")
+
+model_lifecycle = ModelLifecycle()
+if inference_client is not None:
+    # Models live in the inference server; readiness means it is up and warm
+    model_lifecycle.register(
+        "inference_server", inference_client.wait_ready,
+        warmup=lambda: inference_client.analyze_many([_WARMUP_TEXT]),
+        available=lambda: inference_client.available,
+    )
+else:
+    model_lifecycle.register(
+        "embedding", embedding_service.load,
+        warmup=lambda: embedding_service.encode_many([_WARMUP_TEXT]),
+        available=lambda: embedding_service.available,
+    )
+    model_lifecycle.register(
+        "emotion", emotion_service.load,
+        warmup=lambda: emotion_service.predict_many([_WARMUP_TEXT]),
+        available=lambda: emotion_service.available,
+        fork_safe=_CLASSIFIERS_FORK_SAFE,
+    )
+    model_lifecycle.register(
+        "crisis", crisis_service.load,
+        warmup=lambda: crisis_service.assess_many([_WARMUP_TEXT]),
+        available=lambda: crisis_service.available,
+        fork_safe=_CLASSIFIERS_FORK_SAFE,
+    )
+    model_lifecycle.register(
+        "intent", intent_service.load,
+        warmup=lambda: intent_service.predict_many([_WARMUP_TEXT]),
+        available=lambda: intent_service.available,
+        after=("embedding",),
+    )
+    model_lifecycle.register(
+        "rag", rag_service.load,
+        warmup=lambda: rag_service.retrieve_context(_WARMUP_TEXT),
+        available=lambda: rag_service.available,
+        after=("embedding",),
+    )
+
+model_lifecycle.register(
+    "tokenizer", lambda: prompt_budget.load_tokenizer(settings.PROMPT_TOKENIZER),
+)
+
+if settings.WHISPER_WARMUP:
+    model_lifecycle.register(
+        "whisper", voice_service.load_whisper,
+        warmup=voice_service.warm_up,
+        available=lambda: voice_service.whisper_loaded,
+        fork_safe=False,   # CTranslate2 worker threads don't survive fork()
+    )
+
+
+# Stateless per-message classifier outputs, shared across users; dropped
+# whenever any of the models behind them changes
+def _model_version() -> str:
+    if inference_client is not None:
+        return inference_client.model_version   # refreshed from every server response
+    return "|".join((
+        emotion_service.model_version,
+        crisis_service.model_version,
+        intent_service.model_version,
+        embedding_service.model_version,
+    ))
+
+
+def _models_ready() -> bool:
+    if inference_client is not None:
+        return inference_client.available
+    return (
+        emotion_service.available
+        and crisis_service.available
+        and intent_service.available
+        and embedding_service.available
+    )
+
+
+analysis_cache = AnalysisCache(
+    _model_version,
+    ready_fn=_models_ready,
+    max_entries=settings.ANALYSIS_CACHE_SIZE,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+)
+
+
+# Everything else blocking (model loading + warm-up) runs here; installed as
+# the loop's default executor so its queue depth is observable
+_thread_pool = ThreadPoolExecutor(thread_name_prefix="worker")
+
+
+# Scrape-time gauges — sampled by GET /metrics, nothing on the request path
+metrics.registry.gauge(
+    "thread_pool_queue_depth", "Calls waiting for a worker thread",
+    lambda: _thread_pool._work_queue.qsize(),
+)
+metrics.registry.gauge(
+    "executor_queue_depth", "Calls waiting in each bounded executor",
+    lambda: {e.name: e.queued for e in _EXECUTORS},
+    ["executor"],
+)
+metrics.registry.gauge(
+    "executor_in_flight", "Calls running or waiting in each bounded executor",
+    lambda: {e.name: e.stats()["in_flight"] for e in _EXECUTORS},
+    ["executor"],
+)
+metrics.registry.gauge(
+    "llm_governor_queue_depth", "LLM calls waiting for a governor slot",
+    lambda: llm_service.governor.stats()["queued"],
+)
+metrics.registry.gauge(
+    "llm_governor_in_flight", "LLM calls currently admitted by the governor",
+    lambda: llm_service.governor.stats()["in_flight"],
+)
+metrics.registry.gauge(
+    "llm_provider_breaker_open", "1 while an LLM provider's circuit breaker refuses calls",
+    lambda: {p["name"]: int(p["breaker"] == "open") for p in llm_service.provider_stats().get("providers", ())},
+    ["provider"],
+)
+metrics.registry.gauge(
+    "inference_batch_queue_depth", "Items waiting in each micro-batcher",
+    lambda: {b.name: b.stats()["queued"] for b in _BATCHERS},
+    ["model"],
+)
+metrics.registry.gauge(
+    "analysis_cache_events", "Analysis cache hits / misses / evictions since start",
+    lambda: {k: v for k, v in analysis_cache.stats().items() if k in ("hits", "misses", "evictions")},
+    ["event"],
+)
+metrics.registry.gauge(
+    "user_context_cache_events", "User context cache hits / misses / evictions since start",
+    lambda: {k: v for k, v in user_context_cache.stats().items() if k in ("hits", "misses", "evictions")},
+    ["event"],
+)
+metrics.registry.gauge(
+    "persistence_queue_pending", "Conversation turns queued but not yet written to MongoDB",
+    lambda: persistence_queue.stats()["pending"],
+)
+metrics.registry.gauge(
+    "model_ready", "1 when the model is loaded and warm",
+    lambda: {n: int(m["state"] == "ready") for n, m in model_lifecycle.status()["models"].items()},
+    ["model"],
+)
+_INTENT_SECONDS = metrics.MODEL_INFERENCE_SECONDS.labels("intent")
+
+
+# Post-response work (crisis fast lane analytics); drained on shutdown
+_background_tasks: set[asyncio.Task] = set()
+
 
 # -- Lifespan ------------------------------------------------------------------
 
@@ -71,7 +330,22 @@ async def lifespan(app: FastAPI):
         await db.create_indexes()
     except Exception as exc:
         logger.warning("Non-fatal: could not create DB indexes at startup: %s", exc)
+    asyncio.get_running_loop().set_default_executor(_thread_pool)
+    thread_budget.apply()     # before any model loads or spins up a thread pool
+    model_lifecycle.start()   # returns immediately; requests use fallbacks until ready
     yield
+    await model_lifecycle.close()
+    if _background_tasks:
+        logger.info("Draining %d background task(s) …", len(_background_tasks))
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+    await persistence_queue.close()
+    for batcher in _BATCHERS:
+        await batcher.close()
+    if inference_client is not None:
+        inference_client.close()
+    await llm_service.aclose()
+    for executor in _EXECUTORS:
+        executor.shutdown(wait=False, cancel_futures=True)
     db.close()
     logger.info("Shutdown complete.")
 
@@ -124,15 +398,11 @@ else:
     logger.warning("Report routes disabled because optional report dependencies are unavailable")
 
 
-# Thread-pool helper
+# Load shedding
 
-async def _run_in_thread(fn, *args, **kwargs):
-    """
-    Offloads a synchronous blocking call (ML inference, STT, TTS) to
-    FastAPI's default thread pool so the async event loop is never blocked.
-    """
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, partial(fn, *args, **kwargs))
+def _overloaded(exc: Overloaded) -> HTTPException:
+    """Fast 503 for shed work; the client retries instead of waiting in a queue."""
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "2"})
 
 
 # DB persistence helper 
@@ -152,9 +422,15 @@ async def _persist(
     category: str,
     language_code: str,
     source: str = "text",
-) -> None:
-    """Saves one conversation turn to MongoDB. Used by all /chat exit paths."""
-    await db.conversations.insert_one({
+) -> dict:
+    """
+    Saves one conversation turn to MongoDB. Used by all /chat exit paths.
+
+    The turn is queued for a batched write-behind flush; crisis turns (with
+    PERSIST_SYNC_CRISIS) and PERSIST_WRITE_BEHIND=false wait for the write.
+    Returns the saved document.
+    """
+    doc = {
         "user_id":          user_id,
         "timestamp":        datetime.utcnow(),
         "message":          message,
@@ -170,8 +446,35 @@ async def _persist(
         "category":         category,
         "language_code":    language_code,
         "source":           source,
-    })
-    await db.update_latest_mhi(user_id, int(mhi))
+    }
+    wait = not settings.PERSIST_WRITE_BEHIND or _sync_crisis(crisis_tier)
+    await persistence_queue.submit(doc, wait=wait)
+    return doc
+
+
+def _sync_crisis(crisis_tier: str) -> bool:
+    return settings.PERSIST_SYNC_CRISIS and crisis_tier in ("active", "passive")
+
+
+async def _write_before_reply(task: asyncio.Task) -> None:
+    """
+    Gives a crisis turn's write (PERSIST_SYNC_CRISIS) up to CHAT_DB_TIMEOUT_S
+    before the reply goes out. A slow or failing Mongo never holds back the
+    helpline reply: the write carries on in the background past the timeout.
+    """
+    try:
+        await asyncio.wait_for(asyncio.shield(task), settings.CHAT_DB_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        logger.error("Crisis turn not written within %.1fs; replying, write continues in the background",
+                     settings.CHAT_DB_TIMEOUT_S)
+        task.add_done_callback(_log_write_failure)
+    except Exception as exc:
+        logger.error("Crisis turn write failed before replying: %r", exc)
+
+
+def _log_write_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Crisis turn background write failed: %r", task.exception())
 
 
 
@@ -184,12 +487,18 @@ def root():
         "docs":    "/docs",
         "endpoints": {
             "POST /chat":             "Text analysis + LLM response pipeline",
+            "POST /chat/stream":      "Same pipeline, reply streamed as Server-Sent Events",
             "POST /voice/transcribe": "Audio → transcript  (STT)",
             "POST /voice/speak":      "Text → audio bytes  (TTS)",
             "POST /assessment":       "Submit PHQ-2 / GAD-2 scores",
             "GET  /user/history":     "Paginated conversation history",
             "GET  /user/timeline":    "MHI timeline for dashboard chart",
             "GET  /report":           "Download PDF session report",
+            "GET  /health/inference": "Micro-batching + analysis cache stats",
+            "GET  /health/ready":     "Per-model load state and warm-up timings",
+            "GET  /health/threads":   "CPU thread budget per inference library",
+            "GET  /health/memory":    "Shared vs private resident memory of this worker",
+            "GET  /metrics":          "Prometheus latency histograms and counters",
         },
     }
 
@@ -228,6 +537,7 @@ async def options_voice_speak():
 
 
 @app.options("/chat", include_in_schema=False)
+@app.options("/chat/stream", include_in_schema=False)
 async def options_chat():
     """Explicit OPTIONS handler for the chat endpoint."""
     return Response(
@@ -241,157 +551,599 @@ async def options_chat():
     )
 
 
+#  GET /health/inference
+
+@app.get("/health/inference", summary="Inference micro-batching + analysis cache metrics")
+async def inference_stats():
+    return {
+        "batchers": [b.stats() for b in _BATCHERS],
+        "analysis_cache": analysis_cache.stats(),
+        "user_context_cache": user_context_cache.stats(),
+        "persistence_queue": persistence_queue.stats(),
+        "executors": [e.stats() for e in _EXECUTORS],
+        "llm_governor": llm_service.governor.stats(),
+        "llm_providers": llm_service.provider_stats(),
+        "llm_context_cache": llm_service.context_cache_stats(),
+        "prompt_budget": rag_service.prompt_budget.stats(),
+    }
+
+
+#  GET /metrics
+
+@app.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4",
+    )
+
+
+#  GET /health/threads
+
+@app.get("/health/threads", summary="Per-library CPU thread budget in effect")
+async def thread_config():
+    return thread_budget.effective()
+
+
+#  GET /health/memory
+
+@app.get("/health/memory", summary="Resident memory of this worker, shared vs private")
+async def process_memory():
+    return {"pid": os.getpid(), **memory_usage()}
+
+
+#  GET /health/ready
+
+@app.get("/health/ready", summary="Model load / warm-up readiness")
+async def readiness():
+    """
+    503 while any model is still loading or warming, 200 once all have
+    settled. "degraded" / "failed" models count as settled: the service
+    keeps answering from its keyword / rule fallback.
+    """
+    status = model_lifecycle.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 #  POST /chat 
 
-@app.post("/chat", response_model=ChatResponse, summary="Full chat pipeline")
-async def chat(
-    body: ChatRequest,
-    user_id: ObjectId = Depends(get_current_user),
-):
-    # Step 1: ML inference — offloaded to thread pool
-    (
-        emotion_scores,
-        crisis_score,
-        crisis_tier,
-        intent,
-        history_score,
-        history_snapshot,
-    ) = await asyncio.gather(
-        _run_in_thread(emotion_service.predict, body.message),
-        _run_in_thread(crisis_service.predict, body.message),
-        _run_in_thread(crisis_service.classify_tier, body.message),
-        _run_in_thread(intent_service.predict, body.message),
-        history_service.compute(user_id),
-        history_service.get_recent_snapshot(user_id),
-    )
-    emotion_label    = max(emotion_scores, key=emotion_scores.get)
-    emotion_score    = emotion_scores[emotion_label]
-    behavioral_score = behavioral_service.predict(body.message)     # pure regex — fast
+@dataclass
+class TurnAnalysis:
+    """Everything /chat derives from one message before response generation."""
+    emotion_scores:   dict
+    emotion_label:    str
+    emotion_score:    float
+    crisis_score:     float
+    crisis_tier:      str
+    intent:           str
+    behavioral_score: float
+    screening_score:  float
+    history_score:    float
+    history_snapshot: dict
+    mhi:              float
+    category:         str
+    embedding:        Any = None   # shared MiniLM vector, reused by RAG retrieval
+
+
+async def _embed_and_classify_intent(message: str):
+    """Encodes the message once; the same vector feeds intent now and RAG later."""
+    embedding = await embedding_batcher.submit(message)
+    started = time.perf_counter()
+    intent = intent_service.predict(message, embedding)
+    _INTENT_SECONDS.observe(time.perf_counter() - started)
+    return embedding, intent
+
+
+async def _classify_message(message: str, signals: SignalScan) -> AnalysisBundle:
+    """Stateless classifier outputs for *message*, served from the analysis cache when possible."""
+    version = _model_version()   # read before inference: a model may finish loading meanwhile
+    bundle = analysis_cache.get(message)
+    if bundle is not None:
+        return bundle
+
+    if remote_batcher is not None:
+        emotion_scores, crisis, intent, embedding = await remote_batcher.submit(message)
+    else:
+        emotion_scores, crisis, (embedding, intent) = await asyncio.gather(
+            emotion_batcher.submit(message),
+            crisis_batcher.submit(message),   # one rule scan + one model pass
+            _embed_and_classify_intent(message),
+        )
+    bundle = AnalysisBundle(
+        emotion_scores   = emotion_scores,
+        crisis           = crisis,
+        intent           = intent,
+        behavioral_score = behavioral_service.predict(message, signals),
+        embedding        = embedding,
+    )
+    analysis_cache.put(message, bundle, version)
+    return bundle
 
-    logger.debug(
-        "msg=%r | emotion=%s(%.2f) | crisis=%.3f | tier=%s | behavioral=%.2f",
-        body.message[:60], emotion_label, emotion_score,
-        crisis_score, crisis_tier, behavioral_score,
+
+# Chat pipeline as a stage graph: every stage starts as soon as the stages it
+# needs have finished, so the profile and history reads overlap inference.
+
+def _keyword_bundle(run, exc) -> AnalysisBundle:
+    """Analysis fallback: rule / keyword outputs only, no model calls."""
+    message, signals = run["message"], run["signals"]
+    return AnalysisBundle(
+        emotion_scores   = emotion_service.keyword_predict(message, signals),
+        crisis           = crisis_service.assess_rules(message, signals),
+        intent           = intent_service.keyword_predict(message),
+        behavioral_score = behavioral_service.predict(message, signals),
     )
 
-    user_doc = await db.users.find_one(
-        {"_id": user_id},
-        {"phq2_total": 1, "gad2_total": 1},
+
+async def _stage_analysis(run) -> AnalysisBundle:
+    return await _classify_message(run["message"], run["signals"])
+
+
+async def _stage_profile(run) -> float:
+    """Screening score from the user's latest PHQ-2 / GAD-2 totals."""
+    ctx = await user_context_cache.get(run["user_id"])
+    return screening_service.compute(ctx.phq2, ctx.gad2)
+
+
+async def _stage_history(run) -> tuple[float, dict]:
+    recent = await history_service.fetch_recent(run["user_id"])   # one user_state _id lookup
+    return history_service.score_from(recent), history_service.snapshot_from(recent)
+
+
+async def _stage_mhi(run) -> TurnAnalysis:
+    """MHI + category (includes hopeless-phrase penalty + crisis ceilings)."""
+    message, signals = run["message"], run["signals"]
+    bundle = run["analysis"]
+    history_score, history_snapshot = run["history"]
+    screening_score = run["profile"]
+
+    emotion_scores = dict(bundle.emotion_scores)
+    emotion_label  = max(emotion_scores, key=emotion_scores.get)
+    emotion_score  = emotion_scores[emotion_label]
+    crisis         = bundle.crisis
+
+    logger.debug(
+        "msg=%r | emotion=%s(%.2f) | crisis=%.3f | tier=%s | behavioral=%.2f",
+        message[:60], emotion_label, emotion_score,
+        crisis.score, crisis.tier, bundle.behavioral_score,
     )
-    phq2 = int(user_doc.get("phq2_total", 0)) if user_doc else 0
-    gad2 = int(user_doc.get("gad2_total", 0)) if user_doc else 0
-    screening_score = screening_service.compute(phq2, gad2)
 
-    # Step 3: Compute MHI (includes hopeless-phrase penalty + crisis ceilings)
     mhi = matrix_service.compute(
         emotion_score    = emotion_score,
-        crisis_score     = crisis_score,
+        crisis_score     = crisis.score,
         emotion_label    = emotion_label,
         screening_score  = screening_score,
-        behavioral_score = behavioral_score,
+        behavioral_score = bundle.behavioral_score,
         history_score    = history_score,
-        crisis_tier      = crisis_tier,
-        raw_text         = body.message,
+        crisis_tier      = crisis.tier,
+        raw_text         = message,
         recent_emotions  = history_snapshot.get("recent_emotions"),
         mhi_trend        = history_snapshot.get("recent_mhi"),
+        signals          = signals,
     )
-    category = matrix_service.categorize(mhi, crisis_score, crisis_tier)
+    category = matrix_service.categorize(mhi, crisis.score, crisis.tier)
 
     logger.debug(
         "mhi=%d | category=%s | screening=%.2f | history=%.2f",
         mhi, category, screening_score, history_score,
     )
+    return TurnAnalysis(
+        emotion_scores   = emotion_scores,
+        emotion_label    = emotion_label,
+        emotion_score    = emotion_score,
+        crisis_score     = crisis.score,
+        crisis_tier      = crisis.tier,
+        intent           = bundle.intent,
+        behavioral_score = bundle.behavioral_score,
+        screening_score  = screening_score,
+        history_score    = history_score,
+        history_snapshot = history_snapshot,
+        mhi              = mhi,
+        category         = category,
+        embedding        = bundle.embedding,
+    )
 
-    # Step 4: Crisis early-exit — skip RAG for active/passive tiers
-    if safety_service.is_active_crisis(
-        crisis_tier, crisis_score, settings.SAFETY_OVERRIDE_THRESHOLD
-    ):
-        logger.info(
-            "ACTIVE CRISIS early-exit | tier=%s score=%.3f | RAG skipped",
-            crisis_tier, crisis_score,
-        )
-        final_response = safety_service.validate_response(
-            response     = "",
-            crisis_score = crisis_score,
-            crisis_tier  = crisis_tier,
-            category     = category,
-            llm_failed   = False,
-        )
-        await _persist(
-            user_id, body.message, final_response, emotion_scores, crisis_score, crisis_tier,
-            behavioral_score, screening_score, history_score, intent, mhi, category,
-            body.language_code, body.source,
-        )
-        return ChatResponse(
-            response=final_response, emotion_scores=emotion_scores,
-            crisis_score=round(crisis_score, 4), crisis_tier=crisis_tier,
-            intent=intent, mhi=int(mhi), category=category,
-        )
 
-    if safety_service.is_passive_crisis(
-        crisis_tier, crisis_score, settings.CRISIS_PROBABILITY_THRESHOLD
-    ):
-        logger.info(
-            "PASSIVE CRISIS early-exit | tier=%s score=%.3f | RAG skipped",
-            crisis_tier, crisis_score,
-        )
-        final_response = safety_service.validate_response(
-            response     = "",
-            crisis_score = crisis_score,
-            crisis_tier  = crisis_tier,
-            category     = category,
-            llm_failed   = False,
-        )
-        await _persist(
-            user_id, body.message, final_response, emotion_scores, crisis_score, crisis_tier,
-            behavioral_score, screening_score, history_score, intent, mhi, category,
-            body.language_code, body.source,
-        )
-        return ChatResponse(
-            response=final_response, emotion_scores=emotion_scores,
-            crisis_score=round(crisis_score, 4), crisis_tier=crisis_tier,
-            intent=intent, mhi=int(mhi), category=category,
-        )
+def _model_crisis(run) -> bool:
+    """Model-detected active/passive crisis: the helpline template replaces RAG."""
+    crisis = run["analysis"].crisis
+    return safety_service.is_active_crisis(
+        crisis.tier, crisis.score, settings.SAFETY_OVERRIDE_THRESHOLD
+    ) or safety_service.is_passive_crisis(
+        crisis.tier, crisis.score, settings.CRISIS_PROBABILITY_THRESHOLD
+    )
+
+
+async def _stage_retrieval(run) -> list[dict]:
+    bundle = run["analysis"]
+    retrieve = inference_client.retrieve if inference_client is not None else rag_service.retrieve_context
+    return await inference_executor.run(retrieve, run["message"], bundle.embedding)
 
-    # Step 5: RAG-augmented LLM response
-    llm_response, llm_failed = await _run_in_thread(
-        rag_service.generate_response,
+
+async def _stage_generation(run) -> tuple[str, bool]:
+    turn: TurnAnalysis = run["mhi"]
+    body: ChatRequest  = run["body"]
+    return await rag_service.agenerate_response(
         body.message,
-        emotion_label,
-        emotion_score,
-        intent,
-        mhi,
-        crisis_score,
-        crisis_tier,
-        category,
+        turn.emotion_label,
+        turn.emotion_score,
+        turn.intent,
+        turn.mhi,
+        turn.crisis_score,
+        turn.crisis_tier,
+        turn.category,
         body.language_code,
-        history_snapshot.get("conversation_pairs"),
+        turn.history_snapshot.get("conversation_pairs"),
+        run["retrieval"],
+        str(run["user_id"]),
     )
 
-    # Step 6: Safety validation + length trim
-    final_response = safety_service.validate_response(
+
+async def _stage_safety(run) -> str:
+    """Safety validation + length trim (crisis turns get the helpline template)."""
+    turn: TurnAnalysis = run["mhi"]
+    generated = run["generation"]
+    if generated is None:
+        logger.info(
+            "CRISIS early-exit | tier=%s score=%.3f | RAG skipped",
+            turn.crisis_tier, turn.crisis_score,
+        )
+        generated = ("", False)
+    llm_response, llm_failed = generated
+    return safety_service.validate_response(
         response     = llm_response,
-        crisis_score = crisis_score,
-        crisis_tier  = crisis_tier,
-        category     = category,
+        crisis_score = turn.crisis_score,
+        crisis_tier  = turn.crisis_tier,
+        category     = turn.category,
         llm_failed   = llm_failed,
     )
 
-    # Step 7: Persist to MongoDB
+
+async def _stage_persistence(run) -> None:
+    write = _persist_turn(run["user_id"], run["body"], run["safety"], run["mhi"])
+    if _sync_crisis(run["mhi"].crisis_tier):
+        await _write_before_reply(_spawn_background(write))
+    else:
+        await write
+
+
+_ANALYSIS_GRAPH = StageGraph([
+    Stage("analysis", _stage_analysis, needs=("message", "signals"),
+          timeout=settings.CHAT_ANALYSIS_TIMEOUT_S, fallback=_keyword_bundle),
+    Stage("profile", _stage_profile, needs=("user_id",),
+          timeout=settings.CHAT_DB_TIMEOUT_S,
+          fallback=lambda run, exc: screening_service.compute(0, 0)),
+    Stage("history", _stage_history, needs=("user_id",),
+          timeout=settings.CHAT_DB_TIMEOUT_S,
+          fallback=lambda run, exc: (0.5, {})),
+    Stage("mhi", _stage_mhi, needs=("analysis", "profile", "history")),
+])
+
+_RETRIEVAL_STAGE = Stage(
+    "retrieval", _stage_retrieval, needs=("analysis",),
+    timeout=settings.CHAT_RETRIEVAL_TIMEOUT_S, fallback=lambda run, exc: [],
+    when=lambda run: not _model_crisis(run),
+)
+
+_CHAT_GRAPH = _ANALYSIS_GRAPH.extend([
+    _RETRIEVAL_STAGE,
+    Stage("generation", _stage_generation, needs=("mhi", "retrieval"),
+          timeout=settings.CHAT_LLM_TIMEOUT_S, fallback=lambda run, exc: ("", True),
+          when=lambda run: not _model_crisis(run)),
+    Stage("safety", _stage_safety, needs=("mhi", "generation")),
+    Stage("persistence", _stage_persistence, needs=("safety", "mhi", "body")),
+])
+
+
+# Crisis fast lane with PERSIST_SYNC_CRISIS: history is read before the
+# provisional turn is written, so the deferred analysis doesn't see it
+_HISTORY_GRAPH  = StageGraph([_ANALYSIS_GRAPH.stages["history"]])
+_REVISION_GRAPH = StageGraph([s for s in _ANALYSIS_GRAPH.stages.values() if s.name != "history"])
+
+
+async def _analyze_turn(user_id, message: str, signals: SignalScan, **known) -> TurnAnalysis:
+    """Analysis, profile, history and MHI stages only (crisis fast lane background work)."""
+    graph = _REVISION_GRAPH if "history" in known else _ANALYSIS_GRAPH
+    run = await graph.run(user_id=user_id, message=message, signals=signals, **known)
+    return run["mhi"]
+
+
+async def _persist_turn(user_id, body: ChatRequest, response: str, turn: TurnAnalysis) -> None:
     await _persist(
-        user_id, body.message, final_response, emotion_scores, crisis_score, crisis_tier,
-        behavioral_score, screening_score, history_score, intent, mhi, category,
-        body.language_code, body.source,
+        user_id, body.message, response, turn.emotion_scores, turn.crisis_score,
+        turn.crisis_tier, turn.behavioral_score, turn.screening_score, turn.history_score,
+        turn.intent, turn.mhi, turn.category, body.language_code, body.source,
     )
 
+
+def _chat_response(response: str, turn: TurnAnalysis) -> ChatResponse:
+    metrics.CRISIS_TIER_TOTAL.labels(turn.crisis_tier).inc()
     return ChatResponse(
-        response=final_response,
-        emotion_scores=emotion_scores,
-        crisis_score=round(crisis_score, 4),
-        crisis_tier=crisis_tier,
-        intent=intent,
-        mhi=int(mhi),
-        category=category,
+        response=response,
+        emotion_scores=turn.emotion_scores,
+        crisis_score=round(turn.crisis_score, 4),
+        crisis_tier=turn.crisis_tier,
+        intent=turn.intent,
+        mhi=int(turn.mhi),
+        category=turn.category,
+    )
+
+
+# Crisis fast lane
+
+def _spawn_background(coro) -> asyncio.Task:
+    """Runs *coro* after the response is sent; lifespan drains these on shutdown."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _finish_fast_lane_turn(user_id, body: ChatRequest, signals: SignalScan, response: str) -> None:
+    """Full analytics for a turn already answered by the crisis fast lane."""
+    try:
+        turn = await _analyze_turn(user_id, body.message, signals)
+        await _persist_turn(user_id, body, response, turn)
+    except Exception as exc:
+        logger.error("Crisis fast lane | background analysis/persist failed: %s", exc)
+
+
+async def _write_provisional_turn(user_id, body: ChatRequest, response: str, provisional: dict) -> tuple[dict, tuple]:
+    """
+    Writes a fast-lane turn with its rule/keyword analytics. History is read
+    first, so the deferred analysis doesn't count this turn as its own history.
+    """
+    history = (await _HISTORY_GRAPH.run(user_id=user_id))["history"]
+    saved = await _persist(
+        user_id, body.message, response, provisional["emotion_scores"], provisional["crisis_score"],
+        provisional["crisis_tier"], provisional["behavioral_score"], 0.0, 0.5, "crisis",
+        provisional["mhi"], provisional["category"], body.language_code, body.source,
+    )
+    return saved, history
+
+
+async def _revise_fast_lane_turn(user_id, body: ChatRequest, signals: SignalScan, response: str, write: asyncio.Task) -> None:
+    """Replaces the provisional analytics of a fast-lane turn once its write lands."""
+    try:
+        saved, history = await write
+    except Exception as exc:
+        logger.error("Crisis fast lane | provisional write failed (%s); persisting after the full analysis", exc)
+        await _finish_fast_lane_turn(user_id, body, signals, response)
+        return
+    try:
+        turn = await _analyze_turn(user_id, body.message, signals, history=history)
+        revised = {
+            "emotion_scores":   turn.emotion_scores,
+            "crisis_score":     round(turn.crisis_score, 4),
+            "crisis_tier":      turn.crisis_tier,
+            "behavioral_score": round(turn.behavioral_score, 4),
+            "screening_score":  round(turn.screening_score, 4),
+            "history_score":    round(turn.history_score, 4),
+            "intent":           turn.intent,
+            "mhi":              int(turn.mhi),
+            "category":         turn.category,
+        }
+        await db.conversations.update_one({"_id": saved["_id"]}, {"$set": revised})
+        await user_state_service.revise_turn(user_id, saved, revised)
+        await db.users.update_one(
+            {"_id": user_id, "latest_mhi": saved["mhi"]},   # unless a later turn set it
+            {"$set": {"latest_mhi": revised["mhi"]}},
+        )
+    except Exception as exc:
+        logger.error("Crisis fast lane | background analysis/revision failed: %s", exc)
+
+
+async def _crisis_fast_lane(user_id, body: ChatRequest, signals: SignalScan, crisis) -> ChatResponse:
+    """
+    Answers a rule-confirmed active/passive crisis before any model or DB work.
+
+    The helpline template only depends on the rule tier, so the reply goes
+    out immediately with provisional keyword/rule analytics; the full
+    emotion/crisis/MHI analysis and persistence finish in the background.
+    With PERSIST_SYNC_CRISIS the turn is written with the provisional
+    analytics before returning (for at most CHAT_DB_TIMEOUT_S), and the
+    background analysis revises them.
+    """
+    emotion_scores = emotion_service.keyword_predict(body.message, signals)
+    emotion_label  = max(emotion_scores, key=emotion_scores.get)
+    behavioral     = behavioral_service.predict(body.message, signals)   # rules over the same scan
+    mhi = matrix_service.compute(
+        emotion_score    = emotion_scores[emotion_label],
+        crisis_score     = crisis.score,
+        emotion_label    = emotion_label,
+        behavioral_score = behavioral,
+        crisis_tier      = crisis.tier,
+        raw_text         = body.message,
+        signals          = signals,
+    )
+    category = matrix_service.categorize(mhi, crisis.score, crisis.tier)
+
+    logger.info(
+        "CRISIS FAST LANE | tier=%s rule=%s score=%.3f | models + RAG deferred",
+        crisis.tier, crisis.matched_rule, crisis.score,
+    )
+    final_response = safety_service.validate_response(
+        response     = "",
+        crisis_score = crisis.score,
+        crisis_tier  = crisis.tier,
+        category     = category,
+        llm_failed   = False,
+    )
+    if settings.PERSIST_SYNC_CRISIS:
+        write = _spawn_background(_write_provisional_turn(user_id, body, final_response, {
+            "emotion_scores":   emotion_scores,
+            "crisis_score":     crisis.score,
+            "crisis_tier":      crisis.tier,
+            "behavioral_score": behavioral,
+            "mhi":              mhi,
+            "category":         category,
+        }))
+        _spawn_background(_revise_fast_lane_turn(user_id, body, signals, final_response, write))
+        await _write_before_reply(write)
+    else:
+        _spawn_background(_finish_fast_lane_turn(user_id, body, signals, final_response))
+    metrics.CRISIS_TIER_TOTAL.labels(crisis.tier).inc()
+
+    return ChatResponse(
+        response=final_response, emotion_scores=emotion_scores,
+        crisis_score=round(crisis.score, 4), crisis_tier=crisis.tier,
+        intent="crisis", mhi=int(mhi), category=category,
+    )
+
+
+@app.post("/chat", response_model=ChatResponse, summary="Full chat pipeline")
+async def chat(
+    body: ChatRequest,
+    response: Response,
+    user_id: ObjectId = Depends(get_current_user),
+):
+    # Step 0: One lexical scan shared by every rule-based service (memoized,
+    # so the emotion / crisis batch workers reuse it as well)
+    signals = signal_engine.scan(body.message)
+
+    # Crisis fast lane — active/passive rules decide the template on their own
+    rule_crisis = crisis_service.assess_rules(body.message, signals)
+    if rule_crisis.tier in ("active", "passive"):
+        return await _crisis_fast_lane(user_id, body, signals, rule_crisis)
+
+    # Analysis → MHI → retrieval → generation → safety → persistence;
+    # model-detected crises skip retrieval + generation
+    run = await _CHAT_GRAPH.run(
+        user_id=user_id, body=body, message=body.message, signals=signals,
+    )
+    response.headers["Server-Timing"] = run.server_timing()
+    _record_stages("chat", run)
+
+    return _chat_response(run["safety"], run["mhi"])
+
+
+def _record_stages(route: str, run) -> None:
+    for stage, timing in run.timings.items():
+        metrics.CHAT_STAGE_SECONDS.labels(stage).observe(timing.duration_ms / 1000)
+    metrics.CHAT_STAGE_SECONDS.labels("total").observe(run.total_ms / 1000)
+    logger.info("%s stages | %s | total=%.0fms", route, run.summary(), run.total_ms)
+
+
+#  POST /chat/stream
+# Same pipeline as /chat, but the reply streams as Server-Sent Events:
+#   analysis  emotion / crisis / intent / MHI / category, before generation
+#   token     {"text": ...} reply text as it clears the safety checks
+#   replace   {"text": ...} blocked or failed reply: supersedes all tokens
+#   done      the full ChatResponse, once the turn is final
+# The turn is persisted when the stream ends, including on client disconnect.
+
+_STREAM_GRAPH = _ANALYSIS_GRAPH.extend([_RETRIEVAL_STAGE])
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _analysis_event(result: ChatResponse) -> str:
+    return _sse("analysis", result.model_dump(exclude={"response"}))
+
+
+async def _stream_reply(run, validator) -> AsyncIterator[str]:
+    """
+    Yields the reply as the validator releases it. Closing the LLM stream
+    once the sentence target is reached (or the client goes away) stops
+    generation at the provider.
+    """
+    turn: TurnAnalysis = run["mhi"]
+    body: ChatRequest  = run["body"]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CHAT_LLM_TIMEOUT_S
+    chunks = rag_service.stream_response(
+        body.message, turn.emotion_label, turn.emotion_score, turn.intent, turn.mhi,
+        turn.crisis_score, turn.crisis_tier, turn.category, body.language_code,
+        turn.history_snapshot.get("conversation_pairs"), run["retrieval"], str(run["user_id"]),
+    )
+    failed = False
+    try:
+        while not validator.done:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            text = validator.feed(chunk)
+            if text:
+                yield text
+    except Exception as exc:   # timeout, provider error
+        logger.error("chat stream | generation failed (%r); using fallback", exc)
+        failed = True
+    finally:
+        await chunks.aclose()
+    tail = validator.finish(llm_failed=failed)
+    if tail:
+        yield tail
+
+
+async def _chat_events(user_id, body: ChatRequest, run, started: float) -> AsyncIterator[str]:
+    turn: TurnAnalysis = run["mhi"]
+    result = _chat_response("", turn)
+    yield _analysis_event(result)
+
+    if _model_crisis(run):
+        logger.info("CRISIS early-exit | tier=%s score=%.3f | RAG skipped", turn.crisis_tier, turn.crisis_score)
+        reply = safety_service.validate_response("", turn.crisis_score, turn.crisis_tier, turn.category)
+        write = _spawn_background(_persist_turn(user_id, body, reply, turn))
+        if _sync_crisis(turn.crisis_tier):
+            await _write_before_reply(write)
+        metrics.CHAT_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+        yield _sse("token", {"text": reply})
+        result.response = reply
+        yield _sse("done", result.model_dump())
+        return
+
+    validator = safety_service.stream(turn.crisis_score, turn.crisis_tier, turn.category)
+    first = True
+    try:
+        async for text in _stream_reply(run, validator):
+            if first:
+                metrics.CHAT_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                first = False
+            yield _sse("token", {"text": text})
+        if validator.replaced:
+            yield _sse("replace", {"text": validator.text})
+    finally:
+        # Runs on normal completion and on disconnect (the generator is closed)
+        validator.finish(llm_failed=True)
+        _spawn_background(_persist_turn(user_id, body, validator.text, turn))
+    result.response = validator.text
+    yield _sse("done", result.model_dump())
+
+
+async def _single_reply_events(result: ChatResponse, started: float) -> AsyncIterator[str]:
+    yield _analysis_event(result)
+    metrics.CHAT_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+    yield _sse("token", {"text": result.response})
+    yield _sse("done", result.model_dump())
+
+
+@app.post("/chat/stream", summary="Chat pipeline with the reply streamed as Server-Sent Events")
+async def chat_stream(
+    body: ChatRequest,
+    user_id: ObjectId = Depends(get_current_user),
+):
+    started = time.perf_counter()
+    signals = signal_engine.scan(body.message)
+
+    # Crisis fast lane: the helpline template goes out as a single token
+    rule_crisis = crisis_service.assess_rules(body.message, signals)
+    if rule_crisis.tier in ("active", "passive"):
+        result = await _crisis_fast_lane(user_id, body, signals, rule_crisis)
+        return StreamingResponse(
+            _single_reply_events(result, started), media_type="text/event-stream", headers=_SSE_HEADERS,
+        )
+
+    # Analysis → MHI → retrieval up front; generation streams in the response
+    run = await _STREAM_GRAPH.run(
+        user_id=user_id, body=body, message=body.message, signals=signals,
+    )
+    _record_stages("chat stream", run)
+    return StreamingResponse(
+        _chat_events(user_id, body, run, started), media_type="text/event-stream",
+        headers={**_SSE_HEADERS, "Server-Timing": run.server_timing()},
     )
 
 
@@ -430,7 +1182,9 @@ async def voice_transcribe(
     logger.debug("STT | %d bytes | fmt=%s | user=%s", len(audio_bytes), fmt, user_id)
 
     try:
-        result = await _run_in_thread(voice_service.transcribe, audio_bytes, fmt, language)
+        result = await stt_executor.run(voice_service.transcribe, audio_bytes, fmt, language)
+    except Overloaded as exc:
+        raise _overloaded(exc)
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
 
@@ -467,13 +1221,15 @@ async def voice_speak(
     )
 
     try:
-        audio_bytes = await _run_in_thread(
+        audio_bytes = await tts_executor.run(
             voice_service.synthesize,
             body.text,
             body.language_code,
             body.emotion_label,
             body.crisis_tier,
         )
+    except Overloaded as exc:
+        raise _overloaded(exc)
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
 
@@ -509,6 +1265,7 @@ async def submit_assessment(
         },
         upsert=False,
     )
+    user_context_cache.update_screening(user_id, phq2, gad2)
 
     screening_score = screening_service.compute(phq2, gad2)
     flags           = screening_service.get_flags(phq2, gad2)
@@ -573,20 +1330,23 @@ async def user_timeline(
 async def user_dashboard_summary(
     user_id: ObjectId = Depends(get_current_user),
 ):
-    user = await db.users.find_one({"_id": user_id}) or {}
-    recent = await db.get_recent_conversations(user_id, limit=7)
-    recent_sorted = sorted(recent, key=lambda item: item.get("timestamp") or datetime.utcnow())
+    # Two _id lookups: the profile and the materialised user_state document
+    user, state = await asyncio.gather(
+        db.users.find_one({"_id": user_id}),
+        user_state_service.get(user_id),
+    )
+    if state is None:
+        # History from before user_state existed: build it now, once
+        state = await user_state_service.rebuild(user_id)
+    user = user or {}
+    recent_sorted = list(reversed(state.get("recent_turns", [])[:7]))   # oldest first
 
     latest_mhi = int(
-        (recent_sorted[-1].get("mhi") if recent_sorted else None)
+        state.get("last_mhi")
         or user.get("latest_mhi")
         or user.get("baseline_mhi", 75)
     )
-    category = (
-        recent_sorted[-1].get("category")
-        if recent_sorted
-        else matrix_service.categorize(latest_mhi, 0.0, "none")
-    )
+    category = state.get("last_category") or matrix_service.categorize(latest_mhi, 0.0, "none")
     weekly_trend = [int(entry.get("mhi", latest_mhi)) for entry in recent_sorted][-7:]
     if not weekly_trend:
         weekly_trend = [latest_mhi]
@@ -617,12 +1377,18 @@ async def user_dashboard_summary(
             }
         )
 
+    this_week   = state.get("weekly", {}).get(week_key(datetime.utcnow()), {})
+    check_ins   = int(state.get("count", 0))
+    average_mhi = round(state["mhi_sum"] / check_ins) if check_ins else latest_mhi
+
     return {
         "displayName": user.get("name") or user.get("email", "User").split("@")[0].title(),
         "email": user.get("email", ""),
         "latestMhi": latest_mhi,
         "category": category,
-        "checkInsThisWeek": len(recent_sorted),
+        "checkInsThisWeek": int(this_week.get("count", 0)),
+        "totalCheckIns": check_ins,
+        "averageMhi": average_mhi,
         "streakDays": min(len(recent_sorted), 30),
         "voiceEnabled": True,
         "weeklyTrend": weekly_trend,
@@ -0,0 +1,165 @@
+"""
+Pre-fork serving: load every model once, then fork workers that share it.
+
+    python -m backend.prefork --workers 4 --host 0.0.0.0 --port 8000
+
+The master imports the app and loads and warms every fork-safe model
+(ModelLifecycle.preload). It then moves everything allocated so far into
+the GC's permanent generation (gc.freeze), binds the listening socket and
+forks the workers. Each worker serves that socket with uvicorn. The weights
+are pages no worker writes to, so the kernel keeps one physical copy
+whatever the worker count. Each worker then only adds its private memory.
+
+What keeps the fork safe:
+  * torch runs single-threaded while the master loads, so no OpenMP pool
+    exists at fork time. Each worker applies its own thread budget
+    (cores / workers) in lifespan.
+  * Tokenizer parallelism stays off.
+  * Whisper (CTranslate2) and ONNX Runtime sessions start native threads
+    when they are constructed. They are registered fork_safe=False and
+    every worker loads its own copy after the fork.
+  * Nothing connects to Mongo or starts executor threads before the fork;
+    motor connects lazily.
+
+Each worker logs a self-check once it is serving: its resident memory
+split into shared and private. It warns when private memory exceeds
+PREFORK_WORKER_MEMORY_MB. GET /health/memory returns the same figures live.
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from backend.config import settings
+from backend.services.process_memory import memory_usage
+from backend.services.thread_budget import available_cpus
+
+try:
+    import torch
+except ImportError:  # pragma: no cover - depends on local env
+    torch = None
+
+logger = logging.getLogger("backend.prefork")
+
+
+async def _serve(server: uvicorn.Server, sock: socket.socket, index: int) -> None:
+    task = asyncio.get_running_loop().create_task(server.serve(sockets=[sock]))
+    while not server.started and not task.done():
+        await asyncio.sleep(0.05)
+    if server.started:
+        _self_check(index)
+    await task
+
+
+def _self_check(index: int) -> None:
+    usage = memory_usage()
+    if not usage:
+        logger.info("Worker %d (pid %d) | serving; /proc memory figures unavailable", index, os.getpid())
+        return
+    logger.info(
+        "Worker %d (pid %d) | serving | rss=%.0f MB shared=%.0f MB private=%.0f MB pss=%.0f MB",
+        index, os.getpid(), usage["rss_mb"], usage["shared_mb"], usage["private_mb"], usage["pss_mb"],
+    )
+    if usage["private_mb"] > settings.PREFORK_WORKER_MEMORY_MB:
+        logger.warning(
+            "Worker %d | private memory %.0f MB exceeds the %d MB budget (PREFORK_WORKER_MEMORY_MB)",
+            index, usage["private_mb"], settings.PREFORK_WORKER_MEMORY_MB,
+        )
+
+
+def _run_worker(app, sock: socket.socket, index: int, log_level: str) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, lifespan="on"))
+    asyncio.run(_serve(server, sock, index))
+
+
+def _fork_worker(app, sock: socket.socket, index: int, log_level: str) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    status = 0
+    try:
+        _run_worker(app, sock, index, log_level)
+    except BaseException:
+        logger.exception("Worker %d crashed", index)
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: PREFORK_WORKERS or cores)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = args.workers or settings.PREFORK_WORKERS or available_cpus()
+    if not settings.THREAD_BUDGET_CPUS:
+        # Workers inherit settings: each budgets threads for its share of the cores
+        settings.THREAD_BUDGET_CPUS = max(1, available_cpus() // workers)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if torch is not None:
+        torch.set_num_threads(1)
+
+    from backend import main as app_module
+
+    started = time.perf_counter()
+    app_module.model_lifecycle.preload(fork_safe_only=True)
+    gc.collect()
+    gc.freeze()   # keep the GC from writing to (and so un-sharing) inherited objects
+    usage = memory_usage()
+    logger.info(
+        "Prefork master | models loaded in %.1fs | rss=%.0f MB shared copy-on-write with %d worker(s)",
+        time.perf_counter() - started, usage.get("rss_mb", 0.0), workers,
+    )
+
+    sock = socket.create_server((args.host, args.port), backlog=2048)
+    sock.set_inheritable(True)
+
+    children: dict[int, int] = {}
+    for index in range(workers):
+        children[_fork_worker(app_module.app, sock, index, args.log_level)] = index
+
+    stopping = False
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.warning("Worker %d (pid %d) exited with status %d; restarting", index, pid, status)
+        time.sleep(1.0)   # don't spin if a worker dies on startup
+        children[_fork_worker(app_module.app, sock, index, args.log_level)] = index
+
+    sock.close()
+    logger.info("Prefork master | all workers stopped")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from backend.services.crisis_service import CrisisAssessment
+from backend.services.signal_engine import normalize
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnalysisBundle:
+    """Stateless per-message classifier outputs — identical for every user."""
+    emotion_scores:   dict
+    crisis:           CrisisAssessment
+    intent:           str
+    behavioral_score: float
+    embedding:        Any = None   # shared MiniLM vector, reused by RAG retrieval
+
+
+class AnalysisCache:
+    """
+    Bounded LRU + TTL cache of AnalysisBundle keyed by normalised text.
+
+    Keys are sha256(normalize(text)): lowercasing and whitespace collapsing
+    are safe because every model is uncased and every rule already matches
+    the normalised form. ``version_fn`` returns a string identifying the
+    loaded models; when it changes (model swapped, fallback replaced by a
+    real model) the whole cache is dropped. Callers pass ``put`` the version
+    read before the analysis ran, so a bundle computed by a fallback that
+    was replaced mid-analysis is not stored under the new version. Nothing
+    is stored while ``ready_fn`` is false (models still loading).
+
+    History-dependent values (screening, history score, MHI) are never
+    cached — callers recompute those per user.
+    """
+
+    def __init__(
+        self,
+        version_fn: Callable[[], str],
+        *,
+        ready_fn: Callable[[], bool] = lambda: True,
+        max_entries: int = 4096,
+        ttl_seconds: float = 3600.0,
+    ):
+        self.version_fn  = version_fn
+        self.ready_fn    = ready_fn
+        self.max_entries = max(0, max_entries)
+        self.ttl         = max(0.0, ttl_seconds)
+
+        self._entries: OrderedDict[str, tuple[float, AnalysisBundle]] = OrderedDict()
+        self._lock    = threading.Lock()
+        self._version: str | None = None
+
+        # Metrics
+        self._hits          = 0
+        self._misses        = 0
+        self._expired       = 0
+        self._evictions     = 0
+        self._invalidations = 0
+        self._skipped       = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+    # Public API
+
+    def get(self, text: str) -> AnalysisBundle | None:
+        if not self.max_entries:
+            return None
+        key = self.key(text)
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, bundle = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._expired += 1
+                self._misses  += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return bundle
+
+    def put(self, text: str, bundle: AnalysisBundle, version: str) -> None:
+        """Stores *bundle* unless the models changed since *version* was read or aren't all ready."""
+        if not self.max_entries:
+            return
+        key = self.key(text)
+        with self._lock:
+            self._check_version()
+            if version != self._version or not self.ready_fn():
+                self._skipped += 1
+                return
+            self._entries[key] = (time.monotonic(), bundle)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self) -> None:
+        """Drops every entry (e.g. after an explicit model reload)."""
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries":       len(self._entries),
+                "max_entries":   self.max_entries,
+                "ttl_seconds":   self.ttl,
+                "model_version": self._version,
+                "hits":          self._hits,
+                "misses":        self._misses,
+                "hit_rate":      round(self._hits / lookups, 4) if lookups else 0.0,
+                "expired":       self._expired,
+                "evictions":     self._evictions,
+                "invalidations": self._invalidations,
+                "skipped":       self._skipped,
+            }
+
+    # Internals
+
+    def _check_version(self) -> None:
+        """Caller holds the lock."""
+        version = self.version_fn()
+        if version != self._version:
+            if self._version is not None and self._entries:
+                logger.info(
+                    "AnalysisCache | model version %s → %s, dropping %d entries",
+                    self._version, version, len(self._entries),
+                )
+                self._entries.clear()
+                self._invalidations += 1
+            self._version = version
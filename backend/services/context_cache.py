@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from backend.services.metrics import LLM_CONTEXT_CACHE_EVENTS_TOTAL
+from backend.services.prompt_budget import count_cached
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class _Entry:
+    name:         str | None = None
+    expires:      float = 0.0
+    pending:      asyncio.Task | None = None
+    failed_until: float = 0.0
+
+
+class ContextCache:
+    """
+    Provider-side cache handles for stable prompt prefixes.
+
+    ``lookup(prefix)`` never waits on the provider. If a live handle exists
+    it is returned, and a handle within ``refresh_s`` of expiring has its
+    TTL extended in the background. Otherwise the call goes out uncached
+    and the cache is created in the background for the calls after it.
+    Prefixes shorter than the provider's minimum (``min_tokens``) are never
+    cached. A failed create is not retried for ``retry_s``. Prefixes that
+    stop being used simply expire on the provider.
+
+    ``create(prefix, ttl_s) -> name``, ``extend(name, ttl_s)`` and
+    ``delete(name)`` are the provider client's cache calls.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[str, float], Awaitable[str]],
+        extend: Callable[[str, float], Awaitable[None]],
+        delete: Callable[[str], Awaitable[None]],
+        *,
+        ttl_s: float = 3600.0,
+        refresh_s: float = 300.0,
+        min_tokens: int = 1024,
+        retry_s: float = 600.0,
+    ):
+        self._create    = create
+        self._extend    = extend
+        self._delete    = delete
+        self.ttl_s      = ttl_s
+        self.refresh_s  = min(refresh_s, ttl_s / 2)
+        self.min_tokens = min_tokens
+        self.retry_s    = retry_s
+        self._entries: dict[str, _Entry] = {}
+        self._events = dict.fromkeys(("hit", "miss", "created", "extended", "failed", "invalidated"), 0)
+
+    def lookup(self, prefix: str) -> str | None:
+        """The cache handle for *prefix*, or None to send it inline this time."""
+        if not prefix or count_cached(prefix) < self.min_tokens:
+            return None
+        now = time.monotonic()
+        entry = self._entries.setdefault(prefix, _Entry())
+        if entry.name is not None and now < entry.expires - 1.0:
+            if entry.expires - now < self.refresh_s and entry.pending is None:
+                entry.pending = asyncio.ensure_future(self._refresh(entry))
+            self._event("hit")
+            return entry.name
+        entry.name = None
+        if entry.pending is None and now >= entry.failed_until:
+            entry.pending = asyncio.ensure_future(self._populate(prefix, entry))
+        self._event("miss")
+        return None
+
+    def invalidate(self, prefix: str) -> None:
+        """The provider no longer knows the handle (expired or deleted early)."""
+        entry = self._entries.get(prefix)
+        if entry is not None and entry.name is not None:
+            entry.name = None
+            self._event("invalidated")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "prefixes":    len(self._entries),
+            "live":        sum(1 for e in self._entries.values() if e.name and e.expires > now),
+            "min_tokens":  self.min_tokens,
+            "ttl_s":       self.ttl_s,
+            **self._events,
+        }
+
+    async def aclose(self) -> None:
+        """Deletes live handles so the provider stops billing their storage."""
+        for entry in self._entries.values():
+            if entry.pending is not None:
+                entry.pending.cancel()
+            if entry.name is not None:
+                try:
+                    await self._delete(entry.name)
+                except Exception as exc:
+                    logger.debug("ContextCache | delete %s failed: %s", entry.name, exc)
+        self._entries.clear()
+
+    # Internals
+
+    async def _populate(self, prefix: str, entry: _Entry) -> None:
+        try:
+            name = await self._create(prefix, self.ttl_s)
+        except Exception as exc:
+            entry.failed_until = time.monotonic() + self.retry_s
+            self._event("failed")
+            logger.warning("ContextCache | create failed; sending the prefix inline for %.0fs: %s", self.retry_s, exc)
+        else:
+            entry.name, entry.expires = name, time.monotonic() + self.ttl_s
+            self._event("created")
+        finally:
+            entry.pending = None
+
+    async def _refresh(self, entry: _Entry) -> None:
+        name = entry.name
+        try:
+            await self._extend(name, self.ttl_s)
+        except Exception as exc:
+            logger.warning("ContextCache | extending %s failed; it will be recreated: %s", name, exc)
+        else:
+            if entry.name == name:
+                entry.expires = time.monotonic() + self.ttl_s
+                self._event("extended")
+        finally:
+            entry.pending = None
+
+    def _event(self, event: str) -> None:
+        self._events[event] += 1
+        LLM_CONTEXT_CACHE_EVENTS_TOTAL.labels(event).inc()
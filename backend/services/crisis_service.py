@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import os
-import re
 import logging
-
-import torch
-from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+from dataclasses import dataclass
 
 from backend.config import settings
+from backend.services.inference_backend import SequenceClassifier, load_classifier
+from backend.services.signal_engine import (
+    CRISIS_ACTIVE,
+    CRISIS_PASSIVE,
+    CRISIS_DISTRESS,
+    SignalScan,
+    scan,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,70 +21,46 @@ _LOCAL_PATH = os.path.abspath(
     settings.CRISIS_MODEL_PATH
 )
 
-# Active suicidal intent patterns — hard floor 0.90 
-_ACTIVE: list[tuple[re.Pattern, float]] = [
-    (re.compile(r"\b(kill\s+myself|killing\s+myself)\b",                        re.I), 0.97),
-    (re.compile(r"\b(end\s+my\s+life|ending\s+my\s+life)\b",                   re.I), 0.95),
-    (re.compile(r"\b(want\s+to\s+die|want\s+to\s+be\s+dead)\b",                re.I), 0.93),
-    (re.compile(r"\b(going\s+to\s+(kill|hurt)\s+myself)\b",                    re.I), 0.96),
-    (re.compile(r"\b(suicide\s+plan|planned?\s+to\s+die)\b",                   re.I), 0.97),
-    (re.compile(r"\b(no\s+reason\s+to\s+(live|be\s+alive))\b",                 re.I), 0.90),
-    (re.compile(r"\b(better\s+off\s+dead|better\s+if\s+i\s+(died|was\s+gone))\b", re.I), 0.88),
-    (re.compile(r"\b(take\s+my\s+own\s+life)\b",                               re.I), 0.96),
-    (re.compile(r"\b(self[\s\-]harm|cut\s+myself|overdose\s+on)\b",            re.I), 0.91),
-]
-
-# Passive death-wish patterns — hard floor 0.60 
-_PASSIVE: list[tuple[re.Pattern, float]] = [
-    (re.compile(r"\b(wish\s+(i\s+was|i\s+were)\s+dead)\b",                     re.I), 0.78),
-    (re.compile(r"\b(don'?t\s+want\s+to\s+(be\s+here|exist|wake\s+up))\b",     re.I), 0.74),
-    (re.compile(r"\bwant\s+to\s+disappear\b",                                  re.I), 0.68),
-    (re.compile(r"\bjust\s+disappear\b",                                        re.I), 0.66),
-    (re.compile(r"\b(easier\s+if\s+i\s+(just\s+)?(disappeared|was\s+gone|wasnt?\s+here))\b", re.I), 0.78),
-    (re.compile(r"\beverything\s+would\s+be\s+easier\s+if\s+i\s+(was|were)\s+(gone|dead)\b", re.I), 0.80),
-    (re.compile(r"\b(tired\s+of\s+(living|being\s+alive|existing))\b",         re.I), 0.70),
-    (re.compile(r"\b(can'?t\s+(do\s+this|keep\s+going|go\s+on)\s+anymore)\b",  re.I), 0.65),
-    (re.compile(r"\b(want\s+to\s+end\s+(all|everything|it(\s+all)?))\b",       re.I), 0.72),
-    (re.compile(r"\b(pointless\s+to\s+(live|keep\s+going))\b",                 re.I), 0.68),
-    (re.compile(r"\b(feel\s+like\s+(dying|i\s+am\s+dying))\b",                 re.I), 0.74),
-    (re.compile(r"\b(wish\s+(everything|it\s+all)\s+would\s+end)\b",           re.I), 0.72),
-    (re.compile(r"\b(nobody\s+(cares|would\s+miss\s+me))\b",                   re.I), 0.62),
-    (re.compile(r"\b(burden\s+to\s+(everyone|others|my\s+family))\b",          re.I), 0.64),
-]
-
-# Distress signals — no hard floor, model + rule max 
-_DISTRESS: list[tuple[re.Pattern, float]] = [
-    (re.compile(r"\b(no\s+hope|hopeless|feel\s+empty)\b",           re.I), 0.44),
-    (re.compile(r"\b(so\s+much\s+pain|can'?t\s+take\s+the\s+pain)\b", re.I), 0.46),
-    (re.compile(r"\b(feel\s+like\s+giving\s+up)\b",                 re.I), 0.48),
-    (re.compile(r"\b(falling\s+apart|breaking\s+down)\b",           re.I), 0.40),
-    (re.compile(r"\b(completely\s+(lost|alone|isolated))\b",        re.I), 0.38),
-]
+# Active / passive / distress rule tables live in signal_engine.py
+# (groups crisis.active, crisis.passive, crisis.distress)
 
 # Tier severity order (higher index = more severe)
 _TIER_ORDER = {"none": 0, "distress": 1, "passive": 2, "active": 3}
 
 
+@dataclass
+class CrisisAssessment:
+    score:          float        # blended crisis probability in [0, 1]
+    tier:           str          # 'active' | 'passive' | 'distress' | 'none'
+    matched_rule:   str | None   # name of the signal-engine rule that fired, if any
+    model_score:    float        # raw model crisis probability (0.0 if unavailable)
+
+
 class CrisisService:
 
-    def __init__(self):
-        self.tokenizer = None
-        self.model     = None
+    def __init__(self, preload: bool = True):
+        self.classifier: SequenceClassifier | None = None
         self._loaded   = False
-        self._load()
+        if preload:
+            self.load()
 
     # Loading
 
-    def _load(self) -> None:
+    def load(self) -> None:
         path = os.getenv("CRISIS_MODEL_PATH", "").strip() or _LOCAL_PATH
         try:
-            self.tokenizer = DistilBertTokenizerFast.from_pretrained(path)
-            self.model     = DistilBertForSequenceClassification.from_pretrained(path)
-            self.model.eval()
-            self._loaded   = True
+            if settings.MULTITASK_MODEL_PATH:
+                # Shared encoder: the crisis head rides on the same forward pass
+                from backend.services.multitask_model import load_multitask_head
+
+                path = settings.MULTITASK_MODEL_PATH
+                self.classifier = load_multitask_head("crisis")
+            else:
+                self.classifier = load_classifier(path)
+            self._loaded    = True
             logger.info(
-                "CrisisService | loaded from: %s | labels: %s",
-                path, list(self.model.config.id2label.values()),
+                "CrisisService | loaded from: %s | backend: %s | labels: %s",
+                path, self.classifier.backend, list(self.classifier.id2label.values()),
             )
         except Exception as exc:
             logger.error(
@@ -88,16 +69,76 @@ class CrisisService:
             )
             self._loaded = False
 
+    @property
+    def available(self) -> bool:
+        return self._loaded
+
+    @property
+    def model_version(self) -> str:
+        """Identifies what produced predict() output; changes when the model is swapped."""
+        if not self._loaded or self.classifier is None:
+            return "rules"
+        return f"{self.classifier.backend}:{self.classifier.path}"
+
     # Public API
 
+    def assess(self, text: str, signals: SignalScan | None = None) -> CrisisAssessment:
+        """
+        Single-pass crisis assessment: one rule scan and one model forward pass.
+        Returns the blended score, the tier, the matched rule and the raw
+        model probability together so callers never need to run both
+        predict() and classify_tier() on the same message.
+        """
+        return self.assess_many([text], [signals])[0]
+
+    def assess_many(
+        self,
+        texts: list[str],
+        signals: list[SignalScan | None] | None = None,
+    ) -> list[CrisisAssessment]:
+        """Batched assess(): one padded forward pass for the whole list."""
+        model_scores = self._model_score_batch(texts)
+        signals = signals or [None] * len(texts)
+        results: list[CrisisAssessment] = []
+        for text, model_score, text_signals in zip(texts, model_scores, signals):
+            rule_score, tier, rule = self._rule_match(text, text_signals)
+            results.append(CrisisAssessment(
+                score        = self._blend(rule_score, tier, model_score),
+                tier         = tier if tier != "none" else self._model_tier(model_score),
+                matched_rule = rule,
+                model_score  = model_score,
+            ))
+        return results
+
+    def assess_rules(self, text: str, signals: SignalScan | None = None) -> CrisisAssessment:
+        """
+        Rule-only assessment (no model pass) — microseconds.
+        Used by the /chat crisis fast lane: an active/passive rule hit alone
+        decides the safety template, so the model can run afterwards.
+        """
+        rule_score, tier, rule = self._rule_match(text, signals)
+        return CrisisAssessment(
+            score        = self._blend(rule_score, tier, 0.0),
+            tier         = tier,
+            matched_rule = rule,
+            model_score  = 0.0,
+        )
+
     def predict(self, text: str) -> float:
         """
         Returns crisis probability in [0.0, 1.0].
         Rules set hard floors so obvious language is never under-scored.
         """
-        rule_score, tier = self._rule_score(text)
-        model_score      = self._model_score(text)
+        return self.assess(text).score
+
+    def classify_tier(self, text: str) -> str:
+        """Returns 'active' | 'passive' | 'distress' | 'none'"""
+        return self.assess(text).tier
+
+    # Internals 
 
+    @staticmethod
+    def _blend(rule_score: float, tier: str, model_score: float) -> float:
         if tier == "active":
             return round(max(rule_score, model_score, 0.90), 4)
         if tier == "passive":
@@ -106,13 +147,8 @@ class CrisisService:
             return round(max(rule_score, model_score), 4)
         return round(model_score, 4)
 
-    def classify_tier(self, text: str) -> str:
-        """Returns 'active' | 'passive' | 'distress' | 'none'"""
-        _, tier = self._rule_score(text)
-        if tier != "none":
-            return tier
-
-        model_score = self._model_score(text)
+    @staticmethod
+    def _model_tier(model_score: float) -> str:
         if model_score >= settings.SAFETY_OVERRIDE_THRESHOLD:
             return "active"
         if model_score >= settings.CRISIS_PROBABILITY_THRESHOLD:
@@ -121,63 +157,50 @@ class CrisisService:
             return "distress"
         return "none"
 
-    # Internals 
+    @staticmethod
+    def _rule_match(
+        text: str, signals: SignalScan | None = None,
+    ) -> tuple[float, str, str | None]:
+        """Returns (score, tier, rule name) for the highest-severity rule match."""
+        signals = signals or scan(text)
 
-    def _rule_score(self, text: str) -> tuple[float, str]:
-        """Returns (score, tier) for the highest-severity rule match."""
-        lowered = text.lower()
+        for group in (CRISIS_ACTIVE, CRISIS_PASSIVE, CRISIS_DISTRESS):
+            hit = signals.first(group)
+            if hit is not None:
+                return hit.weight, hit.label, hit.rule
 
-        for pattern, score in _ACTIVE:
-            if pattern.search(lowered):
-                return score, "active"
+        return 0.0, "none", None
 
-        for pattern, score in _PASSIVE:
-            if pattern.search(lowered):
-                return score, "passive"
-
-        for pattern, score in _DISTRESS:
-            if pattern.search(lowered):
-                return score, "distress"
-
-        return 0.0, "none"
-
-    def _model_score(self, text: str) -> float:
+    def _model_score_batch(self, texts: list[str]) -> list[float]:
         """
-        Returns the model's crisis probability.
+        Crisis probability per text from one padded forward pass.
         Handles both binary (crisis/no_crisis) and multi-class outputs.
         Falls back to 0.0 if model is unavailable.
         """
-        if not self._loaded:
-            return 0.0
+        if not self._loaded or not texts:
+            return [0.0] * len(texts)
         try:
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                padding=True,
-                max_length=128,
-            )
-            with torch.no_grad():
-                probs = torch.softmax(
-                    self.model(**inputs).logits, dim=1
-                ).squeeze()
+            probs    = self.classifier.predict_proba(texts)
+            id2label = self.classifier.id2label
+            return [self._crisis_probability(row, id2label) for row in probs.tolist()]
 
-            id2label = self.model.config.id2label
-            crisis_score = 0.0
+        except Exception as exc:
+            logger.error("CrisisService._model_score_batch error: %s", exc)
+            return [0.0] * len(texts)
 
-            for idx, prob in enumerate(probs.tolist()):
-                label = id2label.get(idx, "").lower()
-                # Accept any label that clearly signals crisis
-                if any(kw in label for kw in
-                       ("crisis", "active", "suicide", "harm", "label_1")):
-                    crisis_score = max(crisis_score, prob)
+    @staticmethod
+    def _crisis_probability(row: list[float], id2label: dict) -> float:
+        crisis_score = 0.0
 
-            # If model uses plain LABEL_0 / LABEL_1 binary, take index-1 as crisis
-            if crisis_score == 0.0 and len(probs) == 2:
-                crisis_score = probs[1].item()
+        for idx, prob in enumerate(row):
+            label = id2label.get(idx, "").lower()
+            # Accept any label that clearly signals crisis
+            if any(kw in label for kw in
+                   ("crisis", "active", "suicide", "harm", "label_1")):
+                crisis_score = max(crisis_score, prob)
 
-            return round(crisis_score, 4)
+        # If model uses plain LABEL_0 / LABEL_1 binary, take index-1 as crisis
+        if crisis_score == 0.0 and len(row) == 2:
+            crisis_score = row[1]
 
-        except Exception as exc:
-            logger.error("CrisisService._model_score error: %s", exc)
-            return 0.0
+        return round(crisis_score, 4)
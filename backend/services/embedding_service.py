@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover - depends on local env
+    SentenceTransformer = None
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """
+    Owns the one SentenceTransformer instance used by intent classification
+    and RAG retrieval.
+
+    Embeddings are L2-normalised. all-MiniLM-L6-v2 already ends in a
+    Normalize layer, so these are the same vectors the FAISS index was
+    built from and the same vectors IntentService always compared against.
+    """
+
+    def __init__(self, model_name: str | None = None, preload: bool = True):
+        self.model_name = model_name or settings.SENTENCE_MODEL_NAME
+        self.model = None
+        if preload:
+            self.load()
+
+    def load(self) -> None:
+        if SentenceTransformer is None:
+            logger.warning("EmbeddingService | sentence-transformers not installed")
+            return
+        try:
+            self.model = SentenceTransformer(self.model_name)
+            logger.info("EmbeddingService | loaded: %s", self.model_name)
+        except Exception as exc:
+            logger.error("EmbeddingService | failed to load %s: %s", self.model_name, exc)
+            self.model = None
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    @property
+    def model_version(self) -> str:
+        return self.model_name if self.model is not None else "unavailable"
+
+    def encode(self, text: str) -> np.ndarray | None:
+        """Single normalised embedding, or None when the model is unavailable."""
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """
+        Batched encode — one transformer pass for the whole list.
+        Returns one vector per text (None for each when the model is unavailable).
+        """
+        if self.model is None or not texts:
+            return [None] * len(texts)
+        vectors = self.model.encode(
+            texts,
+            batch_size=max(len(texts), 1),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return list(np.asarray(vectors, dtype=np.float32))
+
+
+_embedding_service: EmbeddingService | None = None
+_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Process-wide shared instance (loaded on first use)."""
+    global _embedding_service
+    with _lock:
+        if _embedding_service is None:
+            _embedding_service = EmbeddingService()
+    return _embedding_service
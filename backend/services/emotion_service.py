@@ -4,10 +4,16 @@ import os
 import re
 import logging
 
-import torch
-from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
-
 from backend.config import settings
+from backend.services.inference_backend import SequenceClassifier, load_classifier
+from backend.services.signal_engine import (
+    EMOTION_HOPELESS,
+    EMOTION_INTENSIFIER,
+    EMOTION_KEYWORD,
+    EMOTION_NEGATION,
+    SignalScan,
+    scan,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,42 +40,34 @@ _LABEL_MAP: dict[str, str] = {
     "label_4":    "neutral",  "label_5":   "neutral",
 }
 
-_KEYWORD_RULES: list[tuple[re.Pattern, str, float]] = [
-    (re.compile(r"\b(sad|cry(ing)?|depress(ed|ing)?|grief|loss|heartbreak|empty|numb|lonely|disappear)\b", re.I), "sadness", 0.46),
-    (re.compile(r"\b(anxious|anxiety|worr(y|ied|ying)|nervous|panic(king)?|restless|racing\s+thoughts?)\b", re.I), "anxiety", 0.48),
-    (re.compile(r"\b(stress(ed|ful)?|overwhelm(ed|ing)?|exhaust(ed|ing)?|burnout|pressure|drained|too\s+much)\b", re.I), "stress", 0.46),
-    (re.compile(r"\b(afraid|scared|fear(ful)?|terrif(ied|ying)?|dread|unsafe)\b", re.I), "fear", 0.50),
-    (re.compile(r"\b(angry|anger|furious|rage|hate|frustrat(ed|ing)?|irritat(ed|ing)?)\b", re.I), "anger", 0.42),
-]
-
-_INTENSIFIERS = re.compile(
-    r"\b(very|really|extremely|so|too|super|deeply|completely|totally|constantly)\b",
-    re.I,
-)
-_NEGATIONS = re.compile(r"\b(not|never|hardly|barely|don't|cant|can't|isn't|wasn't)\b", re.I)
+# Keyword, intensifier, negation and hopeless rule tables live in signal_engine.py
 _QUESTION_RE = re.compile(r"\?$")
-_HOPELESS_EMOTION = re.compile(r"\b(disappear|gone|dead|empty|numb|hopeless|pointless)\b", re.I)
 
 
 class EmotionService:
 
-    def __init__(self):
-        self.tokenizer = None
-        self.model     = None
+    def __init__(self, preload: bool = True):
+        self.classifier: SequenceClassifier | None = None
         self._loaded   = False
-        self._load()
+        if preload:
+            self.load()
 
     # Loading
-    def _load(self) -> None:
+    def load(self) -> None:
         path = os.getenv("EMOTION_MODEL_PATH", "").strip() or _LOCAL_PATH
         try:
-            self.tokenizer = DistilBertTokenizerFast.from_pretrained(path)
-            self.model     = DistilBertForSequenceClassification.from_pretrained(path)
-            self.model.eval()
-            self._loaded   = True
+            if settings.MULTITASK_MODEL_PATH:
+                # Shared encoder: the emotion head rides on the same forward pass
+                from backend.services.multitask_model import load_multitask_head
+
+                path = settings.MULTITASK_MODEL_PATH
+                self.classifier = load_multitask_head("emotion")
+            else:
+                self.classifier = load_classifier(path)
+            self._loaded    = True
             logger.info(
-                "EmotionService | loaded from: %s | model labels: %s",
-                path, list(self.model.config.id2label.values()),
+                "EmotionService | loaded from: %s | backend: %s | model labels: %s",
+                path, self.classifier.backend, list(self.classifier.id2label.values()),
             )
         except Exception as exc:
             logger.error(
@@ -78,57 +76,82 @@ class EmotionService:
             )
             self._loaded = False
 
+    @property
+    def available(self) -> bool:
+        return self._loaded
+
+    @property
+    def model_version(self) -> str:
+        """Identifies what produced predict() output; changes when the model is swapped."""
+        if not self._loaded or self.classifier is None:
+            return "keywords"
+        return f"{self.classifier.backend}:{self.classifier.path}"
+
     # Public API
 
-    def predict(self, text: str) -> dict[str, float]:
+    def predict(self, text: str, signals: SignalScan | None = None) -> dict[str, float]:
         """
         Returns canonical emotion score dict.
         All 6 labels always present, values sum to 1.0.
         """
-        keyword_scores = self._keyword_scores(text)
-        if self._loaded:
+        return self.predict_many([text], [signals])[0]
+
+    def predict_many(
+        self,
+        texts: list[str],
+        signals: list[SignalScan | None] | None = None,
+    ) -> list[dict[str, float]]:
+        """
+        Batched predict(): one padded forward pass for the whole list.
+        Results are returned in input order.
+        """
+        signals = [s or scan(t) for t, s in zip(texts, signals or [None] * len(texts))]
+        keyword_scores = [self._keyword_scores(t, s) for t, s in zip(texts, signals)]
+        if self._loaded and texts:
             try:
-                return self._blend_scores(self._model_predict(text), keyword_scores, text)
+                return [
+                    self._blend_scores(model_scores, kw_scores, text, text_signals)
+                    for model_scores, kw_scores, text, text_signals
+                    in zip(self._model_predict_batch(texts), keyword_scores, texts, signals)
+                ]
             except Exception as exc:
                 logger.error("EmotionService.predict runtime error: %s", exc)
         return keyword_scores
 
+    def keyword_predict(self, text: str, signals: SignalScan | None = None) -> dict[str, float]:
+        """Keyword-only scores (no model pass) for latency-critical paths."""
+        return self._keyword_scores(text, signals)
+
     #  Internals
     def _model_predict(self, text: str) -> dict[str, float]:
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=128,
-        )
-        with torch.no_grad():
-            probs = torch.softmax(
-                self.model(**inputs).logits, dim=1
-            ).squeeze()
-
-        id2label = self.model.config.id2label
-        scores: dict[str, float] = {lbl: 0.0 for lbl in CANONICAL_LABELS}
-
-        for idx, prob in enumerate(probs.tolist()):
-            raw    = id2label.get(idx, f"label_{idx}").lower()
-            canon  = _LABEL_MAP.get(raw, "neutral")
-            scores[canon] = scores[canon] + prob
+        return self._model_predict_batch([text])[0]
 
-        total = sum(scores.values()) or 1.0
-        return {k: round(v / total, 4) for k, v in scores.items()}
+    def _model_predict_batch(self, texts: list[str]) -> list[dict[str, float]]:
+        probs    = self.classifier.predict_proba(texts)
+        id2label = self.classifier.id2label
+        results: list[dict[str, float]] = []
+
+        for row in probs.tolist():
+            scores: dict[str, float] = {lbl: 0.0 for lbl in CANONICAL_LABELS}
+            for idx, prob in enumerate(row):
+                raw    = id2label.get(idx, f"label_{idx}").lower()
+                canon  = _LABEL_MAP.get(raw, "neutral")
+                scores[canon] = scores[canon] + prob
+
+            total = sum(scores.values()) or 1.0
+            results.append({k: round(v / total, 4) for k, v in scores.items()})
+        return results
 
     @staticmethod
-    def _keyword_scores(text: str) -> dict[str, float]:
+    def _keyword_scores(text: str, signals: SignalScan | None = None) -> dict[str, float]:
         lowered = text.strip().lower()
+        signals = signals or scan(text)
         scores = {lbl: 0.03 for lbl in CANONICAL_LABELS}
 
-        for pattern, label, weight in _KEYWORD_RULES:
-            matches = len(pattern.findall(lowered))
-            if matches:
-                scores[label] += min(weight + (matches - 1) * 0.08, 0.68)
+        for hit in signals.group(EMOTION_KEYWORD):
+            scores[hit.label] += min(hit.weight + (hit.count - 1) * 0.08, 0.68)
 
-        if _INTENSIFIERS.search(lowered):
+        if signals.has(EMOTION_INTENSIFIER):
             top_label = max(scores, key=scores.get)
             if top_label != "neutral":
                 scores[top_label] += 0.08
@@ -136,7 +159,7 @@ class EmotionService:
         if _QUESTION_RE.search(lowered) and any(token in lowered for token in ("what if", "am i", "will i", "should i")):
             scores["anxiety"] += 0.10
 
-        if _NEGATIONS.search(lowered) and scores["anger"] > 0.03:
+        if signals.has(EMOTION_NEGATION) and scores["anger"] > 0.03:
             scores["anger"] = max(0.03, scores["anger"] - 0.06)
             scores["stress"] += 0.04
 
@@ -151,6 +174,7 @@ class EmotionService:
         model_scores: dict[str, float],
         keyword_scores: dict[str, float],
         text: str,
+        signals: SignalScan | None = None,
     ) -> dict[str, float]:
         keyword_top = max(keyword_scores, key=keyword_scores.get)
         use_keyword_heavier = keyword_top != "neutral" and keyword_scores[keyword_top] >= 0.28
@@ -183,7 +207,7 @@ class EmotionService:
             total = sum(normalized.values()) or 1.0
             normalized = {k: round(v / total, 4) for k, v in normalized.items()}
 
-        if _HOPELESS_EMOTION.search(text) and normalized["sadness"] >= 0.18 and normalized["anger"] > normalized["sadness"]:
+        if (signals or scan(text)).has(EMOTION_HOPELESS) and normalized["sadness"] >= 0.18 and normalized["anger"] > normalized["sadness"]:
             shift = min(0.16, normalized["anger"] - normalized["sadness"] + 0.02)
             normalized["anger"] = round(max(0.01, normalized["anger"] - shift), 4)
             normalized["sadness"] = round(normalized["sadness"] + shift, 4)
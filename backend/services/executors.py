@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from backend.services.metrics import LOAD_SHED_TOTAL
+
+
+class Overloaded(RuntimeError):
+    """Raised instead of queueing when a bounded executor or batcher is full."""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} is at capacity, try again shortly")
+        self.name = name
+
+
+class BoundedExecutor(Executor):
+    """
+    Named thread pool with a bounded backlog.
+
+    At most ``workers`` calls run at once and at most ``max_queue`` more
+    wait. submit() raises Overloaded beyond that instead of queueing, so
+    callers shed load straight away (a 503 or a degraded path) and latency
+    stays bounded. Usable wherever an Executor is (run_in_executor(), the
+    micro-batchers, ModelLifecycle).
+    """
+
+    def __init__(self, name: str, *, workers: int, max_queue: int):
+        self.name      = name
+        self.workers   = max(1, workers)
+        self.max_queue = max(0, max_queue)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()   # in_flight is decremented from worker threads
+        self._shed = LOAD_SHED_TOTAL.labels(name)
+
+        # Metrics
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected  = 0
+
+    # Public API
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                self._shed.inc()
+                raise Overloaded(self.name)
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Awaits fn(*args, **kwargs) on this pool; raises Overloaded when full."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self, partial(fn, *args, **kwargs))
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    def stats(self) -> dict:
+        return {
+            "name":      self.name,
+            "workers":   self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued":    self.queued,
+            "completed": self._completed,
+            "rejected":  self._rejected,
+        }
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    # Internals
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += _future is not None
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from bson import ObjectId
 
+if TYPE_CHECKING:
+    from backend.services.user_state_service import UserStateService
+
 
 # Number of recent sessions used for trend calculation
 _HISTORY_WINDOW = 5
@@ -11,11 +14,23 @@ _HISTORY_WINDOW = 5
 # Decay factor: more recent sessions have higher influence
 _DECAY = 0.8
 
+# Turns get_recent_snapshot() feeds into the prompt / MHI trend
+_SNAPSHOT_LIMIT = 4
+
+# Turns fetch_recent() returns: enough for both compute() and the snapshot
+RECENT_TURNS = max(_HISTORY_WINDOW, _SNAPSHOT_LIMIT)
+
 
 class HistoryService:
+    """
+    History reads go to the user's materialised state document when a
+    UserStateService is given (one _id lookup), falling back to querying
+    ``conversations`` for users whose state has not been built yet.
+    """
 
-    def __init__(self, conversations_col: Any):
-        self.col = conversations_col
+    def __init__(self, conversations_col: Any, state: UserStateService | None = None):
+        self.col   = conversations_col
+        self.state = state
 
     async def compute(self, user_id: ObjectId) -> float:
         """
@@ -27,17 +42,13 @@ class HistoryService:
 
         Returns 0.5 (neutral) when no history exists.
         """
-        cursor = (
-            self.col.find(
-                {"user_id": user_id},
-                {"mhi": 1, "_id": 0}
-            )
-            .sort("timestamp", -1)
-            .limit(_HISTORY_WINDOW)
-        )
-
-        docs = await cursor.to_list(length=_HISTORY_WINDOW)
+        docs = await self.fetch_recent(user_id, limit=_HISTORY_WINDOW)
+        return self.score_from(docs)
 
+    @staticmethod
+    def score_from(docs: list[dict]) -> float:
+        """compute() over already-fetched turns, most recent first."""
+        docs = docs[:_HISTORY_WINDOW]
         if not docs:
             return 0.5
 
@@ -52,21 +63,32 @@ class HistoryService:
 
         return round(weighted_risk, 4)
 
-    async def get_trend(self, user_id: ObjectId) -> str:
+    async def fetch_recent(self, user_id: ObjectId, *, limit: int = RECENT_TURNS) -> list[dict]:
         """
-        Returns a human-readable trend label based on last 3 sessions.
-        Used optionally by the report or dashboard.
+        Last *limit* turns (most recent first) with every field compute()
+        and get_recent_snapshot() need — one query serves both.
         """
+        if self.state is not None:
+            state = await self.state.get(user_id)
+            if state is not None:
+                return state.get("recent_turns", [])[:limit]
+
         cursor = (
             self.col.find(
                 {"user_id": user_id},
-                {"mhi": 1, "_id": 0}
+                {"message": 1, "response": 1, "emotion_scores": 1, "mhi": 1, "timestamp": 1, "_id": 0},
             )
             .sort("timestamp", -1)
-            .limit(3)
+            .limit(limit)
         )
+        return await cursor.to_list(length=limit)
 
-        docs = await cursor.to_list(length=3)
+    async def get_trend(self, user_id: ObjectId) -> str:
+        """
+        Returns a human-readable trend label based on last 3 sessions.
+        Used optionally by the report or dashboard.
+        """
+        docs = await self.fetch_recent(user_id, limit=3)
 
         if len(docs) < 2:
             return "insufficient_data"
@@ -80,18 +102,14 @@ class HistoryService:
             return "declining"
         return "stable"
 
-    async def get_recent_snapshot(self, user_id: ObjectId, *, limit: int = 4) -> dict[str, list]:
-        cursor = (
-            self.col.find(
-                {"user_id": user_id},
-                {"message": 1, "response": 1, "emotion_scores": 1, "mhi": 1, "timestamp": 1, "_id": 0},
-            )
-            .sort("timestamp", -1)
-            .limit(limit)
-        )
+    async def get_recent_snapshot(self, user_id: ObjectId, *, limit: int = _SNAPSHOT_LIMIT) -> dict[str, list]:
+        docs = await self.fetch_recent(user_id, limit=limit)
+        return self.snapshot_from(docs, limit=limit)
 
-        docs = await cursor.to_list(length=limit)
-        docs.reverse()
+    @staticmethod
+    def snapshot_from(docs: list[dict], *, limit: int = _SNAPSHOT_LIMIT) -> dict[str, list]:
+        """get_recent_snapshot() over already-fetched turns, most recent first."""
+        docs = list(reversed(docs[:limit]))
 
         recent_emotions: list[str] = []
         recent_mhi: list[float] = []
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import settings
+from backend.services import thread_budget
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+    from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+except ImportError:  # pragma: no cover - depends on local env
+    torch = None
+    DistilBertTokenizerFast = None
+    DistilBertForSequenceClassification = None
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - depends on local env
+    ort = None
+
+# Supported values for settings.INFERENCE_BACKEND
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# ONNX artifacts live next to the HF checkpoint: <model_dir>/onnx/<file>
+ONNX_SUBDIR   = "onnx"
+ONNX_FP32     = "model.onnx"
+ONNX_INT8     = "model.int8.onnx"
+
+_MAX_LENGTH = 128
+
+
+def onnx_path(model_dir: str | Path, quantized: bool = False) -> Path:
+    return Path(model_dir) / ONNX_SUBDIR / (ONNX_INT8 if quantized else ONNX_FP32)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class SequenceClassifier:
+    """
+    Tokenizer + classifier behind one interface, whatever runs the forward pass.
+
+    predict_proba(texts) -> np.ndarray of shape (len(texts), num_labels)
+    id2label             -> {index: label}
+    """
+
+    backend: str = ""
+
+    def __init__(self, path: str | Path):
+        self.path      = str(path)
+        self.tokenizer = DistilBertTokenizerFast.from_pretrained(self.path)
+        self.id2label: dict[int, str] = {}
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _tokenize(self, texts: list[str], tensors: str):
+        # padding="longest" pads only to the longest sequence in this batch
+        return self.tokenizer(
+            texts,
+            return_tensors=tensors,
+            truncation=True,
+            padding="longest",
+            max_length=_MAX_LENGTH,
+        )
+
+
+class TorchClassifier(SequenceClassifier):
+
+    def __init__(self, path: str | Path, *, quantize: bool = False):
+        super().__init__(path)
+        model = DistilBertForSequenceClassification.from_pretrained(self.path)
+        model.eval()
+        if quantize:
+            # Dynamic int8: Linear weights stored as int8, activations quantized per call
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8,
+            )
+        self.model    = model
+        self.backend  = "torch-int8" if quantize else "torch"
+        self.id2label = {int(k): v for k, v in model.config.id2label.items()}
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        inputs = self._tokenize(texts, "pt")
+        with torch.no_grad():
+            return torch.softmax(self.model(**inputs).logits, dim=1).numpy()
+
+
+class OnnxClassifier(SequenceClassifier):
+
+    def __init__(self, path: str | Path, *, quantized: bool = False):
+        super().__init__(path)
+        model_file = onnx_path(self.path, quantized)
+        if not model_file.exists():
+            raise FileNotFoundError(
+                f"{model_file} not found — run: python -m backend.training.export_onnx"
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = thread_budget.current().onnx_intra
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(model_file), sess_options=options, providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.backend  = "onnx-int8" if quantized else "onnx"
+
+        with (Path(self.path) / "config.json").open("r", encoding="utf-8") as f:
+            raw = json.load(f).get("id2label", {})
+        self.id2label = {int(k): v for k, v in raw.items()}
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        encoded = self._tokenize(texts, "np")
+        feeds = {
+            name: np.asarray(value, dtype=np.int64)
+            for name, value in encoded.items()
+            if name in self._input_names
+        }
+        (logits,) = self.session.run(["logits"], feeds)
+        return _softmax(logits)
+
+
+def load_classifier(path: str | Path, backend: str | None = None) -> SequenceClassifier:
+    """
+    Loads the checkpoint at *path* with the configured inference backend.
+    Falls back to PyTorch fp32 when the ONNX runtime or artifacts are missing.
+    Raises when the checkpoint itself cannot be loaded.
+    """
+    if DistilBertTokenizerFast is None:
+        raise RuntimeError("transformers is not installed")
+
+    backend = (backend or settings.INFERENCE_BACKEND).strip().lower()
+    if backend not in BACKENDS:
+        logger.warning("Unknown INFERENCE_BACKEND=%r; using torch", backend)
+        backend = "torch"
+
+    if backend.startswith("onnx"):
+        if ort is None:
+            logger.warning("onnxruntime not installed; %s falls back to torch", path)
+        else:
+            try:
+                return OnnxClassifier(path, quantized=backend == "onnx-int8")
+            except Exception as exc:
+                logger.warning("ONNX load failed for %s (%s); falling back to torch", path, exc)
+        backend = "torch"
+
+    if torch is None:
+        raise RuntimeError("torch is not installed")
+    return TorchClassifier(path, quantize=backend == "torch-int8")
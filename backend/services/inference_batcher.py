@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+from backend.services.executors import Overloaded
+from backend.services.metrics import LOAD_SHED_TOTAL, MODEL_INFERENCE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Pending:
+    item:        Any
+    future:      asyncio.Future
+    enqueued_at: float
+
+
+class InferenceBatcher:
+    """
+    Dynamic micro-batching scheduler in front of a batch inference function.
+
+    Concurrent submit() calls are collected for up to ``max_wait_ms`` or
+    until ``max_batch_size`` items are queued, then ``batch_fn`` runs once
+    on the whole batch in a worker thread and each waiting coroutine gets
+    its own result back.
+
+    batch_fn(items: list) -> list   (same length and order as items)
+
+    With ``max_queue`` set, submit() raises Overloaded once that many items
+    are already waiting, so callers fall back instead of queueing behind a
+    backlog that can't finish in time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[list], Sequence],
+        *,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 4.0,
+        max_queue: int = 0,
+        executor=None,
+    ):
+        self.name           = name
+        self.batch_fn       = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait       = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue      = max(0, max_queue)   # 0 = unbounded
+        self.executor       = executor
+
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+        # Metrics
+        self._batches         = 0
+        self._items           = 0
+        self._max_batch_seen  = 0
+        self._wait_total_ms   = 0.0
+        self._wait_max_ms     = 0.0
+        self._errors          = 0
+        self._rejected        = 0
+        self._inference_seconds = MODEL_INFERENCE_SECONDS.labels(name)
+        self._shed              = LOAD_SHED_TOTAL.labels(f"batcher-{name}")
+
+    # Public API
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one item and waits for its result from the next batch."""
+        self._ensure_worker()
+        if self.max_queue and self._queue.qsize() >= self.max_queue:
+            self._rejected += 1
+            self._shed.inc()
+            raise Overloaded(f"batcher-{self.name}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Pending(item, future, time.perf_counter()))
+        return await future
+
+    def stats(self) -> dict:
+        """Queue-wait and batch-size metrics since process start."""
+        return {
+            "name":             self.name,
+            "batches":          self._batches,
+            "items":            self._items,
+            "errors":           self._errors,
+            "rejected":         self._rejected,
+            "queued":           self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size":   round(self._items / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size":   self._max_batch_seen,
+            "avg_queue_wait_ms": round(self._wait_total_ms / self._items, 3) if self._items else 0.0,
+            "max_queue_wait_ms": round(self._wait_max_ms, 3),
+        }
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    # Internals
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue  = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(
+                self._run(), name=f"batcher-{self.name}",
+            )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests whose caller already went away do not need a forward pass
+            batch = [p for p in batch if not p.future.done()]
+            if batch:
+                await self._dispatch(loop, batch)
+
+    def _timed_batch(self, items: list) -> Sequence:
+        """Runs in the worker thread, so the metric excludes thread-pool queueing."""
+        started = time.perf_counter()
+        try:
+            return self.batch_fn(items)
+        finally:
+            self._inference_seconds.observe(time.perf_counter() - started)
+
+    async def _dispatch(self, loop, batch: list[_Pending]) -> None:
+        started = time.perf_counter()
+        for p in batch:
+            wait_ms = (started - p.enqueued_at) * 1000.0
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms    = max(self._wait_max_ms, wait_ms)
+        self._batches       += 1
+        self._items         += len(batch)
+        self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self._timed_batch, [p.item for p in batch],
+            )
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as exc:
+            self._errors += 1
+            logger.error("InferenceBatcher[%s] | batch of %d failed: %s", self.name, len(batch), exc)
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(exc)
+            return
+
+        for p, result in zip(batch, results):
+            if not p.future.done():
+                p.future.set_result(result)
+
+        logger.debug(
+            "InferenceBatcher[%s] | batch=%d | run=%.1fms",
+            self.name, len(batch), (time.perf_counter() - started) * 1000.0,
+        )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import time
+
+import numpy as np
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on local env
+    httpx = None
+
+from backend.services.crisis_service import CrisisAssessment
+from backend.services.inference_protocol import (
+    ANALYZE_PATH,
+    RETRIEVE_PATH,
+    STATUS_PATH,
+    decode_analysis,
+    encode_vector,
+)
+
+logger = logging.getLogger(__name__)
+
+_UDS_PREFIX = "unix://"
+
+
+class InferenceClient:
+    """
+    Client for the out-of-process inference server (INFERENCE_MODE=remote).
+
+    The calls are blocking and run on the API's inference executor threads,
+    as the micro-batcher's batch_fn and the retrieval stage, exactly where
+    the in-process models would run. One pooled keep-alive connection set
+    serves them all. ``url`` is ``unix:///path.sock`` or ``http://host:port``.
+    Errors and timeouts propagate, so the /chat stages fall back to their
+    keyword / rule / no-context defaults.
+    """
+
+    def __init__(self, url: str, *, timeout: float = 5.0, max_connections: int = 32):
+        if httpx is None:
+            raise RuntimeError("INFERENCE_MODE=remote needs httpx: pip install httpx")
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        if url.startswith(_UDS_PREFIX):
+            transport = httpx.HTTPTransport(uds=url[len(_UDS_PREFIX):], limits=limits)
+            base_url  = "http://inference"
+        else:
+            transport = httpx.HTTPTransport(limits=limits)
+            base_url  = url
+        self.url   = url
+        self._http = httpx.Client(
+            base_url=base_url, transport=transport,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 1.0)),
+        )
+        self.model_version = "remote"
+        self.available     = False
+
+    # Public API
+
+    def analyze_many(self, texts: list[str]) -> list[tuple[dict, CrisisAssessment, str, np.ndarray | None]]:
+        """(emotion_scores, crisis, intent, embedding) per text, in input order."""
+        data = self._post(ANALYZE_PATH, {"texts": texts})
+        return [decode_analysis(item) for item in data["results"]]
+
+    def retrieve(self, query: str, embedding: np.ndarray | None = None) -> list[dict]:
+        data = self._post(RETRIEVE_PATH, {"query": query, "embedding": encode_vector(embedding)})
+        return data["chunks"]
+
+    def status(self) -> dict:
+        response = self._http.get(STATUS_PATH)
+        data = response.json()
+        self.model_version = data.get("model_version", self.model_version)
+        self.available     = response.status_code == 200
+        return data
+
+    def wait_ready(self, timeout: float = 300.0, poll: float = 1.0) -> None:
+        """Blocks until the server reports every model settled (ModelLifecycle load step)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.status().get("ready"):
+                    logger.info("InferenceClient | %s ready (models %s)", self.url, self.model_version)
+                    return
+            except httpx.TransportError as exc:
+                logger.debug("InferenceClient | %s not reachable yet: %s", self.url, exc)
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"inference server at {self.url} not ready after {timeout:.0f}s")
+            time.sleep(poll)
+
+    def close(self) -> None:
+        self._http.close()
+
+    # Internals
+
+    def _post(self, path: str, payload: dict) -> dict:
+        response = self._http.post(path, json=payload)
+        response.raise_for_status()
+        data = response.json()
+        # Every response carries the server's model version, so the analysis
+        # cache notices a model change on the server without extra calls
+        self.model_version = data.get("model_version", self.model_version)
+        return data
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import base64
+from dataclasses import asdict
+
+import numpy as np
+
+from backend.services.crisis_service import CrisisAssessment
+
+# Wire format shared by backend/inference_server.py and InferenceClient.
+# Embeddings travel as base64 float32 (2 KB for MiniLM) instead of JSON
+# number lists.
+
+ANALYZE_PATH  = "/v1/analyze"
+RETRIEVE_PATH = "/v1/retrieve"
+STATUS_PATH   = "/v1/status"
+
+
+def encode_vector(vector: np.ndarray | None) -> str | None:
+    if vector is None:
+        return None
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def decode_vector(data: str | None) -> np.ndarray | None:
+    if data is None:
+        return None
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+def encode_analysis(emotion_scores: dict, crisis: CrisisAssessment, intent: str, embedding) -> dict:
+    return {
+        "emotion_scores": emotion_scores,
+        "crisis":         asdict(crisis),
+        "intent":         intent,
+        "embedding":      encode_vector(embedding),
+    }
+
+
+def decode_analysis(item: dict) -> tuple[dict, CrisisAssessment, str, np.ndarray | None]:
+    """(emotion_scores, crisis, intent, embedding) for one analysed text."""
+    return (
+        item["emotion_scores"],
+        CrisisAssessment(**item["crisis"]),
+        item["intent"],
+        decode_vector(item.get("embedding")),
+    )
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+from pathlib import Path
+
 import numpy as np
 
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:  # pragma: no cover - depends on local env
-    SentenceTransformer = None
+from backend.config import settings
+from backend.services.embedding_service import EmbeddingService, get_embedding_service
+
+logger = logging.getLogger(__name__)
 
 _KEYWORD_FALLBACK: dict[str, tuple[str, ...]] = {
     "venting": ("overwhelmed", "tired", "exhausted", "upset", "sad", "stressed"),
@@ -15,6 +20,8 @@ _KEYWORD_FALLBACK: dict[str, tuple[str, ...]] = {
     "reassurance": ("will i be okay", "get better", "feel lost", "okay right now"),
 }
 
+# Built-in exemplars; settings.INTENT_EXEMPLARS_PATH (JSON {intent: [examples]})
+# can extend the taxonomy without code changes.
 _INTENTS: dict[str, list[str]] = {
     "venting":      ["I feel overwhelmed", "I just want to talk", "nobody listens to me"],
     "advice":       ["what should I do", "help me figure this out", "I need guidance"],
@@ -24,30 +31,173 @@ _INTENTS: dict[str, list[str]] = {
 }
 
 
+_THRESHOLD = 0.55
+
+
 class IntentService:
+    """
+    Embedding-similarity intent classifier over a persisted prototype matrix.
 
-    def __init__(self):
-        self.model = None
-        self.intent_embeddings = {}
+    All exemplars are stored in one padded (intents x max_exemplars, dim)
+    matrix, so scoring a batch of messages is a single matrix product:
+      - "centroid": similarity to the mean exemplar of each intent
+      - "knn":      mean of the top-k exemplar similarities per intent
+    The matrix is saved to settings.INTENT_PROTOTYPES_PATH and reused on
+    startup as long as the exemplars and embedding model are unchanged.
+    """
+
+    def __init__(self, embedder: EmbeddingService | None = None, preload: bool = True):
+        self.embedder  = embedder or get_embedding_service()
+        self.scoring   = settings.INTENT_SCORING
+        self.knn_k     = max(1, settings.INTENT_KNN_K)
+        self.labels: list[str] = []
+        self._prototypes: np.ndarray | None = None   # (intents * slots, dim)
+        self._mask:       np.ndarray | None = None   # (intents, slots) True = real exemplar
+        self._centroids:  np.ndarray | None = None   # (intents, dim)
+        self.fingerprint: str | None = None
+        if preload:
+            self.load()
+
+    # Prototype matrix
+
+    def load(self) -> None:
+        """Loads or builds the prototype matrix; needs the embedder loaded first."""
         try:
-            if SentenceTransformer is not None:
-                self.model = SentenceTransformer("all-MiniLM-L6-v2")
-                self.intent_embeddings = {
-                    k: self.model.encode(v, normalize_embeddings=True).mean(axis=0)
-                    for k, v in _INTENTS.items()
-                }
-        except Exception:
-            self.model = None
-            self.intent_embeddings = {}
-
-    def predict(self, text: str) -> str:
-        if self.model is None:
-            lowered = text.lower()
-            for intent, keywords in _KEYWORD_FALLBACK.items():
-                if any(keyword in lowered for keyword in keywords):
-                    return intent
-            return "unknown"
-        emb = self.model.encode(text, normalize_embeddings=True)
-        scores = {k: float(np.dot(emb, v)) for k, v in self.intent_embeddings.items()}
-        best = max(scores, key=scores.get)
-        return best if scores[best] >= 0.55 else "unknown"
+            self._load_prototypes()
+        except Exception as exc:
+            logger.error("IntentService | prototype matrix unavailable: %s", exc)
+            self._prototypes = None
+
+    @property
+    def available(self) -> bool:
+        return self._prototypes is not None and self.embedder.available
+
+    @staticmethod
+    def _exemplars() -> dict[str, list[str]]:
+        exemplars = {k: list(v) for k, v in _INTENTS.items()}
+        extra_path = settings.INTENT_EXEMPLARS_PATH
+        if extra_path and Path(extra_path).exists():
+            with Path(extra_path).open("r", encoding="utf-8") as f:
+                for intent, examples in json.load(f).items():
+                    exemplars.setdefault(intent, []).extend(examples)
+        return exemplars
+
+    def _fingerprint(self, exemplars: dict[str, list[str]]) -> str:
+        payload = json.dumps([self.embedder.model_name, exemplars], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_prototypes(self) -> None:
+        exemplars   = self._exemplars()
+        fingerprint = self._fingerprint(exemplars)
+        path        = Path(settings.INTENT_PROTOTYPES_PATH)
+        self.fingerprint = fingerprint
+
+        if path.exists():
+            with np.load(path, allow_pickle=False) as saved:
+                if str(saved["fingerprint"]) == fingerprint:
+                    self._set_matrix(list(saved["labels"]), saved["prototypes"], saved["mask"])
+                    logger.info("IntentService | prototypes loaded from %s", path)
+                    return
+
+        if not self.embedder.available:
+            return
+
+        labels = list(exemplars)
+        slots  = max(len(v) for v in exemplars.values())
+        vectors = self.embedder.encode_many([t for k in labels for t in exemplars[k]])
+        dim = len(vectors[0])
+
+        prototypes = np.zeros((len(labels), slots, dim), dtype=np.float32)
+        mask = np.zeros((len(labels), slots), dtype=bool)
+        i = 0
+        for row, intent in enumerate(labels):
+            n = len(exemplars[intent])
+            prototypes[row, :n] = np.stack(vectors[i:i + n])
+            mask[row, :n] = True
+            i += n
+        prototypes = prototypes.reshape(len(labels) * slots, dim)
+        self._set_matrix(labels, prototypes, mask)
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(path, labels=np.array(labels), prototypes=prototypes, mask=mask,
+                     fingerprint=np.array(fingerprint))
+            logger.info("IntentService | prototypes encoded and saved to %s", path)
+        except OSError as exc:
+            logger.warning("IntentService | could not save prototypes to %s: %s", path, exc)
+
+    def _set_matrix(self, labels: list[str], prototypes: np.ndarray, mask: np.ndarray) -> None:
+        prototypes = prototypes.astype(np.float32)
+        mask       = mask.astype(bool)
+        per_intent = prototypes.reshape(len(labels), mask.shape[1], -1)
+        counts     = mask.sum(axis=1, keepdims=True).clip(min=1)
+        self.labels     = [str(label) for label in labels]
+        self._mask      = mask
+        # Mean of normalised exemplars (not re-normalised, matching the original scores)
+        self._centroids = per_intent.sum(axis=1) / counts
+        # Assigned last: predict_many() treats a non-None matrix as "ready"
+        self._prototypes = prototypes
+
+    @property
+    def model_version(self) -> str:
+        """Prototype fingerprint + scoring mode, or "keywords" when running on the fallback."""
+        if not self.available:
+            return "keywords"
+        return f"{self.fingerprint[:12]}:{self.scoring}:{self.knn_k}"
+
+    # Public API
+
+    def predict(self, text: str, embedding: np.ndarray | None = None) -> str:
+        """
+        *embedding* is the message's shared embedding when the caller already
+        has one (see EmbeddingService); otherwise the text is encoded here.
+        """
+        return self.predict_many([text], [embedding])[0]
+
+    def predict_many(
+        self,
+        texts: list[str],
+        embeddings: list[np.ndarray | None] | None = None,
+    ) -> list[str]:
+        """Batched predict(): one matrix product scores every text against every intent."""
+        if not texts:
+            return []
+        embeddings = list(embeddings or [None] * len(texts))
+
+        if self._prototypes is not None and self.embedder.available:
+            missing = [i for i, e in enumerate(embeddings) if e is None]
+            if missing:
+                for i, vector in zip(missing, self.embedder.encode_many([texts[i] for i in missing])):
+                    embeddings[i] = vector
+
+        if self._prototypes is None or any(e is None for e in embeddings):
+            return [self.keyword_predict(text) for text in texts]
+
+        scores = self._score(np.stack(embeddings).astype(np.float32))   # (batch, intents)
+        best = scores.argmax(axis=1)
+        return [
+            self.labels[j] if scores[i, j] >= _THRESHOLD else "unknown"
+            for i, j in enumerate(best)
+        ]
+
+    # Internals
+
+    def _score(self, queries: np.ndarray) -> np.ndarray:
+        if self.scoring != "knn":
+            return queries @ self._centroids.T
+
+        n_intents, slots = self._mask.shape
+        sims = (queries @ self._prototypes.T).reshape(len(queries), n_intents, slots)
+        sims = np.where(self._mask[None, :, :], sims, -np.inf)
+        k = min(self.knn_k, slots)
+        top = -np.partition(-sims, k - 1, axis=2)[:, :, :k]
+        valid = np.isfinite(top)
+        return np.where(valid, top, 0.0).sum(axis=2) / valid.sum(axis=2).clip(min=1)
+
+    @staticmethod
+    def keyword_predict(text: str) -> str:
+        lowered = text.lower()
+        for intent, keywords in _KEYWORD_FALLBACK.items():
+            if any(keyword in lowered for keyword in keywords):
+                return intent
+        return "unknown"
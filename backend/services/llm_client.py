@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on local env
+    httpx = None
+
+from backend.services.metrics import LLM_INPUT_TOKENS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+ASYNC_CLIENT_AVAILABLE = httpx is not None
+
+
+class LLMProviderError(RuntimeError):
+    """The provider answered with an HTTP error (429 = rate limited)."""
+
+    def __init__(self, status: int, detail: str = ""):
+        super().__init__(f"LLM provider returned {status}: {detail}".rstrip(": "))
+        self.status = status
+
+
+class GeminiClient:
+    """
+    Native-async Gemini client over the REST streaming endpoint.
+
+    One pooled keep-alive ``httpx.AsyncClient`` serves every /chat turn, so
+    an in-flight generation holds a connection, not a thread. Replies
+    always stream (``streamGenerateContent?alt=sse``). A caller that stops
+    reading, e.g. at the sentence target, closes the stream and the provider
+    stops generating. ``timeout`` bounds connecting, waiting for a pooled
+    connection, and each gap between streamed chunks.
+
+    ``transport`` replaces the network (tests, local fake providers).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        temperature: float = 0.3,
+        timeout: float = 20.0,
+        max_connections: int = 32,
+        base_url: str = GEMINI_API_BASE,
+        transport=None,
+    ):
+        if httpx is None:
+            raise RuntimeError("the async LLM client needs httpx: pip install httpx")
+        self.model       = model
+        self.temperature = temperature
+        self.cache       = None   # ContextCache, attached by llm_service
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"x-goog-api-key": api_key},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 3.0)),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def stream(self, prompt: str, *, max_tokens: int, system: str | None = None) -> AsyncIterator[str]:
+        """
+        Yields reply text as Gemini produces it; HTTP and transport errors
+        propagate. *system* is the stable prompt prefix: sent as the system
+        instruction, or by handle once ``cache`` (a ContextCache) holds it.
+        """
+        cached = self.cache.lookup(system) if system and self.cache is not None else None
+        while True:
+            body = {
+                "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                "generationConfig": {"temperature": self.temperature, "maxOutputTokens": max_tokens},
+            }
+            if cached:
+                body["cachedContent"] = cached
+            elif system:
+                body["systemInstruction"] = {"parts": [{"text": system}]}
+            async with self._http.stream(
+                "POST", f"/models/{self.model}:streamGenerateContent", params={"alt": "sse"}, json=body,
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    if cached and response.status_code in (400, 403, 404):
+                        self.cache.invalidate(system)   # expired or deleted early: resend inline
+                        cached = None
+                        continue
+                    raise LLMProviderError(response.status_code, response.text[:200])
+                usage = None
+                try:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        event = json.loads(line[5:])
+                        usage = event.get("usageMetadata") or usage
+                        for text in _texts(event):
+                            yield text
+                finally:
+                    if usage:
+                        _record_usage(
+                            self.model, usage.get("promptTokenCount", 0), usage.get("cachedContentTokenCount", 0),
+                        )
+                return
+
+    # Explicit context caching (the ContextCache callbacks)
+
+    async def create_cache(self, system: str, ttl_s: float) -> str:
+        """Caches *system* as a system instruction; returns the cachedContents/... handle."""
+        response = await self._http.post("/cachedContents", json={
+            "model":             f"models/{self.model}",
+            "systemInstruction": {"parts": [{"text": system}]},
+            "ttl":               f"{ttl_s:.0f}s",
+        })
+        if response.status_code != 200:
+            raise LLMProviderError(response.status_code, response.text[:200])
+        return response.json()["name"]
+
+    async def extend_cache(self, name: str, ttl_s: float) -> None:
+        response = await self._http.patch(f"/{name}", params={"updateMask": "ttl"}, json={"ttl": f"{ttl_s:.0f}s"})
+        if response.status_code != 200:
+            raise LLMProviderError(response.status_code, response.text[:200])
+
+    async def delete_cache(self, name: str) -> None:
+        await self._http.delete(f"/{name}")
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+class OpenAIClient:
+    """
+    Async streaming client for the OpenAI chat completions API, and for any
+    OpenAI-compatible server: a local llama.cpp / vLLM / Ollama endpoint
+    works by pointing ``base_url`` at it (``api_key`` may then be empty).
+    Same interface and pooling as GeminiClient.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        base_url: str = "https://api.openai.com/v1",
+        temperature: float = 0.3,
+        timeout: float = 20.0,
+        max_connections: int = 32,
+        transport=None,
+    ):
+        if httpx is None:
+            raise RuntimeError("the async LLM client needs httpx: pip install httpx")
+        self.model       = model
+        self.temperature = temperature
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 3.0)),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def stream(self, prompt: str, *, max_tokens: int, system: str | None = None) -> AsyncIterator[str]:
+        """
+        *system* goes first as the system message. OpenAI and most local
+        servers cache a repeated prompt prefix automatically, so no handle
+        is needed.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        body = {
+            "model":          self.model,
+            "messages":       messages,
+            "temperature":    self.temperature,
+            "max_tokens":     max_tokens,
+            "stream":         True,
+            "stream_options": {"include_usage": True},
+        }
+        async with self._http.stream("POST", "/chat/completions", json=body) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise LLMProviderError(response.status_code, response.text[:200])
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                event = json.loads(data)
+                if event.get("usage"):
+                    usage = event["usage"]
+                    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+                    _record_usage(self.model, usage.get("prompt_tokens", 0), cached)
+                for choice in event.get("choices", ())[:1]:
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        yield text
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def _record_usage(model: str, prompt_tokens: int, cached_tokens: int) -> None:
+    LLM_INPUT_TOKENS_TOTAL.labels(model, "cached").inc(cached_tokens)
+    LLM_INPUT_TOKENS_TOTAL.labels(model, "uncached").inc(max(0, prompt_tokens - cached_tokens))
+
+
+def _texts(event: dict):
+    """Reply text parts of one streamed GenerateContentResponse (first candidate, no thoughts)."""
+    for candidate in event.get("candidates", ())[:1]:
+        for part in candidate.get("content", {}).get("parts", ()):
+            text = part.get("text")
+            if text and not part.get("thought"):
+                yield text
+
+
+_FAKE_SENTENCES = (
+    "That sounds like a lot to carry right now.",
+    "It makes sense that you feel stretched thin.",
+    "One small thing that might help is pausing for a slow breath before the next task.",
+    "You don't have to sort all of it out tonight.",
+    "What feels most pressing to you at the moment?",
+)
+
+
+class FakeLLMClient:
+    """
+    Local stand-in for GeminiClient (LLM_PROVIDERS=fake): no network, no key.
+
+    Streams a canned reply one word per ``token_s`` after ``latency_s`` to the
+    first token, stopping at ``max_tokens`` words. With ``rpm`` set it rejects
+    calls beyond that many per rolling minute with a 429, like the real
+    quota, so the governor and fallbacks can be exercised locally.
+    """
+
+    def __init__(self, *, latency_s: float = 0.3, token_s: float = 0.01, rpm: int = 0):
+        self.model     = "fake"
+        self.latency_s = latency_s
+        self.token_s   = token_s
+        self.rpm       = rpm
+        self.calls     = 0
+        self.throttled = 0
+        self._recent: deque[float] = deque()
+
+    async def stream(self, prompt: str, *, max_tokens: int, system: str | None = None) -> AsyncIterator[str]:
+        self.calls += 1
+        if self.rpm:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                self.throttled += 1
+                raise LLMProviderError(429, "fake provider quota exhausted")
+            self._recent.append(now)
+
+        await asyncio.sleep(self.latency_s)
+        words = " ".join(_FAKE_SENTENCES).split()
+        for i, word in enumerate(words[:max_tokens]):
+            if i:
+                await asyncio.sleep(self.token_s)
+            yield word if i == 0 else " " + word
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+
+from backend.services.metrics import LLM_GOVERNOR_REJECTED_TOTAL, LLM_QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Rejection reasons (llm_governor_rejected_total{reason})
+QUEUE_FULL = "queue_full"   # max_queue requests already waiting
+RATE_LIMIT = "rate_limit"   # the RPM / TPM buckets can't refill before the deadline
+DEADLINE   = "deadline"     # waited the whole deadline without getting a slot
+
+
+class LLMRejected(RuntimeError):
+    """The governor refused an LLM call; the caller answers with its fallback now."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"LLM call rejected: {reason}")
+        self.reason = reason
+
+
+class _Bucket:
+    """Token bucket refilled continuously at *per_minute*; 0 = unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.rate     = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level    = float(per_minute)
+        self._at      = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._at) * self.rate)
+        self._at = now
+
+    def wait_for(self, amount: float, now: float) -> float:
+        """Seconds until *amount* can be taken (0 = now)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)   # an oversized request waits for a full bucket
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        if self.rate:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    user:     str
+    tokens:   int
+    future:   asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class LLMGovernor:
+    """
+    Admission control in front of the LLM provider.
+
+    At most ``max_concurrency`` calls run at once, and admissions are drawn
+    from requests-per-minute and tokens-per-minute buckets set just under
+    the provider's quota. A spike therefore queues here instead of turning
+    into a burst of provider 429s that fail every turn at once.
+
+    Waiting calls are queued per user and admitted round-robin across
+    users. One user firing many messages can't push everyone else back.
+    Every call has a queue deadline. A call that the buckets can't admit
+    within it is rejected on arrival (``rate_limit``). A call still waiting
+    at its deadline is rejected then (``deadline``). Either way the caller
+    answers with the safe fallback at once, not after a provider timeout.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        rpm: int = 0,
+        tpm: int = 0,
+        queue_deadline_s: float = 3.0,
+        max_queue: int = 256,
+    ):
+        self.max_concurrency  = max_concurrency
+        self.queue_deadline_s = queue_deadline_s
+        self.max_queue        = max_queue
+        self._requests = _Bucket(rpm)
+        self._tokens   = _Bucket(tpm)
+        self._active   = 0
+        self._queued   = 0
+        self._waiting: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._timer: asyncio.TimerHandle | None = None
+        self._admitted = 0
+        self._rejected = dict.fromkeys((QUEUE_FULL, RATE_LIMIT, DEADLINE), 0)
+
+    # Public API
+
+    @asynccontextmanager
+    async def slot(self, user: str, tokens: int, deadline_s: float | None = None):
+        """Holds one admitted LLM call for the body of the ``async with``."""
+        await self.acquire(user, tokens, deadline_s)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, user: str, tokens: int, deadline_s: float | None = None) -> None:
+        """Waits for admission; raises LLMRejected when that can't happen in time."""
+        deadline_s = self.queue_deadline_s if deadline_s is None else deadline_s
+        now = time.monotonic()
+        if not self._queued and self._can_admit(tokens, now):
+            self._admit(tokens, now)
+            LLM_QUEUE_WAIT_SECONDS.observe(0.0)
+            return
+        if self._queued >= self.max_queue:
+            self._reject(QUEUE_FULL)
+        # Bucket refill needed for the calls round-robin serves before this one
+        ahead, ahead_tokens = self._ahead_of(user)
+        refill = max(
+            self._requests.wait_for(ahead + 1, now),
+            self._tokens.wait_for(ahead_tokens + tokens, now),
+        )
+        if refill > deadline_s:
+            self._reject(RATE_LIMIT)
+
+        waiter = _Waiter(user, tokens, asyncio.get_running_loop().create_future())
+        self._waiting.setdefault(user, deque()).append(waiter)
+        self._queued += 1
+        self._dispatch()   # nothing in flight may release: arm the refill timer now
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), deadline_s)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._remove(waiter)
+                waiter.future.cancel()
+                self._reject(DEADLINE)
+            # admitted as the deadline expired: keep the slot
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                self.release()   # admitted, but the caller went away
+            else:
+                self._remove(waiter)
+                waiter.future.cancel()
+            raise
+        LLM_QUEUE_WAIT_SECONDS.observe(time.monotonic() - waiter.enqueued)
+
+    def release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight":       self._active,
+            "queued":          self._queued,
+            "queued_users":    len(self._waiting),
+            "admitted":        self._admitted,
+            "rejected":        dict(self._rejected),
+        }
+
+    # Internals
+
+    def _can_admit(self, tokens: int, now: float) -> bool:
+        return (
+            self._active < self.max_concurrency
+            and self._requests.wait_for(1, now) == 0.0
+            and self._tokens.wait_for(tokens, now) == 0.0
+        )
+
+    def _admit(self, tokens: int, now: float) -> None:
+        self._active += 1
+        self._admitted += 1
+        self._requests.take(1, now)
+        self._tokens.take(tokens, now)
+
+    def _reject(self, reason: str):
+        self._rejected[reason] += 1
+        LLM_GOVERNOR_REJECTED_TOTAL.labels(reason).inc()
+        logger.warning("LLMGovernor | rejected (%s) | in_flight=%d queued=%d", reason, self._active, self._queued)
+        raise LLMRejected(reason)
+
+    def _ahead_of(self, user: str) -> tuple[int, int]:
+        """(calls, tokens) admitted before a new call from *user*: every user's first n+1, n = its own backlog."""
+        rounds = len(self._waiting.get(user, ())) + 1
+        calls = tokens = 0
+        for queue in self._waiting.values():
+            for waiter in islice(queue, rounds):
+                calls += 1
+                tokens += waiter.tokens
+        return calls, tokens
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._waiting.get(waiter.user)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._waiting[waiter.user]
+        self._queued -= 1
+
+    def _dispatch(self) -> None:
+        """Admits waiting calls round-robin across users while capacity lasts."""
+        while self._waiting and self._active < self.max_concurrency:
+            user, queue = next(iter(self._waiting.items()))
+            waiter = queue[0]
+            now = time.monotonic()
+            wait = max(self._requests.wait_for(1, now), self._tokens.wait_for(waiter.tokens, now))
+            if wait > 0:
+                self._schedule(wait)
+                return
+            self._remove(waiter)
+            if user in self._waiting:
+                self._waiting.move_to_end(user)   # this user goes to the back of the rotation
+            self._admit(waiter.tokens, now)
+            waiter.future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        """Re-runs _dispatch once the buckets have refilled for the head of the queue."""
+        if self._timer is not None and not self._timer.cancelled():
+            return
+
+        def fire():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = asyncio.get_running_loop().call_later(delay, fire)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from backend.services.metrics import LLM_PROVIDER_TTFT_SECONDS, LLM_ROUTER_EVENTS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED    = "closed"
+OPEN      = "open"
+HALF_OPEN = "half_open"
+
+
+class NoProviderAvailable(RuntimeError):
+    """Every provider's breaker is open, or every provider failed before its first token."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failures`` consecutive failures and then refuses the
+    provider for ``reset_s``. After that, one probe call is let through
+    (half-open). Its success closes the breaker; its failure opens it again.
+    """
+
+    def __init__(self, failures: int = 5, reset_s: float = 30.0):
+        self.failure_threshold = failures
+        self.reset_s           = reset_s
+        self.state             = CLOSED
+        self._failures         = 0
+        self._opened_at        = 0.0
+        self._probing          = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_s:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state     = CLOSED
+        self._failures = 0
+        self._probing  = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state      = OPEN
+            self._opened_at = time.monotonic()
+            self._probing   = False
+
+    def release_probe(self) -> None:
+        """A half-open probe ended without a verdict (e.g. lost a hedge race)."""
+        self._probing = False
+
+
+@dataclass(eq=False)
+class Provider:
+    """One LLM backend: a GeminiClient / OpenAIClient / FakeLLMClient plus its health."""
+    name:        str
+    client:      Any
+    breaker:     CircuitBreaker = field(default_factory=CircuitBreaker)
+    window:      int = 100       # TTFT samples kept for the rolling p95
+    max_age_s:   float = 300.0   # older samples are dropped
+    min_samples: int = 5
+    _ttft:       deque = field(default_factory=deque)   # (monotonic time, seconds)
+
+    def observe(self, seconds: float) -> None:
+        self._ttft.append((time.monotonic(), seconds))
+        if len(self._ttft) > self.window:
+            self._ttft.popleft()
+        LLM_PROVIDER_TTFT_SECONDS.labels(self.name).observe(seconds)
+
+    @property
+    def p95(self) -> float | None:
+        """
+        Rolling p95 time to first token over the last ``max_age_s``; None
+        until min_samples calls have been seen. A provider ranked last only
+        runs as a fallback or hedge, so its samples age out and it goes back
+        to being measured first instead of keeping a stale p95.
+        """
+        self._prune()
+        if len(self._ttft) < self.min_samples:
+            return None
+        ordered = sorted(seconds for _, seconds in self._ttft)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def stats(self) -> dict:
+        p95 = self.p95
+        return {
+            "name":        self.name,
+            "breaker":     self.breaker.state,
+            "p95_ttft_ms": None if p95 is None else round(p95 * 1000, 1),
+            "samples":     len(self._ttft),
+        }
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.max_age_s
+        while self._ttft and self._ttft[0][0] < cutoff:
+            self._ttft.popleft()
+
+
+class _Attempt:
+    """One provider's stream, raced for its first chunk."""
+
+    def __init__(self, provider: Provider, prompt: str, max_tokens: int, system: str | None):
+        self.provider = provider
+        self.stream   = provider.client.stream(prompt, max_tokens=max_tokens, system=system)
+        self.started  = time.monotonic()
+        self.task     = asyncio.ensure_future(self.stream.__anext__())
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    async def abandon(self) -> None:
+        self.task.cancel()
+        try:
+            await self.task
+        except BaseException:
+            pass
+        await self.stream.aclose()
+
+
+class LLMRouter:
+    """
+    Routes each call across several providers; a drop-in for one client.
+
+    Candidates are providers whose circuit breaker admits a call, ordered by
+    rolling p95 time to first token. A provider without enough recent
+    samples sorts first, in configured order, so it gets measured. A provider that
+    fails before its first token is recorded against its breaker, and the
+    call moves on to the next candidate.
+
+    With ``hedge_after_s`` set, a call whose first token hasn't arrived by
+    then also starts on the next candidate. The first provider to produce a
+    token wins and the others are cancelled. A slow provider therefore costs
+    a turn about ``hedge_after_s`` instead of the full timeout. Once text
+    has been streamed, a later failure propagates; replies are never spliced
+    across providers.
+    """
+
+    def __init__(self, providers: list[Provider], *, hedge_after_s: float | None = None):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers     = providers
+        self.hedge_after_s = hedge_after_s or None
+        self.model         = "|".join(p.client.model for p in providers)
+
+    async def stream(self, prompt: str, *, max_tokens: int, system: str | None = None) -> AsyncIterator[str]:
+        attempt, first = await self._race(prompt, max_tokens, system)
+        provider = attempt.provider
+        try:
+            yield first
+            async for text in attempt.stream:
+                yield text
+        except GeneratorExit:
+            await attempt.stream.aclose()
+            provider.breaker.record_success()   # the caller stopped reading; the provider was fine
+            raise
+        except Exception:
+            provider.breaker.record_failure()
+            LLM_ROUTER_EVENTS_TOTAL.labels(provider.name, "failed_mid_stream").inc()
+            raise
+        provider.breaker.record_success()
+
+    def stats(self) -> dict:
+        return {
+            "hedge_after_ms": None if self.hedge_after_s is None else self.hedge_after_s * 1000,
+            "providers":      [p.stats() for p in self.providers],
+        }
+
+    async def aclose(self) -> None:
+        for provider in self.providers:
+            await provider.client.aclose()
+
+    # Internals
+
+    def _candidates(self) -> list[Provider]:
+        ranked = sorted(
+            enumerate(self.providers),
+            key=lambda item: (item[1].p95 is not None, item[1].p95 or 0.0, item[0]),
+        )
+        return [p for _, p in ranked if p.breaker.allow()]
+
+    async def _race(self, prompt: str, max_tokens: int, system: str | None) -> tuple[_Attempt, str]:
+        """Starts providers (failover / hedging) until one yields its first chunk."""
+        queue = deque(self._candidates())
+        if not queue:
+            LLM_ROUTER_EVENTS_TOTAL.labels("all", "no_provider").inc()
+            raise NoProviderAvailable("every LLM provider's circuit breaker is open")
+
+        running: list[_Attempt] = []
+        errors: list[str] = []
+
+        def start_next() -> None:
+            provider = queue.popleft()
+            if running:
+                LLM_ROUTER_EVENTS_TOTAL.labels(provider.name, "hedged").inc()
+            running.append(_Attempt(provider, prompt, max_tokens, system))
+
+        start_next()
+        try:
+            while running:
+                hedge = self.hedge_after_s if queue else None
+                done, _ = await asyncio.wait(
+                    [a.task for a in running], timeout=hedge, return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    start_next()   # no first token yet: hedge on the next candidate
+                    continue
+                for attempt in [a for a in running if a.task in done]:
+                    running.remove(attempt)
+                    provider = attempt.provider
+                    try:
+                        first = attempt.task.result()
+                    except StopAsyncIteration:
+                        provider.breaker.record_success()   # reachable, just an empty reply
+                        errors.append(f"{provider.name}: empty reply")
+                        continue
+                    except Exception as exc:
+                        provider.breaker.record_failure()
+                        LLM_ROUTER_EVENTS_TOTAL.labels(provider.name, "failed").inc()
+                        logger.warning("LLMRouter | %s failed before its first token: %s", provider.name, exc)
+                        errors.append(f"{provider.name}: {exc}")
+                        await attempt.stream.aclose()
+                        continue
+                    provider.observe(attempt.elapsed)
+                    LLM_ROUTER_EVENTS_TOTAL.labels(provider.name, "won").inc()
+                    for loser in running:
+                        loser.provider.observe(loser.elapsed)   # at least this slow
+                        loser.provider.breaker.release_probe()
+                        await loser.abandon()
+                    running.clear()
+                    return attempt, first
+                if queue and not running:
+                    start_next()   # failover
+        except BaseException:
+            for attempt in running:
+                attempt.provider.breaker.release_probe()
+                await attempt.abandon()
+            raise
+        finally:
+            for provider in queue:
+                provider.breaker.release_probe()   # admitted by allow() but never called
+        raise NoProviderAvailable("; ".join(errors) or "no LLM provider produced a reply")
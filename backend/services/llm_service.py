@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from contextlib import aclosing
+from typing import AsyncIterator
 
 from backend.config import settings
+from backend.services.context_cache import ContextCache
+from backend.services.llm_client import ASYNC_CLIENT_AVAILABLE, FakeLLMClient, GeminiClient, OpenAIClient
+from backend.services.llm_governor import LLMGovernor, LLMRejected
+from backend.services.llm_router import CircuitBreaker, LLMRouter, Provider
+from backend.services.metrics import LLM_REQUEST_SECONDS, LLM_REQUESTS_TOTAL
+from backend.services.prompt_budget import count_cached, count_tokens
+from backend.services.safety_service import sentence_end, sentence_target
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +23,18 @@ except ImportError:  # pragma: no cover - depends on local env
     genai = None
 
 _model = None
+_client: LLMRouter | None = None   # built once from LLM_PROVIDERS
+_client_checked = False
+
+# Admission control for the async path: concurrency cap, RPM / TPM buckets,
+# per-user round-robin, queue deadline -> immediate fallback
+governor = LLMGovernor(
+    max_concurrency  = settings.LLM_MAX_CONCURRENCY,
+    rpm              = settings.LLM_RPM_LIMIT,
+    tpm              = settings.LLM_TPM_LIMIT,
+    queue_deadline_s = settings.LLM_QUEUE_DEADLINE_MS / 1000,
+    max_queue        = settings.LLM_QUEUE_MAX,
+)
 
 
 def _get_model():
@@ -32,23 +55,32 @@ def _get_model():
     return _model
 
 
+def _record(outcome: str, started: float) -> None:
+    LLM_REQUESTS_TOTAL.labels(outcome).inc()
+    LLM_REQUEST_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+
+
 def generate_llm_response(prompt: str) -> str:
     """
     Sends a fully constructed prompt to Gemini.
     Prompt engineering is handled upstream by the RAG service.
     """
+    started = time.perf_counter()
     model = _get_model()
     if model is None:
         logger.warning("LLM provider unavailable; returning empty response for safety fallback")
+        _record("unavailable", started)
         return ""
 
     try:
         response = model.generate_content(prompt)
 
         if hasattr(response, "text") and response.text:
+            _record("ok", started)
             return response.text.strip()
 
         logger.warning("LLM returned empty response object")
+        _record("empty", started)
         return (
             "I'm here to support you. I couldn't generate a response just now. "
             "If you're feeling overwhelmed, please consider reaching out to a trusted person."
@@ -56,4 +88,178 @@ def generate_llm_response(prompt: str) -> str:
 
     except Exception as exc:
         logger.error("LLM generation error: %s", exc)
+        _record("error", started)
+        return ""
+
+
+
+# -- Native-async path (/chat, /chat/stream) -----------------------------------
+
+def max_output_tokens(category: str) -> int:
+    """
+    Output tokens worth paying for in *category*: its sentence target at
+    LLM_TOKENS_PER_SENTENCE each plus headroom, capped by LLM_MAX_TOKENS.
+    Everything past the target is trimmed by SafetyService anyway.
+    """
+    sentences = sentence_target(category)
+    if not sentences:
+        return settings.LLM_MAX_TOKENS
+    budget = sentences * settings.LLM_TOKENS_PER_SENTENCE + settings.LLM_TOKENS_HEADROOM
+    return min(settings.LLM_MAX_TOKENS, budget)
+
+
+def _build_provider(name: str) -> Provider | None:
+    """One LLM_PROVIDERS entry as a routed provider; None when it isn't configured."""
+    common = dict(
+        temperature=settings.LLM_TEMPERATURE,
+        timeout=settings.LLM_TIMEOUT_S,
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+    )
+    if name == "fake":
+        client = FakeLLMClient(latency_s=settings.LLM_FAKE_LATENCY_MS / 1000, rpm=settings.LLM_FAKE_RPM)
+    elif not ASYNC_CLIENT_AVAILABLE:
+        logger.warning("LLM provider %s skipped: httpx is not installed", name)
+        return None
+    elif name == "gemini":
+        if not settings.GEMINI_API_KEY:
+            return None
+        client = GeminiClient(settings.GEMINI_API_KEY, settings.LLM_MODEL, base_url=settings.GEMINI_BASE_URL, **common)
+        if settings.LLM_CONTEXT_CACHE:
+            client.cache = ContextCache(
+                client.create_cache, client.extend_cache, client.delete_cache,
+                ttl_s      = settings.LLM_CONTEXT_CACHE_TTL_S,
+                refresh_s  = settings.LLM_CONTEXT_CACHE_REFRESH_S,
+                min_tokens = settings.LLM_CONTEXT_CACHE_MIN_TOKENS,
+            )
+    elif name == "openai":
+        if not settings.OPENAI_API_KEY:
+            return None
+        client = OpenAIClient(settings.OPENAI_API_KEY, settings.OPENAI_MODEL, base_url=settings.OPENAI_BASE_URL, **common)
+    elif name == "local":
+        client = OpenAIClient(
+            settings.LLM_LOCAL_API_KEY, settings.LLM_LOCAL_MODEL, base_url=settings.LLM_LOCAL_BASE_URL, **common,
+        )
+    else:
+        logger.warning("Unknown LLM provider %r in LLM_PROVIDERS; skipped", name)
+        return None
+    return Provider(
+        name, client,
+        breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_S),
+        max_age_s=settings.LLM_TTFT_MAX_AGE_S,
+    )
+
+
+def _get_client() -> LLMRouter | None:
+    global _client, _client_checked
+    if _client is not None or _client_checked:
+        return _client
+    _client_checked = True
+    names = [n.strip() for n in settings.LLM_PROVIDERS.split(",") if n.strip()]
+    providers = [p for p in map(_build_provider, names) if p is not None]
+    if providers:
+        _client = LLMRouter(providers, hedge_after_s=settings.LLM_HEDGE_AFTER_MS / 1000)
+        logger.info(
+            "LLM providers: %s%s", ", ".join(p.name for p in providers),
+            f" (hedging after {settings.LLM_HEDGE_AFTER_MS:.0f} ms)" if settings.LLM_HEDGE_AFTER_MS else "",
+        )
+    return _client
+
+
+def provider_stats() -> dict:
+    """Breaker state and rolling p95 TTFT per LLM provider (empty until the first call)."""
+    return _client.stats() if isinstance(_client, LLMRouter) else {}
+
+
+def _context_caches() -> dict[str, ContextCache]:
+    if not isinstance(_client, LLMRouter):
+        return {}
+    return {p.name: p.client.cache for p in _client.providers if getattr(p.client, "cache", None) is not None}
+
+
+def context_cache_stats() -> dict:
+    """Prompt prefix cache handles per provider that uses explicit caching."""
+    return {name: cache.stats() for name, cache in _context_caches().items()}
+
+
+def _estimate_tokens(prompt: str, max_tokens: int, system: str | None = None) -> int:
+    """TPM charge of one call: prompt tokens plus the output budget (cached prefixes still count)."""
+    return count_tokens(prompt) + (count_cached(system) if system else 0) + max_tokens
+
+
+async def astream_llm_response(
+    prompt: str, *, category: str = "Stable", user: str | None = None, system: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Yields the reply as it streams, within the category's output token
+    budget. The call first waits for a governor slot, as *user*, for fair
+    queuing. *system* is the stable prompt prefix, which providers cache
+    (by handle, or automatically). Closing the iterator early stops
+    generation. Yields nothing when the provider is unavailable.
+    LLMRejected and provider errors propagate.
+    """
+    started = time.perf_counter()
+    client = _get_client()
+    if client is None:
+        logger.warning("LLM provider unavailable; streaming nothing for safety fallback")
+        _record("unavailable", started)
+        return
+
+    max_tokens = max_output_tokens(category)
+    outcome = "empty"
+    try:
+        async with governor.slot(user or "anonymous", _estimate_tokens(prompt, max_tokens, system)):
+            async with aclosing(client.stream(prompt, max_tokens=max_tokens, system=system)) as chunks:
+                async for text in chunks:
+                    outcome = "ok"
+                    yield text
+    except GeneratorExit:
+        if outcome == "ok":
+            outcome = "stopped"   # consumer stopped early (sentence target, client gone)
+        raise
+    except LLMRejected:
+        outcome = "rejected"
+        raise
+    except Exception as exc:
+        logger.error("LLM streaming error: %s", exc)
+        outcome = "error"
+        raise
+    finally:
+        _record(outcome, started)
+
+
+async def agenerate_llm_response(
+    prompt: str, *, category: str = "Stable", user: str | None = None, system: str | None = None,
+) -> str:
+    """
+    generate_llm_response without a thread: streams the reply and stops as
+    soon as the category's sentence target is complete. Returns "" on any
+    failure (the caller's safety fallback takes over).
+    """
+    target = sentence_target(category)
+
+    async def collect() -> str:
+        text = ""
+        async with aclosing(astream_llm_response(prompt, category=category, user=user, system=system)) as chunks:
+            async for chunk in chunks:
+                text += chunk
+                if target and sentence_end(text, target) is not None:
+                    break
+        return text
+
+    try:
+        text = await asyncio.wait_for(collect(), settings.LLM_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        logger.error("LLM generation timed out after %.0fs", settings.LLM_TIMEOUT_S)
         return ""
+    except Exception:
+        return ""   # logged and recorded by astream_llm_response
+    return text.strip()
+
+
+async def aclose() -> None:
+    global _client, _client_checked
+    for cache in _context_caches().values():
+        await cache.aclose()
+    if _client is not None:
+        await _client.aclose()
+    _client, _client_checked = None, False
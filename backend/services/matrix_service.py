@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import re
 import logging
 from backend.config import settings
+from backend.services.signal_engine import MATRIX_HOPELESS, SignalScan, scan
 
 logger = logging.getLogger(__name__)
 
@@ -25,31 +25,9 @@ _CRISIS_CEIL: dict[str, float] = {
     "none":    100.0,
 }
 
-#  Hopeless / disappearance language patterns ─
-# Each MATCH deducts 6 MHI points (max 4 matches = 24 pts)
-_HOPELESS = re.compile(
-    r"\b("
-    # Direct death / disappearance wish
-    r"disappear|disappeared|"
-    r"wish\s+i\s+(was|were)\s+(gone|dead|never\s+born)|"
-    r"easier\s+if\s+i\s+(just\s+)?(was\s+gone|disappeared|wasn'?t\s+here|wasn'?t\s+alive)|"
-    r"better\s+off\s+(without\s+me|if\s+i\s+(was|were)\s+gone)|"
-    r"want\s+to\s+(die|end\s+it|disappear)|"
-    # Hopelessness
-    r"hopeless|no\s+hope|what'?s\s+the\s+point|nothing\s+matters|pointless|"
-    r"give\s+up|gave\s+up|can'?t\s+go\s+on|can'?t\s+do\s+this\s+anymore|"
-    r"no\s+reason\s+to\s+(live|go\s+on)|"
-    # Isolation / burden language
-    r"nobody\s+(cares|would\s+miss\s+me|loves\s+me)|"
-    r"(i'?m\s+a\s+)?burden\s+to\s+(everyone|others|my\s+family|them)|"
-    # Emptiness
-    r"feel\s+(completely\s+)?(empty|numb|hollow)|"
-    r"nothing\s+left\s+(for\s+me|to\s+live\s+for)"
-    r")\b",
-    re.IGNORECASE,
-)
-
-_HOPELESS_PTS_PER_MATCH = 6.0
+#  Hopeless / disappearance language 
+# Patterns live in signal_engine.py (group matrix.hopeless); each MATCH deducts
+# the rule weight (6 MHI points), capped at 4 matches = 24 pts
 _HOPELESS_MAX_PEN       = 24.0   # cap at 4 matches
 
 # Emotions that trigger persistence penalty when sustained across turns
@@ -84,6 +62,7 @@ class MentalHealthMatrix:
         raw_text:          str           = "",
         recent_emotions:   list[str] | None = None,   # last N emotion labels
         mhi_trend:         list[float] | None = None, # last N MHI scores oldest→newest
+        signals:           SignalScan | None = None,  # pre-computed scan of raw_text
     ) -> float:
         """
         Returns MHI ∈ [0, 100].  Lower = more at risk.
@@ -92,6 +71,7 @@ class MentalHealthMatrix:
         ─
         recent_emotions : emotion labels from the last few turns (for persistence penalty)
         mhi_trend       : MHI scores from the last few turns (for trend amplification)
+        signals         : signal_engine scan of raw_text (scanned here when omitted)
         """
         # Step 1 — Emotion risk adjustment
         emotion_adj = min(emotion_score * _EMOTION_MUL.get(emotion_label, 1.0), 1.0)
@@ -129,8 +109,9 @@ class MentalHealthMatrix:
         # Step 7 — Hopeless-language scan
         hop_pen = 0.0
         if raw_text:
-            matches = len(_HOPELESS.findall(raw_text))
-            hop_pen = min(matches * _HOPELESS_PTS_PER_MATCH, _HOPELESS_MAX_PEN)
+            hits    = (signals or scan(raw_text)).group(MATRIX_HOPELESS)
+            matches = sum(hit.count for hit in hits)
+            hop_pen = min(sum(hit.weight * hit.count for hit in hits), _HOPELESS_MAX_PEN)
             raw_mhi = max(0.0, raw_mhi - hop_pen)
             if hop_pen > 0:
                 logger.debug("Hopeless penalty: %d matches = %.0f pts", matches, hop_pen)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import bisect
+import math
+from typing import Callable, Iterable
+
+# Latency buckets (seconds): sub-ms regex / cache work up to multi-second LLM calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+# Real-time factor buckets (processing time / audio duration)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+# Prompt size buckets (tokens)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum    = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name       = name
+        self.help       = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Child for one label combination. Single-label metrics are keyed by the
+        bare value, so the hot path does one dict lookup and no allocation.
+        """
+        key = values[0] if len(values) == 1 else values
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_str(self, key, extra: str = "") -> str:
+        values = (key,) if len(self.labelnames) == 1 else key
+        pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def _render_child(self, key, child) -> list[str]:
+        return [f"{self.name}{self._label_str(key)} {_fmt(child.value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def _render_child(self, key, child) -> list[str]:
+        lines = []
+        cumulative = 0
+        counts = list(child.counts)   # snapshot; writers never block on a scrape
+        for bound, n in zip(self.buckets + (math.inf,), counts):
+            cumulative += n
+            le = 'le="+Inf"' if bound == math.inf else f'le="{_fmt(bound)}"'
+            lines.append(f"{self.name}_bucket{self._label_str(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(child.sum)}")
+        lines.append(f"{self.name}_count{self._label_str(key)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Sampled at scrape time: ``fn`` returns {label value(s): number}, or a
+    bare number for an unlabelled gauge. Nothing runs on the request path.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help, fn: Callable[[], object], labelnames=()):
+        self.fn = fn
+        super().__init__(name, help, labelnames)
+        self._children.clear()
+
+    def _new_child(self):
+        return None
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            sample = self.fn()
+        except Exception:
+            return lines
+        items = sample.items() if isinstance(sample, dict) else [((), sample)]
+        for key, value in items:
+            lines.append(f"{self.name}{self._label_str(key)} {_fmt(float(value))}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Prometheus text-format registry with no locks on the write path.
+
+    Counter / histogram updates are plain attribute and list-slot increments
+    serialised by the GIL; a scrape racing a write can at worst read a
+    histogram whose sum is one observation ahead of its buckets.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name!r} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], object], labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, fn, labelnames))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# -- Process-wide registry + the metrics every module reports into --------------
+
+registry = MetricsRegistry()
+
+CHAT_STAGE_SECONDS = registry.histogram(
+    "chat_stage_seconds", "Duration of each /chat pipeline stage", ["stage"],
+)
+CHAT_FIRST_TOKEN_SECONDS = registry.histogram(
+    "chat_stream_first_token_seconds", "Time from a /chat/stream request to the first reply text sent",
+)
+MODEL_INFERENCE_SECONDS = registry.histogram(
+    "model_inference_seconds", "Wall time of one model call (a whole micro-batch)", ["model"],
+)
+FAISS_SEARCH_SECONDS = registry.histogram(
+    "faiss_search_seconds", "FAISS index search time per query",
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "llm_request_seconds", "LLM generate call latency", ["outcome"],
+)
+LLM_REQUESTS_TOTAL = registry.counter(
+    "llm_requests_total", "LLM generate calls by outcome (ok / stopped / empty / rejected / error / unavailable)", ["outcome"],
+)
+LLM_PROVIDER_TTFT_SECONDS = registry.histogram(
+    "llm_provider_ttft_seconds", "Time to first token per LLM provider (hedge losers: time until cancelled)", ["provider"],
+)
+LLM_ROUTER_EVENTS_TOTAL = registry.counter(
+    "llm_router_events_total", "LLM router outcomes per provider (won / failed / hedged / failed_mid_stream / no_provider)",
+    ["provider", "event"],
+)
+PROMPT_TOKENS = registry.histogram(
+    "llm_prompt_tokens", "Prompt tokens per /chat LLM call, by section (context / history / message / instructions / total)",
+    ["section"], buckets=TOKEN_BUCKETS,
+)
+PROMPT_TRIMMED_TOTAL = registry.counter(
+    "llm_prompt_trimmed_total", "Prompts whose section was clipped or dropped to fit its token budget", ["section"],
+)
+LLM_INPUT_TOKENS_TOTAL = registry.counter(
+    "llm_input_tokens_total", "Prompt tokens reported by the LLM provider, served from its prompt cache or not",
+    ["model", "kind"],
+)
+LLM_CONTEXT_CACHE_EVENTS_TOTAL = registry.counter(
+    "llm_context_cache_events_total", "Prompt prefix cache handles: hit / miss / created / extended / failed / invalidated",
+    ["event"],
+)
+LLM_QUEUE_WAIT_SECONDS = registry.histogram(
+    "llm_queue_wait_seconds", "Time an admitted LLM call waited in the governor queue",
+)
+LLM_GOVERNOR_REJECTED_TOTAL = registry.counter(
+    "llm_governor_rejected_total", "LLM calls answered with the fallback by the governor", ["reason"],
+)
+WHISPER_RTF = registry.histogram(
+    "whisper_real_time_factor", "Whisper processing time divided by audio duration",
+    buckets=RTF_BUCKETS,
+)
+TTS_SECONDS = registry.histogram(
+    "tts_seconds", "Text-to-speech synthesis latency", ["backend"],
+)
+MONGO_OP_SECONDS = registry.histogram(
+    "mongo_op_seconds", "MongoDB operation latency", ["collection", "op"],
+)
+PERSIST_FLUSH_SECONDS = registry.histogram(
+    "persist_flush_seconds", "Write-behind flush of one batch of conversation turns",
+)
+LOAD_SHED_TOTAL = registry.counter(
+    "load_shed_total", "Work rejected because a bounded executor / batcher queue was full", ["queue"],
+)
+CRISIS_TIER_TOTAL = registry.counter(
+    "crisis_tier_total", "Chat responses by crisis tier", ["tier"],
+)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Component states, in lifecycle order
+PENDING  = "pending"    # waiting for dependencies
+LOADING  = "loading"
+WARMING  = "warming"
+READY    = "ready"      # model loaded and warm
+DEGRADED = "degraded"   # load finished but the service is on its fallback path
+FAILED   = "failed"     # load or warm-up raised
+
+_DONE = (READY, DEGRADED, FAILED)
+
+
+@dataclass
+class _Component:
+    name:      str
+    load:      Callable[[], None]
+    warmup:    Callable[[], object] | None
+    available: Callable[[], bool]
+    after:     tuple[str, ...]
+    fork_safe: bool = True
+    state:     str = PENDING
+    load_ms:   float | None = None
+    warmup_ms: float | None = None
+    error:     str | None = None
+    done:      asyncio.Event = field(default_factory=asyncio.Event)
+
+    def status(self) -> dict:
+        return {
+            "state":     self.state,
+            "load_ms":   None if self.load_ms is None else round(self.load_ms, 1),
+            "warmup_ms": None if self.warmup_ms is None else round(self.warmup_ms, 1),
+            "error":     self.error,
+        }
+
+
+class ModelLifecycle:
+    """
+    Loads and warms models in the background so the server binds immediately.
+
+    Each registered component runs load() then warmup() in a worker thread
+    once every component named in ``after`` has finished; independent
+    components load concurrently. Services construct with preload=False and
+    answer from their keyword / rule fallbacks until their model is ready.
+
+    available() is checked after load() — False marks the component
+    "degraded" (e.g. model files missing) rather than "ready".
+
+    preload() does the same work synchronously up front (the pre-fork
+    master); start() then only brings up whatever it skipped.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._components: dict[str, _Component] = {}
+        self._task: asyncio.Task | None = None
+        self._started_at: float | None = None
+        self._finished_ms: float | None = None
+
+    def register(
+        self,
+        name: str,
+        load: Callable[[], None],
+        *,
+        warmup: Callable[[], object] | None = None,
+        available: Callable[[], bool] = lambda: True,
+        after: tuple[str, ...] = (),
+        fork_safe: bool = True,
+    ) -> None:
+        """
+        ``fork_safe=False`` marks models that own native thread pools from
+        construction (CTranslate2, ONNX Runtime sessions); preload() leaves
+        them for each forked worker to load itself.
+        """
+        self._components[name] = _Component(name, load, warmup, available, tuple(after), fork_safe)
+
+    # Public API
+
+    def start(self) -> asyncio.Task:
+        """Schedules background loading; returns immediately."""
+        if self._task is None:
+            self._started_at = time.perf_counter()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    def preload(self, *, fork_safe_only: bool = False) -> None:
+        """Loads + warms components in the calling thread, dependencies first."""
+        self._started_at = time.perf_counter()
+        for component in self._dependency_order():
+            if fork_safe_only and not component.fork_safe:
+                continue
+            if all(self._components[dep].state in _DONE for dep in component.after):
+                self._bring_up_sync(component)
+        logger.info(
+            "ModelLifecycle | preloaded in %.0f ms: %s",
+            (time.perf_counter() - self._started_at) * 1000,
+            ", ".join(f"{n}={c.state}" for n, c in self._components.items()),
+        )
+
+    async def wait(self) -> None:
+        """Blocks until every component has finished (used by tests / scripts)."""
+        if self._task is not None:
+            await self._task
+
+    async def close(self) -> None:
+        """Stops waiting on loads still in flight (their threads finish on their own)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    @property
+    def ready(self) -> bool:
+        return all(c.state in _DONE for c in self._components.values())
+
+    def state(self, name: str) -> str:
+        return self._components[name].state
+
+    def status(self) -> dict:
+        return {
+            "ready":       self.ready,
+            "elapsed_ms":  self._finished_ms if self.ready else (
+                None if self._started_at is None
+                else round((time.perf_counter() - self._started_at) * 1000, 1)
+            ),
+            "models":      {name: c.status() for name, c in self._components.items()},
+        }
+
+    # Internals
+
+    async def _run(self) -> None:
+        await asyncio.gather(*(self._bring_up(c) for c in self._components.values()))
+        self._finished_ms = round((time.perf_counter() - self._started_at) * 1000, 1)
+        logger.info(
+            "ModelLifecycle | all models settled in %.0f ms: %s",
+            self._finished_ms,
+            ", ".join(f"{n}={c.state}" for n, c in self._components.items()),
+        )
+
+    def _dependency_order(self) -> list[_Component]:
+        ordered: list[_Component] = []
+        seen: set[str] = set()
+
+        def visit(component: _Component) -> None:
+            if component.name in seen:
+                return
+            seen.add(component.name)
+            for dep in component.after:
+                visit(self._components[dep])
+            ordered.append(component)
+
+        for component in self._components.values():
+            visit(component)
+        return ordered
+
+    async def _bring_up(self, component: _Component) -> None:
+        try:
+            for dep in component.after:
+                await self._components[dep].done.wait()
+            if component.state not in _DONE:   # preload() may have done it already
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._bring_up_sync, component,
+                )
+        finally:
+            component.done.set()
+
+    def _bring_up_sync(self, component: _Component) -> None:
+        """load() + warmup() for one component; runs in a worker thread or preload()."""
+        try:
+            component.state = LOADING
+            started = time.perf_counter()
+            component.load()
+            component.load_ms = (time.perf_counter() - started) * 1000
+
+            if not component.available():
+                component.state = DEGRADED
+                return
+
+            if component.warmup is not None:
+                component.state = WARMING
+                started = time.perf_counter()
+                component.warmup()
+                component.warmup_ms = (time.perf_counter() - started) * 1000
+
+            component.state = READY
+            logger.info(
+                "ModelLifecycle | %s ready (load %.0f ms, warm-up %.0f ms)",
+                component.name, component.load_ms or 0.0, component.warmup_ms or 0.0,
+            )
+        except Exception as exc:
+            component.state = FAILED
+            component.error = str(exc)
+            logger.error("ModelLifecycle | %s failed: %s", component.name, exc)
@@ -81,8 +81,13 @@ import io
 import logging
 import os
 import tempfile
+import threading
+import time
 from dataclasses import dataclass
 
+from backend.services import thread_budget
+from backend.services.metrics import TTS_SECONDS, WHISPER_RTF
+
 logger = logging.getLogger(__name__)
 
 # ── Language registry ─────────────────────────────────────────────────────────
@@ -146,6 +151,7 @@ class MultilingualVoiceService:
 
     def __init__(self):
         self._model          = None
+        self._model_lock     = threading.Lock()
         self._pyttsx3_engine = None
         self._tts_backend    = None
         self._init_tts()
@@ -168,15 +174,39 @@ class MultilingualVoiceService:
         except Exception as exc:
             logger.error("MultilingualVoiceService | No TTS backend: %s", exc)
 
-    def _load_whisper(self) -> None:
+    def load_whisper(self) -> None:
         if self._model is not None:
             return
-        try:
-            from faster_whisper import WhisperModel
-            self._model = WhisperModel(_WHISPER_SIZE, device="cpu", compute_type="int8")
-            logger.info("MultilingualVoiceService | Whisper loaded: %s", _WHISPER_SIZE)
-        except ImportError:
-            raise RuntimeError("Run: pip install faster-whisper")
+        # A request arriving mid-warm-up waits for that load instead of starting a second one
+        with self._model_lock:
+            if self._model is not None:
+                return
+            try:
+                from faster_whisper import WhisperModel
+                self._model = WhisperModel(
+                    _WHISPER_SIZE, device="cpu", compute_type="int8",
+                    cpu_threads=thread_budget.current().whisper, num_workers=1,
+                )
+                logger.info("MultilingualVoiceService | Whisper loaded: %s", _WHISPER_SIZE)
+            except ImportError:
+                raise RuntimeError("Run: pip install faster-whisper")
+
+    def warm_up(self) -> None:
+        """
+        Loads Whisper and runs one pass over a second of silence so the first
+        /voice/transcribe doesn't pay for model load + first-inference setup.
+        """
+        import numpy as np
+
+        self.load_whisper()
+        segments, _ = self._model.transcribe(
+            np.zeros(16_000, dtype=np.float32), language="en", beam_size=1,
+        )
+        list(segments)   # segments are lazy; consume to run the decoder
+
+    @property
+    def whisper_loaded(self) -> bool:
+        return self._model is not None
 
     # ── Public API ────────────────────────────────────────────────────────────
 
@@ -190,7 +220,7 @@ class MultilingualVoiceService:
         if len(audio_bytes) < _MIN_BYTES:
             return TranscriptionResult("", "en", "English", 0.0)
 
-        self._load_whisper()
+        self.load_whisper()
 
         suffix   = f".{fmt}" if fmt else ".webm"
         tmp_path = None
@@ -202,6 +232,7 @@ class MultilingualVoiceService:
             # If a language hint was provided, force Whisper to that language;
             # otherwise auto-detect (language=None).
             whisper_lang = language if language and language in _LANG_META else None
+            started = time.perf_counter()
             segments, info = self._model.transcribe(
                 tmp_path,
                 language=whisper_lang,
@@ -214,6 +245,8 @@ class MultilingualVoiceService:
             prob = info.language_probability
             meta = _LANG_META.get(code, {"name": code.upper(), "gtts_lang": "en", "gtts_tld": "com"})
             text = " ".join(s.text.strip() for s in segments).strip()
+            if info.duration:
+                WHISPER_RTF.observe((time.perf_counter() - started) / info.duration)
 
             logger.info("Transcribed [%s/%.0f%%]: %r", code, prob * 100, text[:60])
             return TranscriptionResult(text, code, meta["name"], round(prob, 3))
@@ -244,12 +277,18 @@ class MultilingualVoiceService:
             return b""
 
         if self._tts_backend == "gtts":
+            started = time.perf_counter()
             try:
-                return self._gtts_speak(text, language_code, emotion_label, crisis_tier)
+                audio = self._gtts_speak(text, language_code, emotion_label, crisis_tier)
+                TTS_SECONDS.labels("gtts").observe(time.perf_counter() - started)
+                return audio
             except Exception as exc:
                 logger.warning("gTTS failed (%s), using pyttsx3", exc)
 
-        return self._pyttsx3_speak(text, emotion_label, crisis_tier)
+        started = time.perf_counter()
+        audio = self._pyttsx3_speak(text, emotion_label, crisis_tier)
+        TTS_SECONDS.labels("pyttsx3").observe(time.perf_counter() - started)
+        return audio
 
     @property
     def tts_backend(self) -> str:
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+from transformers import DistilBertModel, DistilBertTokenizerFast
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Files written next to the encoder checkpoint
+_HEADS_FILE  = "heads.pt"
+_CONFIG_FILE = "multitask.json"
+
+TASKS = ("emotion", "crisis")
+
+_MAX_LENGTH = 128
+_MEMO_SIZE  = 512
+
+
+class _Head(nn.Module):
+    """Same shape as DistilBertForSequenceClassification's classifier block."""
+
+    def __init__(self, dim: int, num_labels: int, dropout: float):
+        super().__init__()
+        self.pre_classifier = nn.Linear(dim, dim)
+        self.dropout        = nn.Dropout(dropout)
+        self.classifier     = nn.Linear(dim, num_labels)
+
+    def forward(self, pooled: torch.Tensor) -> torch.Tensor:
+        hidden = torch.relu(self.pre_classifier(pooled))
+        return self.classifier(self.dropout(hidden))
+
+
+class DistilBertMultiTask(nn.Module):
+    """
+    One DistilBERT encoder with an emotion head and a crisis head.
+    A single forward pass produces logits for both tasks.
+    """
+
+    def __init__(
+        self,
+        encoder: DistilBertModel,
+        labels: dict[str, list[str]],
+        dropout: float = 0.1,
+    ):
+        super().__init__()
+        self.encoder = encoder
+        self.labels  = labels
+        dim = encoder.config.dim
+        self.heads = nn.ModuleDict({
+            task: _Head(dim, len(task_labels), dropout)
+            for task, task_labels in labels.items()
+        })
+
+    def forward(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        emotion_labels: torch.Tensor | None = None,
+        crisis_labels: torch.Tensor | None = None,
+        emotion_mask: torch.Tensor | None = None,
+        emotion_pos_weight: torch.Tensor | None = None,
+    ) -> dict[str, torch.Tensor]:
+        hidden = self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        pooled = hidden[:, 0]   # [CLS]
+        out = {f"{task}_logits": head(pooled) for task, head in self.heads.items()}
+
+        if emotion_labels is not None or crisis_labels is not None:
+            loss = pooled.new_zeros(())
+            if emotion_labels is not None:
+                # Multi-label BCE, only on rows that came from the emotion dataset
+                per_label = nn.functional.binary_cross_entropy_with_logits(
+                    out["emotion_logits"], emotion_labels.float(),
+                    pos_weight=emotion_pos_weight, reduction="none",
+                )
+                mask = emotion_mask if emotion_mask is not None else torch.ones_like(per_label[:, 0])
+                if mask.sum() > 0:
+                    loss = loss + (per_label.mean(dim=1) * mask).sum() / mask.sum()
+            if crisis_labels is not None and (crisis_labels != -100).any():
+                loss = loss + nn.functional.cross_entropy(
+                    out["crisis_logits"], crisis_labels.long(), ignore_index=-100,
+                )
+            out["loss"] = loss
+        return out
+
+    # Persistence
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.encoder.save_pretrained(path)
+        torch.save(self.heads.state_dict(), path / _HEADS_FILE)
+        with (path / _CONFIG_FILE).open("w", encoding="utf-8") as f:
+            json.dump({"labels": self.labels}, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "DistilBertMultiTask":
+        path = Path(path)
+        with (path / _CONFIG_FILE).open("r", encoding="utf-8") as f:
+            labels = json.load(f)["labels"]
+        model = cls(DistilBertModel.from_pretrained(path), labels)
+        model.heads.load_state_dict(torch.load(path / _HEADS_FILE, map_location="cpu"))
+        model.eval()
+        return model
+
+
+class SharedEncoderClassifier:
+    """
+    Serves both heads of a DistilBertMultiTask from one loaded model.
+
+    EmotionService and CrisisService each get a per-task view (head()).
+    The first view to see a text runs the encoder once and memoizes both
+    heads' probabilities, so the other view's request for the same text is
+    a dictionary lookup instead of a second forward pass.
+    """
+
+    def __init__(self, path: str | Path, *, quantize: bool = False):
+        self.path      = str(path)
+        self.tokenizer = DistilBertTokenizerFast.from_pretrained(self.path)
+        model = DistilBertMultiTask.load(self.path)
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        self.model   = model
+        self.backend = "multitask-int8" if quantize else "multitask"
+        self.labels: dict[str, list[str]] = model.labels
+
+        self._lock = threading.Lock()
+        self._memo: OrderedDict[str, dict[str, np.ndarray]] = OrderedDict()
+
+    def head(self, task: str) -> "_TaskView":
+        if task not in self.labels:
+            raise KeyError(f"multitask checkpoint at {self.path} has no '{task}' head")
+        return _TaskView(self, task)
+
+    def predict_proba(self, texts: list[str], task: str) -> np.ndarray:
+        with self._lock:
+            missing = list(dict.fromkeys(t for t in texts if t not in self._memo))
+            if missing:
+                self._forward(missing)
+            rows = [self._memo[t][task] for t in texts]
+            for t in texts:
+                self._memo.move_to_end(t)
+        return np.stack(rows)
+
+    def _forward(self, texts: list[str]) -> None:
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding="longest",
+            max_length=_MAX_LENGTH,
+        )
+        with torch.no_grad():
+            out = self.model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+        probs = {
+            task: torch.softmax(out[f"{task}_logits"], dim=1).numpy()
+            for task in self.labels
+        }
+        for i, text in enumerate(texts):
+            self._memo[text] = {task: p[i] for task, p in probs.items()}
+        while len(self._memo) > _MEMO_SIZE:
+            self._memo.popitem(last=False)
+
+
+class _TaskView:
+    """SequenceClassifier-compatible view over one head of the shared model."""
+
+    def __init__(self, shared: SharedEncoderClassifier, task: str):
+        self.shared   = shared
+        self.task     = task
+        self.path     = shared.path
+        self.backend  = shared.backend
+        self.id2label = dict(enumerate(shared.labels[task]))
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        return self.shared.predict_proba(texts, self.task)
+
+
+_shared: SharedEncoderClassifier | None = None
+_shared_lock = threading.Lock()
+
+
+def load_multitask_head(task: str) -> _TaskView:
+    """
+    Returns the *task* head of the process-wide shared multi-task model,
+    loading it from settings.MULTITASK_MODEL_PATH on first use.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedEncoderClassifier(
+                settings.MULTITASK_MODEL_PATH,
+                quantize=settings.INFERENCE_BACKEND == "torch-int8",
+            )
+            logger.info(
+                "SharedEncoderClassifier | loaded from: %s | heads: %s",
+                settings.MULTITASK_MODEL_PATH, list(_shared.labels),
+            )
+    return _shared.head(task)
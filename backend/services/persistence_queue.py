@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.services.metrics import PERSIST_FLUSH_SECONDS
+
+if TYPE_CHECKING:
+    from backend.services.user_state_service import UserStateService
+
+logger = logging.getLogger(__name__)
+
+# Mongo duplicate-key error: a retried insert_many whose earlier attempt
+# already wrote some documents (turn _ids are assigned on submit)
+_DUPLICATE_KEY = 11000
+
+# Flush attempts per batch before its turns are given up (logged + counted)
+_MAX_ATTEMPTS = 5
+_MAX_BACKOFF_S = 5.0
+
+
+@dataclass
+class _Pending:
+    doc:         dict
+    seq:         int
+    enqueued_at: float
+    future:      asyncio.Future | None = None   # set when the caller waits for the write
+
+
+class PersistenceQueue:
+    """
+    Write-behind queue for conversation turns.
+
+    submit() acknowledges a turn once it is queued in memory. A background
+    flusher writes queued turns in batches of up to ``max_batch`` or after
+    ``max_wait_ms``, whichever comes first: one insert_many into
+    ``conversations``, one ordered bulk update of ``user_state`` and one
+    bulk ``latest_mhi`` update per batch. submit(doc, wait=True) flushes
+    immediately and returns only once the turn is written. It still goes
+    through the queue, so a user's turns always land in submission order.
+
+    Backpressure: at most ``max_pending`` turns are held. Further submit()
+    calls wait for a flush to make room, so a slow Mongo slows /chat down
+    instead of growing memory.
+
+    Crash safety: turns get their ``_id`` and a sequence number on submit.
+    ``durable_seq`` is the highest number up to which every turn has been
+    written (or given up). stats() reports how many turns are still only in
+    memory and the age of the oldest, i.e. what a crash would lose.
+    """
+
+    def __init__(
+        self,
+        conversations_col: Any,
+        users_col: Any,
+        state: UserStateService,
+        *,
+        max_batch: int = 100,
+        max_wait_ms: float = 200.0,
+        max_pending: int = 5000,
+    ):
+        self.conversations = conversations_col
+        self.users         = users_col
+        self.state         = state
+        self.max_batch     = max(1, max_batch)
+        self.max_wait      = max(0.0, max_wait_ms) / 1000.0
+        self.max_pending   = max(self.max_batch, max_pending)
+
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._outstanding: deque[_Pending] = deque()   # submitted, not yet flushed
+        self._closing = False
+
+        # Watermark + metrics
+        self._submitted_seq = 0
+        self._durable_seq   = 0
+        self._batches       = 0
+        self._written       = 0
+        self._dropped       = 0
+        self._errors        = 0
+        self._blocked       = 0   # submit() calls that waited for room
+
+    # Public API
+
+    async def submit(self, doc: dict, *, wait: bool = False) -> None:
+        """
+        Queues one conversation turn. With ``wait`` the call returns once the
+        turn is written; after close() every submit writes synchronously.
+        """
+        doc.setdefault("_id", ObjectId())
+        if self._closing:
+            await self._write([doc])
+            return
+
+        self._ensure_worker()
+        if self._slots.locked():
+            self._blocked += 1
+        await self._slots.acquire()
+
+        self._submitted_seq += 1
+        pending = _Pending(doc, self._submitted_seq, time.monotonic())
+        if wait:
+            pending.future = asyncio.get_running_loop().create_future()
+        self._outstanding.append(pending)
+        self._queue.put_nowait(pending)
+        if pending.future is not None:
+            await asyncio.shield(pending.future)
+
+    async def close(self) -> None:
+        """Flushes everything queued, then stops the flusher (lifespan shutdown)."""
+        self._closing = True
+        if self._worker is None or self._worker.done():
+            return
+        logger.info("PersistenceQueue | draining %d queued turn(s) …", len(self._outstanding))
+        self._queue.put_nowait(None)
+        await self._worker
+        self._worker = None
+
+    def stats(self) -> dict:
+        oldest = self._outstanding[0].enqueued_at if self._outstanding else None
+        return {
+            "pending":              len(self._outstanding),
+            "max_pending":          self.max_pending,
+            "submitted_seq":        self._submitted_seq,
+            "durable_seq":          self._durable_seq,
+            "oldest_pending_age_s": round(time.monotonic() - oldest, 3) if oldest else 0.0,
+            "batches":              self._batches,
+            "written":              self._written,
+            "avg_batch_size":       round(self._written / self._batches, 2) if self._batches else 0.0,
+            "dropped":              self._dropped,
+            "errors":               self._errors,
+            "backpressure_waits":   self._blocked,
+        }
+
+    # Internals
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue  = asyncio.Queue()
+            self._slots  = asyncio.Semaphore(self.max_pending)
+            self._worker = asyncio.get_running_loop().create_task(
+                self._run(), name="persistence-queue",
+            )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            urgent = first.future is not None
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if urgent or self._closing or remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                urgent = urgent or item.future is not None
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        docs = [p.doc for p in batch]
+        error: Exception | None = None
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                await self._write(docs, retry=attempt > 1)
+                error = None
+                break
+            except Exception as exc:
+                error = exc
+                self._errors += 1
+                if attempt < _MAX_ATTEMPTS:
+                    delay = min(0.1 * 2 ** (attempt - 1), _MAX_BACKOFF_S)
+                    logger.warning(
+                        "PersistenceQueue | flush of %d turn(s) failed (%s); retry %d in %.1fs",
+                        len(batch), exc, attempt, delay,
+                    )
+                    await asyncio.sleep(delay)
+
+        if error is None:
+            self._batches += 1
+            self._written += len(batch)
+        else:
+            self._dropped += len(batch)
+            logger.error(
+                "PersistenceQueue | giving up on %d turn(s) (seq %d–%d): %s",
+                len(batch), batch[0].seq, batch[-1].seq, error,
+            )
+
+        for p in batch:
+            self._outstanding.popleft()
+            self._slots.release()
+            if p.future is not None and not p.future.done():
+                if error is None:
+                    p.future.set_result(None)
+                else:
+                    p.future.set_exception(error)
+        self._durable_seq = batch[-1].seq
+
+    async def _write(self, docs: list[dict], *, retry: bool = False) -> None:
+        """
+        Every step is safe to repeat: inserts carry their _id (duplicates
+        are ignored), user_state is rebuilt from conversations on retry
+        instead of re-applying $inc / $push, and latest_mhi is a $set.
+        """
+        started = time.perf_counter()
+        try:
+            try:
+                await self.conversations.insert_many(docs, ordered=False)
+            except BulkWriteError as exc:
+                errors = exc.details.get("writeErrors", [])
+                if not retry or any(e.get("code") != _DUPLICATE_KEY for e in errors):
+                    raise
+
+            if retry:
+                for user_id in dict.fromkeys(d["user_id"] for d in docs):
+                    await self.state.rebuild(user_id)
+            else:
+                await self.state.record_turns(docs)
+
+            # Only the newest MHI per user matters
+            latest = {d["user_id"]: int(d["mhi"]) for d in docs}
+            await self.users.bulk_write(
+                [UpdateOne({"_id": uid}, {"$set": {"latest_mhi": mhi}}, upsert=True)
+                 for uid, mhi in latest.items()],
+                ordered=False,
+            )
+        finally:
+            PERSIST_FLUSH_SECONDS.observe(time.perf_counter() - started)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+# /proc/<pid>/smaps_rollup fields (kB) summed into each reported figure
+_SHARED  = ("Shared_Clean", "Shared_Dirty")
+_PRIVATE = ("Private_Clean", "Private_Dirty")
+
+
+def memory_usage(pid: int | str = "self") -> dict:
+    """
+    Resident memory of *pid*, split into pages shared with other processes
+    (e.g. model weights inherited from the pre-fork master) and pages only
+    this process holds, in MB. PSS charges each shared page 1/N to each of
+    the N processes mapping it. Empty where /proc is unavailable.
+    """
+    fields: dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0])
+    except OSError:
+        return {}
+
+    def mb(*keys: str) -> float:
+        return round(sum(fields.get(k, 0) for k in keys) / 1024, 1)
+
+    return {
+        "rss_mb":     mb("Rss"),
+        "pss_mb":     mb("Pss"),
+        "shared_mb":  mb(*_SHARED),
+        "private_mb": mb(*_PRIVATE),
+    }
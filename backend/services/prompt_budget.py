@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import deque
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on local env
+    tiktoken = None
+
+from backend.services.metrics import PROMPT_TOKENS, PROMPT_TRIMMED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Sections, in trimming order (lowest priority first). Instructions and the
+# session metadata are never trimmed; the user message only beyond its own cap.
+CONTEXT      = "context"
+HISTORY      = "history"
+MESSAGE      = "message"
+INSTRUCTIONS = "instructions"
+TOTAL        = "total"
+
+_PIECE_RE    = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)\s*")
+_ELLIPSIS    = "…"
+
+_encoding = None   # set by load_tokenizer(); counts are estimated until then
+
+
+def load_tokenizer(encoding_name: str) -> None:
+    """Loads the tiktoken encoding (a model_lifecycle component: the BPE file may be fetched)."""
+    global _encoding
+    if tiktoken is None or not encoding_name:
+        logger.info("Prompt budget | tiktoken unavailable; counting tokens by estimate")
+        return
+    try:
+        _encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as exc:
+        logger.warning("Prompt budget | tokenizer %s unavailable (%s); counting by estimate", encoding_name, exc)
+        return
+    count_cached.cache_clear()   # drop estimates made while loading
+
+
+def count_tokens(text: str) -> int:
+    """Prompt tokens in *text*: tiktoken when configured, else a BPE-like estimate."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return _estimate(text)
+
+
+@lru_cache(maxsize=4096)
+def count_cached(text: str) -> int:
+    """count_tokens for text that repeats across prompts (retrieved chunks, fixed instructions)."""
+    return count_tokens(text)
+
+
+def _estimate(text: str) -> int:
+    # Short words and punctuation are one token each; long words split into
+    # several, and non-Latin scripts cost about one token per 4 UTF-8 bytes.
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece.isascii():
+            tokens += 1 + len(piece) // 8
+        else:
+            tokens += max(1, (len(piece.encode()) + 3) // 4)
+    return tokens
+
+
+def clip(text: str, budget: int) -> str:
+    """
+    The leading whole sentences of *text* that fit in *budget* tokens. When
+    not even the first sentence fits, it is cut at a word boundary. The
+    cheap extractive summary: retrieved techniques and replies lead with
+    their point.
+    """
+    if count_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ""
+    budget -= 1   # room for the ellipsis
+    kept, used = "", 0
+    for sentence in _SENTENCE_RE.findall(text):
+        cost = count_tokens(sentence)
+        if used + cost > budget:
+            break
+        kept += sentence
+        used += cost
+    if kept:
+        return kept.rstrip() + " " + _ELLIPSIS
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:   # longest word prefix within budget
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return (" ".join(words[:lo]) + _ELLIPSIS) if lo else ""
+
+
+class PromptBudget:
+    """
+    Token budgets for the sections of one RAG prompt.
+
+    The instructions (system prompt, language, session metadata, length
+    rule) are always sent whole. The user message is capped at
+    ``message_tokens``. What remains of ``max_tokens`` goes to the recent
+    conversation first, then to retrieved context, each within its own
+    cap. History keeps the newest turns whole and clips older ones to
+    their opening sentences before dropping them. Context keeps chunks in
+    retrieval rank, clips the last one that only partly fits, and drops
+    any chunk left with less than ``min_chunk_tokens``.
+
+    Every assembled prompt is observed into ``llm_prompt_tokens{section}``. A
+    rolling window of totals backs ``stats()``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_tokens: int,
+        context_tokens: int,
+        history_tokens: int,
+        message_tokens: int,
+        min_chunk_tokens: int = 40,
+        window: int = 1000,
+    ):
+        self.max_tokens       = max_tokens
+        self.context_tokens   = context_tokens
+        self.history_tokens   = history_tokens
+        self.message_tokens   = message_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self._totals: deque[int] = deque(maxlen=window)
+        self._trimmed = dict.fromkeys((CONTEXT, HISTORY, MESSAGE), 0)
+
+    def message(self, text: str) -> str:
+        clipped = clip(text, self.message_tokens)
+        if clipped != text:
+            self._trim(MESSAGE)
+        return clipped
+
+    def room(self, fixed_tokens: int) -> int:
+        """Tokens left for history + context once the untrimmable sections are counted."""
+        return max(0, self.max_tokens - fixed_tokens)
+
+    def history(self, turns: list[tuple[str, str]], room: int) -> list[tuple[str, str]]:
+        """(user, assistant) turns, oldest first, fitted newest-first into the history budget."""
+        left = min(self.history_tokens, room)
+        kept: list[tuple[str, str]] = []
+        for user_turn, assistant_turn in reversed(turns):
+            cost = count_tokens(user_turn) + count_tokens(assistant_turn) + 8   # speaker labels
+            if cost <= left:
+                kept.append((user_turn, assistant_turn))
+                left -= cost
+                continue
+            # Older turn: keep its opening sentences while some room remains
+            share = (left - 8) // 2
+            user_turn, assistant_turn = clip(user_turn, share), clip(assistant_turn, share)
+            if user_turn or assistant_turn:
+                kept.append((user_turn, assistant_turn))
+            self._trim(HISTORY)
+            break
+        kept.reverse()
+        return kept
+
+    def context(self, chunks: list[str], room: int) -> list[str]:
+        """Retrieved chunk texts, in rank order, fitted into the context budget."""
+        left = min(self.context_tokens, room)
+        kept: list[str] = []
+        for text in chunks:
+            cost = count_cached(text) + 6   # "Wellbeing technique N:" header
+            if cost <= left:
+                kept.append(text)
+                left -= cost
+                continue
+            if left - 6 >= self.min_chunk_tokens:
+                kept.append(clip(text, left - 6))
+            self._trim(CONTEXT)
+            break
+        return kept
+
+    def observe(self, sizes: dict[str, int]) -> None:
+        """Records one assembled prompt's per-section token counts (``total`` included)."""
+        for section, tokens in sizes.items():
+            PROMPT_TOKENS.labels(section).observe(tokens)
+        self._totals.append(sizes[TOTAL])
+        logger.debug("Prompt budget | %s", " ".join(f"{k}={v}" for k, v in sizes.items()))
+
+    def stats(self) -> dict:
+        ordered = sorted(self._totals)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0
+        return {
+            "tokenizer":         _encoding.name if _encoding is not None else "estimate",
+            "max_tokens":        self.max_tokens,
+            "prompts":           len(ordered),
+            "total_tokens_p50":  pick(0.50),
+            "total_tokens_p95":  pick(0.95),
+            "total_tokens_max":  ordered[-1] if ordered else 0,
+            "trimmed":           dict(self._trimmed),
+        }
+
+    def _trim(self, section: str) -> None:
+        self._trimmed[section] += 1
+        PROMPT_TRIMMED_TOTAL.labels(section).inc()
@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import json
 import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import AsyncIterator
 
 import numpy as np
 
@@ -11,17 +15,19 @@ try:
 except ImportError:  # pragma: no cover - depends on local env
     faiss = None
 
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:  # pragma: no cover - depends on local env
-    SentenceTransformer = None
-
 from backend.config import settings
-from backend.services.llm_service import generate_llm_response
+from backend.services.embedding_service import EmbeddingService, get_embedding_service
+from backend.services.llm_service import (
+    agenerate_llm_response,
+    astream_llm_response,
+    generate_llm_response,
+)
+from backend.services import prompt_budget, thread_budget
+from backend.services.metrics import FAISS_SEARCH_SECONDS
+from backend.services.prompt_budget import PromptBudget, count_cached, count_tokens
 
 logger = logging.getLogger(__name__)
 
-MODEL_NAME = settings.SENTENCE_MODEL_NAME
 INDEX_PATH = settings.FAISS_INDEX_PATH
 METADATA_PATH = settings.RAG_METADATA_PATH
 SIMILARITY_THRESHOLD = 2.0
@@ -72,21 +78,73 @@ _LENGTH_INSTRUCTIONS: dict[str, str] = {
 
 _LENGTH_DEFAULT = "Write 2 to 3 warm conversational sentences and end with one open question."
 
+_CONTEXT_HEADER = "Background wellbeing knowledge (use naturally, never cite or name):"
+_SESSION_HEADER = "Session context:"
+_LENGTH_HEADER  = "Length instruction:"
+_MESSAGE_HEADER = "The user just said:"
+_CLOSING        = "Respond now in natural prose only. End with exactly one question."
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """
+    A generation prompt split for provider-side caching. *prefix* is the
+    same for every call with the same category and language; *suffix*
+    carries everything per-turn.
+    """
+    prefix: str
+    suffix: str
+
+    @property
+    def text(self) -> str:
+        """Both parts as one prompt, for providers without a system instruction."""
+        return self.prefix + "\n\n" + self.suffix
+
+
+@lru_cache(maxsize=256)
+def _stable_prefix(category: str, language_code: str) -> str:
+    """System prompt, language instruction and length rule: byte-identical across calls."""
+    lang_instruction = ""
+    try:
+        from backend.services.multilingual_voice_service import build_language_instruction
+
+        lang_instruction = build_language_instruction(language_code).strip()
+    except ImportError:
+        if language_code and language_code != "en":
+            lang_instruction = f"Respond entirely in {language_code}."
+    sections = [
+        _SYSTEM_PROMPT.strip(),
+        lang_instruction,
+        _LENGTH_HEADER,
+        _LENGTH_INSTRUCTIONS.get(category, _LENGTH_DEFAULT),
+    ]
+    return "\n\n".join(section for section in sections if section)
+
 
 class RAGService:
-    def __init__(self):
-        self.embed_model = None
+    def __init__(self, embedder: EmbeddingService | None = None, preload: bool = True):
+        self.embedder = embedder or get_embedding_service()
         self.index = None
         self.metadata: list[dict] = []
         self._rag_available = False
+        self.prompt_budget = PromptBudget(
+            max_tokens       = settings.PROMPT_MAX_TOKENS,
+            context_tokens   = settings.PROMPT_CONTEXT_TOKENS,
+            history_tokens   = settings.PROMPT_HISTORY_TOKENS,
+            message_tokens   = settings.PROMPT_MESSAGE_TOKENS,
+            min_chunk_tokens = settings.PROMPT_MIN_CHUNK_TOKENS,
+        )
+        if preload:
+            self.load()
 
+    def load(self) -> None:
+        """Reads the FAISS index + metadata; needs the embedder loaded first."""
         try:
             index_path = Path(INDEX_PATH)
             metadata_path = Path(METADATA_PATH)
-            if faiss is None or SentenceTransformer is None:
+            if faiss is None or not self.embedder.available:
                 logger.warning("RAG dependencies unavailable; continuing without retrieval")
             elif index_path.exists() and metadata_path.exists():
-                self.embed_model = SentenceTransformer(MODEL_NAME)
                 self.index = faiss.read_index(str(index_path))
                 with metadata_path.open("r", encoding="utf-8") as f:
                     self.metadata = json.load(f)
@@ -95,16 +153,28 @@ class RAGService:
                 logger.warning("RAG assets missing; continuing without retrieval")
         except Exception as exc:
             logger.warning("RAG initialisation failed; continuing without retrieval: %s", exc)
-            self.embed_model = None
             self.index = None
             self.metadata = []
             self._rag_available = False
 
-    def retrieve_context(self, query: str) -> list[dict]:
-        if not self._rag_available or self.embed_model is None or self.index is None:
+    @property
+    def available(self) -> bool:
+        return self._rag_available
+
+    def retrieve_context(self, query: str, embedding: np.ndarray | None = None) -> list[dict]:
+        if not self._rag_available or self.index is None:
             return []
-        embedding = self.embed_model.encode([query])
-        distances, indices = self.index.search(np.array(embedding), TOP_K)
+        if embedding is None:
+            embedding = self.embedder.encode(query)
+            if embedding is None:
+                return []
+        # OpenMP thread counts are per calling thread: set it on this executor thread
+        faiss.omp_set_num_threads(thread_budget.current().faiss)
+        started = time.perf_counter()
+        distances, indices = self.index.search(
+            np.asarray(embedding, dtype=np.float32).reshape(1, -1), TOP_K,
+        )
+        FAISS_SEARCH_SECONDS.observe(time.perf_counter() - started)
         results = [
             self.metadata[idx]
             for i, idx in enumerate(indices[0])
@@ -127,53 +197,72 @@ class RAGService:
         language_code: str,
         chunks: list[dict],
         conversation_pairs: list[dict[str, str]] | None = None,
-    ) -> str:
-        context_text = "\n\n".join(
-            f"Wellbeing technique {i + 1}:\n{chunk['text']}" for i, chunk in enumerate(chunks)
-        ) or "No retrieved knowledge available."
-
-        conversation_text = ""
-        if conversation_pairs:
-            snippets: list[str] = []
-            for pair in conversation_pairs[-3:]:
-                user_turn = pair.get("user", "").strip()
-                assistant_turn = pair.get("assistant", "").strip()
-                if user_turn:
-                    snippets.append(f'User: "{user_turn}"')
-                if assistant_turn:
-                    snippets.append(f'Assistant: "{assistant_turn}"')
-            if snippets:
-                conversation_text = "Recent conversation:\n" + "\n".join(snippets)
-
-        lang_instruction = ""
-        try:
-            from backend.services.multilingual_voice_service import build_language_instruction
-
-            lang_instruction = build_language_instruction(language_code).strip()
-        except ImportError:
-            if language_code and language_code != "en":
-                lang_instruction = f"Respond entirely in {language_code}."
+    ) -> Prompt:
+        """
+        Assembles the prompt within the token budgets (see PromptBudget):
+        instructions and session metadata whole, then the capped user
+        message, then as much recent conversation and retrieved context as
+        the remaining budget allows. Everything that depends only on the
+        category and language goes in the cacheable prefix.
+        """
+        budget = self.prompt_budget
+        user_message = budget.message(user_message)
+        prefix = _stable_prefix(category, language_code)
 
-        sections = [
-            _SYSTEM_PROMPT.strip(),
-            lang_instruction,
-            "Background wellbeing knowledge (use naturally, never cite or name):",
-            context_text,
-            "Session context:",
+        session_text = "\n\n".join((
             f"Emotion: {emotion_label} ({emotion_score:.2f})",
             f"Intent: {intent}",
             f"MHI: {mhi:.0f}/100",
             f"Crisis probability: {crisis_score:.2f}",
             f"Tier: {crisis_tier}",
             f"Category: {category}",
+        ))
+        instruction_tokens = count_tokens(session_text) + sum(map(count_cached, (
+            prefix, _CONTEXT_HEADER, _SESSION_HEADER, _MESSAGE_HEADER, _CLOSING,
+        )))
+        message_tokens = count_tokens(user_message) + 2
+        room = budget.room(instruction_tokens + message_tokens)
+
+        conversation_text = ""
+        turns = [
+            (pair.get("user", "").strip(), pair.get("assistant", "").strip())
+            for pair in (conversation_pairs or [])[-3:]
+        ]
+        snippets: list[str] = []
+        for user_turn, assistant_turn in budget.history(turns, room):
+            if user_turn:
+                snippets.append(f'User: "{user_turn}"')
+            if assistant_turn:
+                snippets.append(f'Assistant: "{assistant_turn}"')
+        if snippets:
+            conversation_text = "Recent conversation:\n" + "\n".join(snippets)
+        history_tokens = count_tokens(conversation_text)
+
+        chunk_texts = budget.context([chunk["text"] for chunk in chunks], room - history_tokens)
+        context_text = "\n\n".join(
+            f"Wellbeing technique {i + 1}:\n{text}" for i, text in enumerate(chunk_texts)
+        ) or "No retrieved knowledge available."
+        context_tokens = count_tokens(context_text)
+
+        budget.observe({
+            prompt_budget.CONTEXT:      context_tokens,
+            prompt_budget.HISTORY:      history_tokens,
+            prompt_budget.MESSAGE:      message_tokens,
+            prompt_budget.INSTRUCTIONS: instruction_tokens,
+            prompt_budget.TOTAL:        instruction_tokens + message_tokens + history_tokens + context_tokens,
+        })
+
+        sections = [
+            _CONTEXT_HEADER,
+            context_text,
+            _SESSION_HEADER,
+            session_text,
             conversation_text,
-            "Length instruction:",
-            _LENGTH_INSTRUCTIONS.get(category, _LENGTH_DEFAULT),
-            "The user just said:",
+            _MESSAGE_HEADER,
             f'"{user_message}"',
-            "Respond now in natural prose only. End with exactly one question.",
+            _CLOSING,
         ]
-        return "\n\n".join(section for section in sections if section)
+        return Prompt(prefix, "\n\n".join(section for section in sections if section))
 
     def generate_response(
         self,
@@ -187,7 +276,13 @@ class RAGService:
         category: str = "Stable",
         language_code: str = "en",
         conversation_pairs: list[dict[str, str]] | None = None,
+        query_embedding: np.ndarray | None = None,
+        chunks: list[dict] | None = None,
     ) -> tuple[str, bool]:
+        """
+        *chunks* are already-retrieved context (the /chat retrieval stage);
+        when None they are retrieved here from *query_embedding*.
+        """
         if crisis_tier in ("active", "passive"):
             logger.warning(
                 "RAGService called for crisis_tier=%s; returning empty because safety handles it",
@@ -196,21 +291,12 @@ class RAGService:
             return "", False
 
         try:
-            chunks = self.retrieve_context(user_message)
-            prompt = self._build_prompt(
-                user_message=user_message,
-                emotion_label=emotion_label,
-                emotion_score=emotion_score,
-                intent=intent,
-                mhi=mental_health_index,
-                crisis_score=crisis_probability,
-                crisis_tier=crisis_tier,
-                category=category,
-                language_code=language_code,
-                chunks=chunks,
-                conversation_pairs=conversation_pairs,
+            prompt = self._prompt_for(
+                user_message, emotion_label, emotion_score, intent, mental_health_index,
+                crisis_probability, crisis_tier, category, language_code,
+                conversation_pairs, query_embedding, chunks,
             )
-            result = generate_llm_response(prompt)
+            result = generate_llm_response(prompt.text)
             if not result or not result.strip():
                 logger.warning("RAGService | LLM returned empty")
                 return "", True
@@ -218,3 +304,87 @@ class RAGService:
         except Exception as exc:
             logger.error("RAGService.generate_response error: %s", exc)
             return "", True
+
+    async def agenerate_response(
+        self,
+        user_message: str,
+        emotion_label: str,
+        emotion_score: float,
+        intent: str,
+        mental_health_index: float,
+        crisis_probability: float,
+        crisis_tier: str = "none",
+        category: str = "Stable",
+        language_code: str = "en",
+        conversation_pairs: list[dict[str, str]] | None = None,
+        chunks: list[dict] | None = None,
+        user_key: str | None = None,
+    ) -> tuple[str, bool]:
+        """
+        generate_response on the async LLM client (/chat). Output is budgeted
+        for the category and generation stops at its sentence target.
+        *user_key* is the user the LLM governor queues the call under.
+        """
+        if crisis_tier in ("active", "passive"):
+            return "", False
+
+        prompt = self._prompt_for(
+            user_message, emotion_label, emotion_score, intent, mental_health_index,
+            crisis_probability, crisis_tier, category, language_code,
+            conversation_pairs, None, chunks or [],
+        )
+        result = await agenerate_llm_response(
+            prompt.suffix, category=category, user=user_key, system=prompt.prefix,
+        )
+        if not result:
+            logger.warning("RAGService | LLM returned empty")
+            return "", True
+        return result, False
+
+    def stream_response(
+        self,
+        user_message: str,
+        emotion_label: str,
+        emotion_score: float,
+        intent: str,
+        mental_health_index: float,
+        crisis_probability: float,
+        crisis_tier: str = "none",
+        category: str = "Stable",
+        language_code: str = "en",
+        conversation_pairs: list[dict[str, str]] | None = None,
+        chunks: list[dict] | None = None,
+        user_key: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        agenerate_response for /chat/stream: yields the reply as the LLM
+        produces it. Errors propagate; the caller treats an empty or failed
+        stream as llm_failed, and closing the iterator stops generation.
+        """
+        prompt = self._prompt_for(
+            user_message, emotion_label, emotion_score, intent, mental_health_index,
+            crisis_probability, crisis_tier, category, language_code,
+            conversation_pairs, None, chunks or [],
+        )
+        return astream_llm_response(prompt.suffix, category=category, user=user_key, system=prompt.prefix)
+
+    def _prompt_for(
+        self, user_message, emotion_label, emotion_score, intent, mental_health_index,
+        crisis_probability, crisis_tier, category, language_code,
+        conversation_pairs, query_embedding, chunks,
+    ) -> Prompt:
+        if chunks is None:
+            chunks = self.retrieve_context(user_message, query_embedding)
+        return self._build_prompt(
+            user_message=user_message,
+            emotion_label=emotion_label,
+            emotion_score=emotion_score,
+            intent=intent,
+            mhi=mental_health_index,
+            crisis_score=crisis_probability,
+            crisis_tier=crisis_tier,
+            category=category,
+            language_code=language_code,
+            chunks=chunks,
+            conversation_pairs=conversation_pairs,
+        )
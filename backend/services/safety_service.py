@@ -55,6 +55,26 @@ _BLOCKED = [
 ]
 _BLOCKED_RE = re.compile("|".join(_BLOCKED), re.IGNORECASE)
 
+_BLOCKED_RESPONSE = (
+    "I'm here to support you, and I want to make sure I give you "
+    "the safest guidance possible. If you're struggling right now, "
+    "please consider reaching out to someone you trust or a mental "
+    "health professional."
+)
+
+_REFERRAL = (
+    "\n\nIf these feelings continue or intensify, speaking with a "
+    "licensed mental health professional can make a real difference."
+)
+
+# Streamed text is held back by this many characters, so a blocked phrase
+# is always seen whole before any of it is sent (patterns are fixed-length
+# up to an optional separator, so the pattern length bounds the match)
+_STREAM_HOLDBACK = max(len(p) for p in _BLOCKED)
+
+# Sentence boundaries as _trim_to_length splits them
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s)")
+
 # ── Sentence target by category ───────────────────────────────────────────────
 # (max sentences to keep — surplus trimmed from end)
 _MAX_SENTENCES: dict[str, int] = {
@@ -67,6 +87,19 @@ _MAX_SENTENCES: dict[str, int] = {
 }
 
 
+def sentence_target(category: str) -> int:
+    """Sentences kept for *category*; 0 = not trimmed (crisis template)."""
+    return _MAX_SENTENCES.get(category, 5)
+
+
+def sentence_end(text: str, n: int) -> int | None:
+    """Offset just past the *n*-th complete sentence of *text*, or None if not there yet."""
+    for count, match in enumerate(_SENTENCE_END_RE.finditer(text), 1):
+        if count == n:
+            return match.end()
+    return None
+
+
 class SafetyService:
 
     def __init__(self):
@@ -108,31 +141,39 @@ class SafetyService:
         if llm_failed or not response or not response.strip():
             logger.warning("SafetyService | LLM failed — returning safe fallback (category=%s)",
                            category)
-            if category in ("High Risk", "Depression Risk", "Crisis Risk"):
-                return _LLM_FALLBACK_HIGH_RISK
-            return _LLM_FALLBACK
+            return self._fallback(category)
 
         # ── 4. Blocked content ────────────────────────────────────────────────
         if _BLOCKED_RE.search(response):
             logger.warning("SafetyService | blocked content in LLM output")
-            return (
-                "I'm here to support you, and I want to make sure I give you "
-                "the safest guidance possible. If you're struggling right now, "
-                "please consider reaching out to someone you trust or a mental "
-                "health professional."
-            )
+            return _BLOCKED_RESPONSE
 
         # ── 5. Length control + optional referral ─────────────────────────────
         trimmed = self._trim_to_length(response, category)
 
-        if crisis_tier == "distress" or crisis_score >= 0.35:
-            trimmed += (
-                "\n\nIf these feelings continue or intensify, speaking with a "
-                "licensed mental health professional can make a real difference."
-            )
+        if self._needs_referral(crisis_tier, crisis_score):
+            trimmed += _REFERRAL
 
         return trimmed
 
+    def stream(self, crisis_score: float, crisis_tier: str = "none", category: str = "Stable") -> "ResponseStream":
+        """Incremental validate_response for a streamed, non-crisis LLM reply."""
+        return ResponseStream(
+            max_sentences = sentence_target(category),
+            referral      = self._needs_referral(crisis_tier, crisis_score),
+            fallback      = self._fallback(category),
+        )
+
+    @staticmethod
+    def _fallback(category: str) -> str:
+        if category in ("High Risk", "Depression Risk", "Crisis Risk"):
+            return _LLM_FALLBACK_HIGH_RISK
+        return _LLM_FALLBACK
+
+    @staticmethod
+    def _needs_referral(crisis_tier: str, crisis_score: float) -> bool:
+        return crisis_tier == "distress" or crisis_score >= 0.35
+
     # ── Length controller ─────────────────────────────────────────────────────
 
     @staticmethod
@@ -142,7 +183,7 @@ class SafetyService:
         where N is determined by the category.
         Preserves paragraph structure where possible.
         """
-        max_s = _MAX_SENTENCES.get(category, 5)
+        max_s = sentence_target(category)
         if max_s == 0:
             return text   # crisis — handled above, but safe fallback
 
@@ -178,3 +219,85 @@ class SafetyService:
     def is_passive_crisis(crisis_tier: str, crisis_score: float,
                           crisis_threshold: float) -> bool:
         return crisis_tier == "passive" or crisis_score >= crisis_threshold
+
+
+class ResponseStream:
+    """
+    validate_response steps 3-5 applied to an LLM reply as it streams.
+
+    feed() returns the part of the reply that is safe to send now. The last
+    _STREAM_HOLDBACK characters wait until more text arrives, so a blocked
+    phrase is caught before any of it goes out. Once the category's sentence
+    target is reached, ``done`` is set and the rest of the reply is dropped,
+    so the caller can stop generating. finish() returns the closing text
+    (held-back tail + referral).
+
+    If the reply is blocked or empty, ``replaced`` is set and ``text`` is the
+    safe message that supersedes anything already sent. ``text`` is always the
+    final response as the user saw it, ready to persist.
+    """
+
+    def __init__(self, max_sentences: int, referral: bool, fallback: str):
+        self.max_sentences = max_sentences or None   # 0 = crisis template, never trimmed
+        self.referral      = referral
+        self.fallback      = fallback
+        self.done          = False
+        self.replaced      = False
+        self.finished      = False
+        self._buffer       = ""
+        self._sent         = 0
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += chunk
+        if _BLOCKED_RE.search(self._buffer):
+            logger.warning("SafetyService | blocked content in streamed LLM output")
+            self._replace(_BLOCKED_RESPONSE)
+            return ""
+
+        limit = self._sentence_limit()
+        if limit is not None:
+            self._buffer = self._buffer[:limit]
+            self.done = True
+            safe_to = limit
+        else:
+            safe_to = max(self._sent, len(self._buffer) - _STREAM_HOLDBACK)
+        out = self._buffer[self._sent:safe_to]
+        self._sent = safe_to
+        return out
+
+    def finish(self, llm_failed: bool = False) -> str:
+        """Closing text to send; after this ``text`` is final."""
+        if self.finished:
+            return ""
+        self.finished = True
+        if self.replaced:
+            return ""
+        if (llm_failed and not self._sent) or not self._buffer.strip():
+            logger.warning("SafetyService | streamed LLM reply failed — returning safe fallback")
+            self._replace(self.fallback)
+            return ""
+        self.done = True
+        self._buffer = self._buffer[:self._sent] + self._buffer[self._sent:].rstrip()
+        if self.referral:
+            self._buffer += _REFERRAL
+        out = self._buffer[self._sent:]
+        self._sent = len(self._buffer)
+        return out
+
+    def _replace(self, message: str) -> None:
+        self._buffer  = message
+        self._sent    = len(message)
+        self.done     = True
+        self.replaced = True
+
+    def _sentence_limit(self) -> int | None:
+        """End of the last sentence allowed by the target, once it has streamed in."""
+        if self.max_sentences is None:
+            return None
+        return sentence_end(self._buffer, self.max_sentences)
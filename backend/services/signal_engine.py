@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+try:
+    from re import _constants as _sre
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+try:
+    import re2  # google-re2: guaranteed linear-time matching when installed
+except ImportError:  # pragma: no cover - depends on local env
+    re2 = None
+
+logger = logging.getLogger(__name__)
+
+# Lexical signal engine
+#
+# Every regex battery the pipeline runs over a user message lives here:
+# crisis tiers, emotion keywords / modifiers, the MHI hopeless-language
+# penalty and the behavioral risk dimensions. scan() normalises the text
+# once (lowercase + collapsed whitespace), evaluates each compiled rule
+# once and returns every hit with its group, weight and match count.
+# Services read the groups they care about from that one SignalScan.
+#
+# Linear-time guarantee: rules are validated at import (_check_linear) —
+# no backreferences, no lookarounds, and no unbounded quantifier nested
+# inside another quantifier — so no rule can backtrack catastrophically
+# and a scan is O(len(text) x rules). With google-re2 installed the rules
+# are compiled by RE2, which is linear-time by construction.
+
+# Groups
+CRISIS_ACTIVE       = "crisis.active"
+CRISIS_PASSIVE      = "crisis.passive"
+CRISIS_DISTRESS     = "crisis.distress"
+EMOTION_KEYWORD     = "emotion.keyword"
+EMOTION_INTENSIFIER = "emotion.intensifier"
+EMOTION_NEGATION    = "emotion.negation"
+EMOTION_HOPELESS    = "emotion.hopeless"
+MATRIX_HOPELESS     = "matrix.hopeless"
+BEHAVIORAL          = "behavioral"
+
+_MEMO_SIZE = 256
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SignalRule:
+    name:    str
+    group:   str
+    source:  str
+    weight:  float = 1.0
+    label:   str   = ""
+
+
+@dataclass(frozen=True)
+class SignalHit:
+    rule:    str
+    group:   str
+    weight:  float
+    label:   str
+    count:   int     # non-overlapping matches in the message
+
+
+# Rule tables — order within a group is significant (first hit wins for crisis tiers)
+
+_RULES: list[SignalRule] = [
+    # Active suicidal intent — hard floor 0.90
+    SignalRule("kill_myself",        CRISIS_ACTIVE, r"\b(kill\s+myself|killing\s+myself)\b",                        0.97, "active"),
+    SignalRule("end_my_life",        CRISIS_ACTIVE, r"\b(end\s+my\s+life|ending\s+my\s+life)\b",                   0.95, "active"),
+    SignalRule("want_to_die",        CRISIS_ACTIVE, r"\b(want\s+to\s+die|want\s+to\s+be\s+dead)\b",                0.93, "active"),
+    SignalRule("going_to_hurt",      CRISIS_ACTIVE, r"\b(going\s+to\s+(kill|hurt)\s+myself)\b",                    0.96, "active"),
+    SignalRule("suicide_plan",       CRISIS_ACTIVE, r"\b(suicide\s+plan|planned?\s+to\s+die)\b",                   0.97, "active"),
+    SignalRule("no_reason_to_live",  CRISIS_ACTIVE, r"\b(no\s+reason\s+to\s+(live|be\s+alive))\b",                 0.90, "active"),
+    SignalRule("better_off_dead",    CRISIS_ACTIVE, r"\b(better\s+off\s+dead|better\s+if\s+i\s+(died|was\s+gone))\b", 0.88, "active"),
+    SignalRule("take_my_life",       CRISIS_ACTIVE, r"\b(take\s+my\s+own\s+life)\b",                               0.96, "active"),
+    SignalRule("self_harm",          CRISIS_ACTIVE, r"\b(self[\s\-]harm|cut\s+myself|overdose\s+on)\b",            0.91, "active"),
+
+    # Passive death-wish — hard floor 0.60
+    SignalRule("wish_dead",          CRISIS_PASSIVE, r"\b(wish\s+(i\s+was|i\s+were)\s+dead)\b",                     0.78, "passive"),
+    SignalRule("dont_want_to_exist", CRISIS_PASSIVE, r"\b(don'?t\s+want\s+to\s+(be\s+here|exist|wake\s+up))\b",     0.74, "passive"),
+    SignalRule("want_to_disappear",  CRISIS_PASSIVE, r"\bwant\s+to\s+disappear\b",                                  0.68, "passive"),
+    SignalRule("just_disappear",     CRISIS_PASSIVE, r"\bjust\s+disappear\b",                                        0.66, "passive"),
+    SignalRule("easier_if_gone",     CRISIS_PASSIVE, r"\b(easier\s+if\s+i\s+(just\s+)?(disappeared|was\s+gone|wasnt?\s+here))\b", 0.78, "passive"),
+    SignalRule("everything_easier",  CRISIS_PASSIVE, r"\beverything\s+would\s+be\s+easier\s+if\s+i\s+(was|were)\s+(gone|dead)\b", 0.80, "passive"),
+    SignalRule("tired_of_living",    CRISIS_PASSIVE, r"\b(tired\s+of\s+(living|being\s+alive|existing))\b",         0.70, "passive"),
+    SignalRule("cant_go_on",         CRISIS_PASSIVE, r"\b(can'?t\s+(do\s+this|keep\s+going|go\s+on)\s+anymore)\b",  0.65, "passive"),
+    SignalRule("end_it_all",         CRISIS_PASSIVE, r"\b(want\s+to\s+end\s+(all|everything|it(\s+all)?))\b",       0.72, "passive"),
+    SignalRule("pointless_to_live",  CRISIS_PASSIVE, r"\b(pointless\s+to\s+(live|keep\s+going))\b",                 0.68, "passive"),
+    SignalRule("feel_like_dying",    CRISIS_PASSIVE, r"\b(feel\s+like\s+(dying|i\s+am\s+dying))\b",                 0.74, "passive"),
+    SignalRule("wish_it_would_end",  CRISIS_PASSIVE, r"\b(wish\s+(everything|it\s+all)\s+would\s+end)\b",           0.72, "passive"),
+    SignalRule("nobody_cares",       CRISIS_PASSIVE, r"\b(nobody\s+(cares|would\s+miss\s+me))\b",                   0.62, "passive"),
+    SignalRule("burden",             CRISIS_PASSIVE, r"\b(burden\s+to\s+(everyone|others|my\s+family))\b",          0.64, "passive"),
+
+    # Distress — no hard floor, model + rule max
+    SignalRule("hopeless",           CRISIS_DISTRESS, r"\b(no\s+hope|hopeless|feel\s+empty)\b",             0.44, "distress"),
+    SignalRule("pain",               CRISIS_DISTRESS, r"\b(so\s+much\s+pain|can'?t\s+take\s+the\s+pain)\b", 0.46, "distress"),
+    SignalRule("giving_up",          CRISIS_DISTRESS, r"\b(feel\s+like\s+giving\s+up)\b",                   0.48, "distress"),
+    SignalRule("falling_apart",      CRISIS_DISTRESS, r"\b(falling\s+apart|breaking\s+down)\b",             0.40, "distress"),
+    SignalRule("completely_alone",   CRISIS_DISTRESS, r"\b(completely\s+(lost|alone|isolated))\b",          0.38, "distress"),
+
+    # Emotion keywords — weight is the base boost for the label
+    SignalRule("sadness",  EMOTION_KEYWORD, r"\b(sad|cry(ing)?|depress(ed|ing)?|grief|loss|heartbreak|empty|numb|lonely|disappear)\b", 0.46, "sadness"),
+    SignalRule("anxiety",  EMOTION_KEYWORD, r"\b(anxious|anxiety|worr(y|ied|ying)|nervous|panic(king)?|restless|racing\s+thoughts?)\b", 0.48, "anxiety"),
+    SignalRule("stress",   EMOTION_KEYWORD, r"\b(stress(ed|ful)?|overwhelm(ed|ing)?|exhaust(ed|ing)?|burnout|pressure|drained|too\s+much)\b", 0.46, "stress"),
+    SignalRule("fear",     EMOTION_KEYWORD, r"\b(afraid|scared|fear(ful)?|terrif(ied|ying)?|dread|unsafe)\b", 0.50, "fear"),
+    SignalRule("anger",    EMOTION_KEYWORD, r"\b(angry|anger|furious|rage|hate|frustrat(ed|ing)?|irritat(ed|ing)?)\b", 0.42, "anger"),
+
+    SignalRule("intensifier", EMOTION_INTENSIFIER,
+               r"\b(very|really|extremely|so|too|super|deeply|completely|totally|constantly)\b"),
+    SignalRule("negation",    EMOTION_NEGATION,
+               r"\b(not|never|hardly|barely|don't|cant|can't|isn't|wasn't)\b"),
+    SignalRule("hopeless",    EMOTION_HOPELESS,
+               r"\b(disappear|gone|dead|empty|numb|hopeless|pointless)\b"),
+
+    # MHI hopeless / disappearance language — each match deducts MHI points
+    SignalRule("hopeless", MATRIX_HOPELESS, (
+        r"\b("
+        # Direct death / disappearance wish
+        r"disappear|disappeared|"
+        r"wish\s+i\s+(was|were)\s+(gone|dead|never\s+born)|"
+        r"easier\s+if\s+i\s+(just\s+)?(was\s+gone|disappeared|wasn'?t\s+here|wasn'?t\s+alive)|"
+        r"better\s+off\s+(without\s+me|if\s+i\s+(was|were)\s+gone)|"
+        r"want\s+to\s+(die|end\s+it|disappear)|"
+        # Hopelessness
+        r"hopeless|no\s+hope|what'?s\s+the\s+point|nothing\s+matters|pointless|"
+        r"give\s+up|gave\s+up|can'?t\s+go\s+on|can'?t\s+do\s+this\s+anymore|"
+        r"no\s+reason\s+to\s+(live|go\s+on)|"
+        # Isolation / burden language
+        r"nobody\s+(cares|would\s+miss\s+me|loves\s+me)|"
+        r"(i'?m\s+a\s+)?burden\s+to\s+(everyone|others|my\s+family|them)|"
+        # Emptiness
+        r"feel\s+(completely\s+)?(empty|numb|hollow)|"
+        r"nothing\s+left\s+(for\s+me|to\s+live\s+for)"
+        r")\b"
+    ), 6.0),
+
+    # Behavioral risk dimensions
+    # Social withdrawal
+    SignalRule("isolation",        BEHAVIORAL, r"\b(isolat(e|ed|ing)|withdrew|withdrawn|avoid(ing)? (people|others|friends|family))\b", 0.75),
+    SignalRule("avoid_contact",    BEHAVIORAL, r"\b(don'?t want to (see|talk|meet)|stay(ing)? home|lock(ed)? myself)\b", 0.65),
+    # Activity avoidance
+    SignalRule("stopped_activity", BEHAVIORAL, r"\b(stopped (going|working|exercising|eating|sleeping)|can'?t (get up|function|do anything))\b", 0.70),
+    SignalRule("anhedonia",        BEHAVIORAL, r"\b(no (motivation|energy|interest)|lost interest|don'?t enjoy)\b", 0.60),
+    # Negative coping
+    SignalRule("substances",       BEHAVIORAL, r"\b(drink(ing)?|alcohol|smok(e|ing)|using drugs?|can'?t stop eating)\b", 0.65),
+    SignalRule("eating",           BEHAVIORAL, r"\b(binge|purge|starv(e|ing)|not eat(ing)?)\b", 0.70),
+    # Behavioral despair signals
+    SignalRule("despair",          BEHAVIORAL, r"\b(giv(e|ing) up|what'?s the point|nothing matters|pointless|hopeless)\b", 0.80),
+    SignalRule("sleep_focus",      BEHAVIORAL, r"\b(can'?t (sleep|focus|concentrate)|insomnia|nightmares)\b", 0.55),
+    # Self-neglect
+    SignalRule("self_neglect",     BEHAVIORAL, r"\b(don'?t (shower|eat|leave (bed|house))|stopped (caring|trying))\b", 0.70),
+]
+
+
+def _check_linear(rule: SignalRule) -> None:
+    """Rejects constructs that can backtrack super-linearly."""
+    repeats = {_sre.MAX_REPEAT, _sre.MIN_REPEAT}
+    if hasattr(_sre, "POSSESSIVE_REPEAT"):
+        repeats.add(_sre.POSSESSIVE_REPEAT)
+    forbidden = {_sre.GROUPREF, _sre.GROUPREF_EXISTS, _sre.ASSERT, _sre.ASSERT_NOT}
+
+    def has_unbounded(items) -> bool:
+        for op, av in items:
+            if op in repeats and (av[1] == _sre.MAXREPEAT or has_unbounded(av[2])):
+                return True
+            if op is _sre.SUBPATTERN and has_unbounded(av[3]):
+                return True
+            if op is _sre.BRANCH and any(has_unbounded(b) for b in av[1]):
+                return True
+        return False
+
+    def walk(items) -> None:
+        for op, av in items:
+            if op in forbidden:
+                raise ValueError(f"rule {rule.group}/{rule.name}: {op} is not allowed")
+            if op in repeats:
+                lo, hi, body = av
+                if has_unbounded(body) and hi != 1:
+                    raise ValueError(
+                        f"rule {rule.group}/{rule.name}: nested unbounded quantifier"
+                    )
+                walk(body)
+            elif op is _sre.SUBPATTERN:
+                walk(av[3])
+            elif op is _sre.BRANCH:
+                for branch in av[1]:
+                    walk(branch)
+
+    walk(_sre_parse.parse(rule.source))
+
+
+def _compile(source: str):
+    if re2 is not None:
+        try:
+            return re2.compile(source)
+        except Exception as exc:  # pragma: no cover - RE2 syntax gap
+            logger.warning("RE2 rejected %r (%s); using re", source, exc)
+    return re.compile(source)
+
+
+def normalize(text: str) -> str:
+    """Lowercase + collapse whitespace runs; the form every rule is matched against."""
+    return _WS_RE.sub(" ", text.lower()).strip()
+
+
+class SignalScan:
+    """All rule hits for one message, grouped for cheap lookups."""
+
+    __slots__ = ("text", "hits", "_by_group")
+
+    def __init__(self, text: str, hits: tuple[SignalHit, ...]):
+        self.text = text
+        self.hits = hits
+        self._by_group: dict[str, list[SignalHit]] = {}
+        for hit in hits:
+            self._by_group.setdefault(hit.group, []).append(hit)
+
+    def group(self, group: str) -> list[SignalHit]:
+        return self._by_group.get(group, [])
+
+    def first(self, group: str) -> SignalHit | None:
+        hits = self._by_group.get(group)
+        return hits[0] if hits else None
+
+    def has(self, group: str) -> bool:
+        return group in self._by_group
+
+    def count(self, group: str) -> int:
+        return sum(hit.count for hit in self._by_group.get(group, ()))
+
+
+class SignalEngine:
+
+    def __init__(self, rules: list[SignalRule]):
+        for rule in rules:
+            _check_linear(rule)
+        self.rules = rules
+        self._compiled = [(rule, _compile(rule.source)) for rule in rules]
+        self._memo: OrderedDict[str, SignalScan] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def weights(self, group: str) -> list[float]:
+        return [rule.weight for rule in self.rules if rule.group == group]
+
+    def scan(self, text: str) -> SignalScan:
+        """
+        Scans *text* once against every rule.
+        Recent results are memoized, so services that scan the same message
+        independently share one pass.
+        """
+        with self._lock:
+            cached = self._memo.get(text)
+            if cached is not None:
+                self._memo.move_to_end(text)
+                return cached
+
+        result = self.scan_uncached(text)
+
+        with self._lock:
+            self._memo[text] = result
+            if len(self._memo) > _MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return result
+
+    def scan_uncached(self, text: str) -> SignalScan:
+        normalized = normalize(text)
+        hits: list[SignalHit] = []
+        for rule, pattern in self._compiled:
+            count = sum(1 for _ in pattern.finditer(normalized))
+            if count:
+                hits.append(SignalHit(rule.name, rule.group, rule.weight, rule.label, count))
+        return SignalScan(normalized, tuple(hits))
+
+
+# Module-level singleton shared by every service
+signal_engine = SignalEngine(_RULES)
+
+
+def scan(text: str) -> SignalScan:
+    return signal_engine.scan(text)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Stage outcomes recorded in StageRun.timings
+OK       = "ok"
+SKIPPED  = "skipped"    # when() returned False; result is None
+TIMEOUT  = "timeout"    # exceeded its timeout; result comes from fallback()
+FALLBACK = "fallback"   # raised; result comes from fallback()
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One named step of a request pipeline.
+
+    fn(run) is awaited once every stage in ``needs`` has finished and reads
+    its inputs from ``run[name]`` (a dependency's result or a request input).
+    ``when(run)`` returning False skips the stage. On timeout or exception
+    ``fallback(run, exc)`` supplies the result; without one the error
+    propagates and fails the whole run.
+    """
+    name:     str
+    fn:       Callable[["StageRun"], Awaitable[Any]]
+    needs:    tuple[str, ...] = ()
+    timeout:  float | None = None
+    fallback: Callable[["StageRun", BaseException], Any] | None = None
+    when:     Callable[["StageRun"], bool] | None = None
+
+
+@dataclass
+class StageTiming:
+    start_ms:    float   # offset from the start of the run
+    duration_ms: float
+    status:      str
+
+
+@dataclass
+class StageRun:
+    """Inputs, per-stage results and timing breakdown of one graph execution."""
+    inputs:   dict[str, Any]
+    results:  dict[str, Any] = field(default_factory=dict)
+    timings:  dict[str, StageTiming] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self.results:
+            return self.results[name]
+        return self.inputs[name]
+
+    def _ordered(self) -> list[tuple[str, StageTiming]]:
+        return sorted(self.timings.items(), key=lambda item: item[1].start_ms)
+
+    def server_timing(self) -> str:
+        """Timing breakdown as a Server-Timing header value."""
+        parts = [
+            f'{name};dur={t.duration_ms:.1f}' + ("" if t.status == OK else f';desc="{t.status}"')
+            for name, t in self._ordered()
+        ]
+        parts.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> str:
+        return " ".join(
+            f"{name}={t.duration_ms:.0f}ms" + ("" if t.status == OK else f"({t.status})")
+            for name, t in self._ordered()
+        )
+
+
+class StageGraph:
+    """
+    Dependency-driven executor: every stage starts the moment its inputs
+    are ready, so independent stages (e.g. DB fetches and model inference)
+    overlap without hand-written gather() calls.
+    """
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("StageGraph: duplicate stage names")
+        self._check_acyclic()
+
+    def extend(self, stages: list[Stage]) -> "StageGraph":
+        """New graph with *stages* added after this one's."""
+        return StageGraph(list(self.stages.values()) + list(stages))
+
+    async def run(self, **inputs: Any) -> StageRun:
+        run = StageRun(inputs=inputs)
+        started = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def execute(stage: Stage) -> None:
+            for dep in stage.needs:
+                if dep in tasks:
+                    await tasks[dep]
+            run.results[stage.name] = await self._execute(stage, run, started)
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(execute(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            run.total_ms = (time.perf_counter() - started) * 1000
+        return run
+
+    # Internals
+
+    @staticmethod
+    async def _execute(stage: Stage, run: StageRun, run_started: float) -> Any:
+        began = time.perf_counter()
+        status = OK
+        try:
+            if stage.when is not None and not stage.when(run):
+                status = SKIPPED
+                return None
+            try:
+                if stage.timeout is None:
+                    return await stage.fn(run)
+                return await asyncio.wait_for(stage.fn(run), timeout=stage.timeout)
+            except asyncio.TimeoutError as exc:
+                if stage.fallback is None:
+                    raise
+                status = TIMEOUT
+                logger.warning("Stage %s timed out after %.1fs; using fallback", stage.name, stage.timeout)
+                return stage.fallback(run, exc)
+            except Exception as exc:
+                if stage.fallback is None:
+                    raise
+                status = FALLBACK
+                logger.error("Stage %s failed (%s); using fallback", stage.name, exc)
+                return stage.fallback(run, exc)
+        finally:
+            run.timings[stage.name] = StageTiming(
+                start_ms    = (began - run_started) * 1000,
+                duration_ms = (time.perf_counter() - began) * 1000,
+                status      = status,
+            )
+
+    def _check_acyclic(self) -> None:
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"StageGraph: cycle through stage {name!r}")
+            visiting.add(name)
+            for dep in self.stages[name].needs:
+                if dep in self.stages:
+                    visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
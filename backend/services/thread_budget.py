@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import asdict, dataclass
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+except ImportError:  # pragma: no cover - depends on local env
+    torch = None
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - depends on local env
+    faiss = None
+
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+except ImportError:  # pragma: no cover - depends on local env
+    threadpool_info = threadpool_limits = None
+
+
+def available_cpus() -> int:
+    """Cores this process may run on (respects taskset / cgroup cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        return os.cpu_count() or 1
+
+
+def parse_cpu_list(spec: str) -> tuple[int, ...]:
+    """ "0-3,6" -> (0, 1, 2, 3, 6) """
+    cpus: set[int] = set()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    return tuple(sorted(cpus))
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    """
+    Threads each inference library may use, sized so their pools together
+    fit the cores instead of each defaulting to all of them.
+
+    Classifier forward passes run INFERENCE_WORKERS at a time and Whisper
+    STT_WORKERS at a time, so each call gets its share of the cores rather
+    than a full set per call. FAISS searches one query per call and BLAS
+    only sees small matrices, so both default to a single thread.
+    """
+    cpus:                int
+    torch_intra:         int    # per forward pass (torch, sentence-transformers)
+    torch_interop:       int
+    onnx_intra:          int    # ONNX Runtime intra_op_num_threads per session
+    faiss:               int    # OpenMP threads per index.search
+    whisper:             int    # CTranslate2 cpu_threads per transcription
+    blas:                int    # numpy / OpenBLAS / MKL (via threadpoolctl)
+    tokenizers_parallel: bool   # HF fast-tokenizer rayon pool
+    affinity:            tuple[int, ...] = ()
+
+    @classmethod
+    def from_settings(cls) -> "ThreadBudget":
+        affinity = parse_cpu_list(settings.THREAD_AFFINITY) if settings.THREAD_AFFINITY else ()
+        cpus = settings.THREAD_BUDGET_CPUS or len(affinity) or available_cpus()
+        per_inference = max(1, cpus // max(1, settings.INFERENCE_WORKERS))
+        per_stt       = max(1, cpus // max(1, settings.STT_WORKERS))
+        return cls(
+            cpus                = cpus,
+            torch_intra         = settings.THREADS_TORCH or per_inference,
+            torch_interop       = 1,
+            onnx_intra          = settings.THREADS_TORCH or per_inference,
+            faiss               = max(1, settings.THREADS_FAISS),
+            whisper             = settings.THREADS_WHISPER or per_stt,
+            blas                = max(1, settings.THREADS_BLAS),
+            tokenizers_parallel = settings.TOKENIZERS_PARALLELISM,
+            affinity            = affinity,
+        )
+
+
+_budget: ThreadBudget | None = None
+_blas_limits = None   # threadpoolctl handle; kept alive so the limit stays in force
+
+
+def current() -> ThreadBudget:
+    """The budget in force (planned from settings until apply() runs)."""
+    return _budget or ThreadBudget.from_settings()
+
+
+def apply(budget: ThreadBudget | None = None) -> ThreadBudget:
+    """
+    Applies *budget* process-wide; call once at startup, before models load.
+    FAISS's OpenMP setting is per calling thread, so RAGService also sets it
+    on the executor thread that runs each search.
+    """
+    global _budget, _blas_limits
+    budget = budget or ThreadBudget.from_settings()
+
+    if budget.affinity:
+        try:
+            os.sched_setaffinity(0, budget.affinity)
+        except (AttributeError, OSError) as exc:
+            logger.warning("ThreadBudget | could not pin to cores %s: %s", budget.affinity, exc)
+
+    os.environ["TOKENIZERS_PARALLELISM"] = "true" if budget.tokenizers_parallel else "false"
+
+    if torch is not None:
+        torch.set_num_threads(budget.torch_intra)
+        try:
+            torch.set_num_interop_threads(budget.torch_interop)
+        except RuntimeError:
+            # Only settable before the first inter-op parallel work
+            logger.debug("ThreadBudget | torch inter-op threads already fixed")
+    if faiss is not None:
+        faiss.omp_set_num_threads(budget.faiss)
+    if threadpool_limits is not None:
+        _blas_limits = threadpool_limits(limits=budget.blas, user_api="blas")
+
+    _budget = budget
+    logger.info("ThreadBudget | %s", " ".join(f"{k}={v}" for k, v in asdict(budget).items()))
+    return budget
+
+
+def effective() -> dict:
+    """What the libraries report back, next to the budget (GET /health/threads)."""
+    libs: dict = {"tokenizers_parallelism": os.environ.get("TOKENIZERS_PARALLELISM")}
+    if torch is not None:
+        libs["torch_intra_op"] = torch.get_num_threads()
+        libs["torch_inter_op"] = torch.get_num_interop_threads()
+    if faiss is not None:
+        libs["faiss_omp_max_threads"] = faiss.omp_get_max_threads()
+    if threadpool_info is not None:
+        libs["native_pools"] = [
+            {"api": p["user_api"], "library": p["internal_api"], "threads": p["num_threads"]}
+            for p in threadpool_info()
+        ]
+    try:
+        affinity = sorted(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        affinity = []
+    return {
+        "applied":   _budget is not None,
+        "budget":    asdict(current()),
+        "affinity":  affinity,
+        "libraries": libs,
+    }
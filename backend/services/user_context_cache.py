@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UserContext:
+    """The per-user fields a /chat turn reads from ``users``, kept in process."""
+    phq2:      int = 0
+    gad2:      int = 0
+    profile:   dict = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+# loader(user_id) -> user document or None
+Loader = Callable[[Any], Awaitable[dict | None]]
+
+
+class UserContextCache:
+    """
+    Bounded LRU + TTL cache of per-user profile and screening totals.
+
+    A miss loads the user document once (concurrent lookups for the same
+    user share that load, counted as shared_loads); a hit costs no database
+    read. /assessment writes through with update_screening(), and the TTL
+    bounds staleness from writes made by other workers. Recent turns are
+    not cached: any worker may have written the last one, so they are read
+    from ``user_state`` every turn.
+    """
+
+    def __init__(self, loader: Loader, *, max_users: int = 10_000, ttl_seconds: float = 900.0):
+        self.loader    = loader
+        self.max_users = max(0, max_users)
+        self.ttl       = max(0.0, ttl_seconds)
+
+        self._entries: OrderedDict[Any, UserContext] = OrderedDict()
+        self._loading: dict[Any, asyncio.Future] = {}
+
+        # Metrics
+        self._hits      = 0
+        self._misses    = 0
+        self._shared    = 0   # lookups that joined a load already in flight
+        self._expired   = 0
+        self._evictions = 0
+
+    # Public API
+
+    async def get(self, user_id) -> UserContext:
+        ctx = self._entries.get(user_id)
+        if ctx is not None:
+            if not self.ttl or time.monotonic() - ctx.loaded_at <= self.ttl:
+                self._entries.move_to_end(user_id)
+                self._hits += 1
+                return ctx
+            del self._entries[user_id]
+            self._expired += 1
+
+        pending = self._loading.get(user_id)
+        if pending is None:
+            # The load runs as its own task: a caller timing out (stage
+            # fallback) must not cancel it for the other waiters
+            self._misses += 1
+            pending = asyncio.get_running_loop().create_task(self._load(user_id))
+            self._loading[user_id] = pending
+        else:
+            self._shared += 1
+        return await asyncio.shield(pending)
+
+    def update_screening(self, user_id, phq2: int, gad2: int) -> None:
+        """Write-through for /assessment; no-op when the user isn't cached."""
+        ctx = self._entries.get(user_id)
+        if ctx is not None:
+            ctx.phq2, ctx.gad2 = phq2, gad2
+
+    def invalidate(self, user_id=None) -> None:
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "users":        len(self._entries),
+            "max_users":    self.max_users,
+            "ttl_seconds":  self.ttl,
+            "hits":         self._hits,
+            "misses":       self._misses,
+            "shared_loads": self._shared,
+            "hit_rate":     round(self._hits / lookups, 4) if lookups else 0.0,
+            "expired":      self._expired,
+            "evictions":    self._evictions,
+        }
+
+    # Internals
+
+    async def _load(self, user_id) -> UserContext:
+        try:
+            ctx = self._from_document(await self.loader(user_id))
+            self._store(user_id, ctx)
+            return ctx
+        finally:
+            self._loading.pop(user_id, None)
+
+    @staticmethod
+    def _from_document(user_doc: dict | None) -> UserContext:
+        user_doc = user_doc or {}
+        return UserContext(
+            phq2    = int(user_doc.get("phq2_total", 0)),
+            gad2    = int(user_doc.get("gad2_total", 0)),
+            profile = {k: user_doc.get(k) for k in ("name", "email") if k in user_doc},
+        )
+
+    def _store(self, user_id, ctx: UserContext) -> None:
+        if not self.max_users:
+            return
+        self._entries[user_id] = ctx
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+            self._evictions += 1
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# The dashboard shows the last 7 turns; HistoryService needs the last 5
+_MIN_RECENT = 7
+
+# Turn fields kept in recent_turns (prompting, history score, dashboard sessions)
+_TURN_FIELDS = ("message", "response", "emotion_scores", "mhi", "category", "timestamp")
+
+
+def week_key(ts: datetime) -> str:
+    """ISO week bucket, e.g. "2026-W42"."""
+    year, week, _ = ts.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _dominant(emotion_scores: dict | None) -> str | None:
+    if not emotion_scores:
+        return None
+    return max(emotion_scores, key=emotion_scores.get)
+
+
+class UserStateService:
+    """
+    One compact, materialised state document per user in ``user_state``
+    (``_id`` = user id), updated atomically with every persisted turn:
+
+        recent_turns     last N turns, most recent first
+        recent_mhi       last N MHI values, most recent first
+        recent_emotions  last N dominant emotion labels, most recent first
+        count, mhi_sum, emotion_sums.<label>        lifetime aggregates
+        weekly.<YYYY-Www>.count / .mhi_sum          weekly buckets
+        last_mhi, last_category, updated_at
+
+    Reads are a single _id lookup no matter how long the history grows.
+    state_from_turns() builds the same document from ``conversations``;
+    rebuild_user_state.py runs it for every existing user.
+    """
+
+    def __init__(self, state_col: Any, conversations_col: Any = None, *, recent: int | None = None):
+        self.col           = state_col
+        self.conversations = conversations_col
+        self.recent        = max(recent or settings.USER_STATE_RECENT, _MIN_RECENT)
+
+    # Writes
+
+    async def record_turns(self, turns: list[dict]) -> None:
+        """
+        Folds a batch of already-inserted turns (write-behind flushes) into
+        their users' state: one ordered bulk_write, then a rebuild from
+        ``conversations`` for any user the batch found without a state
+        document (first turn, or history from before it existed).
+        """
+        if not turns:
+            return
+        ops = [UpdateOne({"_id": t["user_id"]}, self.turn_update(t)) for t in turns]
+        result = await self.col.bulk_write(ops, ordered=True)
+        if result.matched_count == len(ops):
+            return
+        await self.rebuild_missing({t["user_id"] for t in turns})
+
+    async def rebuild_missing(self, user_ids) -> None:
+        """Rebuilds the state of every user in *user_ids* that has none."""
+        user_ids = list(user_ids)
+        found = await self.col.find({"_id": {"$in": user_ids}}, {"_id": 1}).to_list(length=None)
+        existing = {d["_id"] for d in found}
+        for user_id in user_ids:
+            if user_id not in existing:
+                await self.rebuild(user_id)
+
+    async def rebuild(self, user_id: ObjectId) -> dict:
+        """
+        The user's state rebuilt from ``conversations``. A missing document
+        is inserted, and an existing one is replaced only if its ``count`` is
+        unchanged since it was read. When a concurrent turn wins either race,
+        the rebuild starts over, so updates folded in meanwhile are never
+        overwritten. A turn inserted into ``conversations`` but not yet folded
+        in while this runs is still counted twice.
+        """
+        while True:
+            current = await self.col.find_one({"_id": user_id}, {"count": 1})
+            cursor = self.conversations.find({"user_id": user_id}).sort("timestamp", 1)
+            turns = await cursor.to_list(length=None)
+            state = self.state_from_turns(user_id, turns)
+            if current is None:
+                try:
+                    await self.col.insert_one(state)
+                    break
+                except DuplicateKeyError:
+                    continue   # created meanwhile by another flush / worker
+            result = await self.col.replace_one({"_id": user_id, "count": current.get("count", 0)}, state)
+            if result.matched_count:
+                break
+        logger.info("UserStateService | rebuilt state for %s from %d turns", user_id, len(turns))
+        return state
+
+    async def revise_turn(self, user_id: ObjectId, old: dict, new: dict) -> None:
+        """
+        Replaces the mhi / emotion_scores / category of an already-recorded
+        turn (crisis fast lane: provisional analytics first, the full
+        analysis later). Aggregates move by the difference. The turn's
+        recent_* entries and last_* fields are rewritten only while the turn
+        is still where the read below found it.
+        """
+        # As stored: BSON dates have millisecond precision
+        ts = old["timestamp"].replace(microsecond=old["timestamp"].microsecond // 1000 * 1000)
+        old_mhi, new_mhi = int(old.get("mhi", 0)), int(new.get("mhi", 0))
+        old_emotions, new_emotions = old.get("emotion_scores") or {}, new.get("emotion_scores") or {}
+
+        inc = {"mhi_sum": new_mhi - old_mhi, f"weekly.{week_key(ts)}.mhi_sum": new_mhi - old_mhi}
+        for label in old_emotions.keys() | new_emotions.keys():
+            delta = float(new_emotions.get(label, 0.0)) - float(old_emotions.get(label, 0.0))
+            if delta:
+                inc[f"emotion_sums.{label}"] = delta
+        await self.col.update_one({"_id": user_id}, {"$inc": inc})
+
+        state = await self.col.find_one({"_id": user_id}, {"recent_turns.timestamp": 1})
+        recent = [t.get("timestamp") for t in (state or {}).get("recent_turns", [])]
+        if ts in recent:
+            i = recent.index(ts)
+            await self.col.update_one(
+                {"_id": user_id, f"recent_turns.{i}.timestamp": ts},
+                {"$set": {
+                    f"recent_turns.{i}.mhi":            new_mhi,
+                    f"recent_turns.{i}.emotion_scores": new_emotions,
+                    f"recent_turns.{i}.category":       new.get("category"),
+                    f"recent_mhi.{i}":                  new_mhi,
+                }},
+            )
+            old_dominant, new_dominant = _dominant(old_emotions), _dominant(new_emotions)
+            if old_dominant and new_dominant and old_dominant != new_dominant:
+                # Same index unless an older turn had no emotion scores
+                await self.col.update_one(
+                    {"_id": user_id, f"recent_emotions.{i}": old_dominant},
+                    {"$set": {f"recent_emotions.{i}": new_dominant}},
+                )
+        await self.col.update_one(
+            {"_id": user_id, "updated_at": ts},
+            {"$set": {"last_mhi": new_mhi, "last_category": new.get("category")}},
+        )
+
+    def turn_update(self, turn: dict) -> dict:
+        """The single atomic update that folds *turn* into the state document."""
+        ts       = turn.get("timestamp") or datetime.utcnow()
+        mhi      = int(turn.get("mhi", 0))
+        week     = week_key(ts)
+        emotions = turn.get("emotion_scores") or {}
+        dominant = _dominant(emotions)
+
+        newest_first = {"$position": 0, "$slice": self.recent}
+        push = {
+            "recent_turns": {"$each": [{k: turn[k] for k in _TURN_FIELDS if k in turn}], **newest_first},
+            "recent_mhi":   {"$each": [mhi], **newest_first},
+        }
+        if dominant is not None:
+            push["recent_emotions"] = {"$each": [dominant], **newest_first}
+
+        inc = {
+            "count":                 1,
+            "mhi_sum":               mhi,
+            f"weekly.{week}.count":   1,
+            f"weekly.{week}.mhi_sum": mhi,
+        }
+        for label, value in emotions.items():
+            inc[f"emotion_sums.{label}"] = float(value)
+
+        return {
+            "$push": push,
+            "$inc":  inc,
+            "$set":  {
+                "last_mhi":      mhi,
+                "last_category": turn.get("category"),
+                "updated_at":    ts,
+            },
+        }
+
+    # Reads
+
+    async def get(self, user_id: ObjectId) -> dict | None:
+        return await self.col.find_one({"_id": user_id})
+
+    # Rebuild
+
+    def state_from_turns(self, user_id: ObjectId, turns: list[dict]) -> dict:
+        """
+        Full state document from a user's turns in chronological order;
+        equivalent to applying turn_update() to each turn in sequence.
+        """
+        state: dict = {
+            "_id": user_id, "recent_turns": [], "recent_mhi": [], "recent_emotions": [],
+            "count": 0, "mhi_sum": 0, "emotion_sums": {}, "weekly": {},
+            "last_mhi": None, "last_category": None, "updated_at": None,
+        }
+        for turn in turns:
+            ts       = turn.get("timestamp") or datetime.utcnow()
+            mhi      = int(turn.get("mhi", 0))
+            emotions = turn.get("emotion_scores") or {}
+            dominant = _dominant(emotions)
+
+            state["recent_turns"].insert(0, {k: turn[k] for k in _TURN_FIELDS if k in turn})
+            state["recent_mhi"].insert(0, mhi)
+            if dominant is not None:
+                state["recent_emotions"].insert(0, dominant)
+            for key in ("recent_turns", "recent_mhi", "recent_emotions"):
+                del state[key][self.recent:]
+
+            state["count"]   += 1
+            state["mhi_sum"] += mhi
+            bucket = state["weekly"].setdefault(week_key(ts), {"count": 0, "mhi_sum": 0})
+            bucket["count"]   += 1
+            bucket["mhi_sum"] += mhi
+            for label, value in emotions.items():
+                state["emotion_sums"][label] = state["emotion_sums"].get(label, 0.0) + float(value)
+
+            state["last_mhi"]      = mhi
+            state["last_category"] = turn.get("category")
+            state["updated_at"]    = ts
+        return state
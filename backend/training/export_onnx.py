@@ -0,0 +1,117 @@
+"""
+Exports the fine-tuned emotion / crisis checkpoints to ONNX (fp32 + int8)
+and checks every inference backend against the PyTorch fp32 output.
+
+Run from the project root:
+    python -m backend.training.export_onnx                  # export + parity check
+    python -m backend.training.export_onnx --check-only     # parity check only
+    python -m backend.training.export_onnx --models crisis  # one model
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+
+from backend.config import settings
+from backend.services.inference_backend import (
+    BACKENDS,
+    load_classifier,
+    onnx_path,
+)
+
+MODEL_DIRS = {
+    "emotion": settings.EMOTION_MODEL_PATH,
+    "crisis":  settings.CRISIS_MODEL_PATH,
+}
+
+# Probe sentences for the parity check — spans every crisis tier and emotion
+PROBE_TEXTS = [
+    "hi",
+    "I feel stressed about my exams",
+    "I'm so anxious I can't sleep, what if I fail?",
+    "I've been crying all day and I feel empty",
+    "I am furious at my manager, he never listens",
+    "I'm scared to go outside alone at night",
+    "Everything is fine, just checking in",
+    "I feel like giving up, nothing matters anymore",
+    "Sometimes I wish I was dead",
+    "I want to kill myself tonight",
+    "I don't want to wake up tomorrow",
+    "work has been a lot lately but I'm managing",
+]
+
+
+def export(model_dir: str) -> None:
+    out_fp32 = onnx_path(model_dir)
+    out_int8 = onnx_path(model_dir, quantized=True)
+    out_fp32.parent.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = DistilBertTokenizerFast.from_pretrained(model_dir)
+    model = DistilBertForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+    model.config.return_dict = False
+
+    sample = tokenizer(PROBE_TEXTS[:2], return_tensors="pt", padding=True)
+    print(f"Exporting {model_dir} -> {out_fp32}")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        str(out_fp32),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids":      {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits":         {0: "batch"},
+        },
+        opset_version=17,
+    )
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    print(f"Quantizing -> {out_int8}")
+    quantize_dynamic(str(out_fp32), str(out_int8), weight_type=QuantType.QInt8)
+
+
+def parity(model_dir: str) -> None:
+    reference = load_classifier(model_dir, "torch")
+    ref_probs = reference.predict_proba(PROBE_TEXTS)
+
+    print(f"\nParity vs torch fp32 — {model_dir}")
+    print(f"{'backend':<12} {'max drift':>10} {'argmax agree':>13} {'ms/batch':>10}")
+    for backend in BACKENDS:
+        clf = load_classifier(model_dir, backend)
+        if clf.backend != backend:
+            print(f"{backend:<12} {'unavailable':>10}")
+            continue
+        clf.predict_proba(PROBE_TEXTS)   # warm-up
+        started = time.perf_counter()
+        probs = clf.predict_proba(PROBE_TEXTS)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        drift = float(np.max(np.abs(probs - ref_probs)))
+        agree = float(np.mean(probs.argmax(axis=1) == ref_probs.argmax(axis=1)))
+        print(f"{backend:<12} {drift:>10.5f} {agree:>12.0%} {elapsed_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", nargs="+", choices=sorted(MODEL_DIRS), default=sorted(MODEL_DIRS))
+    parser.add_argument("--check-only", action="store_true", help="skip export, run parity check")
+    args = parser.parse_args()
+
+    for name in args.models:
+        model_dir = MODEL_DIRS[name]
+        if not Path(model_dir).exists():
+            print(f"Skipping {name}: {model_dir} not found")
+            continue
+        if not args.check_only:
+            export(model_dir)
+        parity(model_dir)
+
+
+if __name__ == "__main__":
+    main()
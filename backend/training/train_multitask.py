@@ -0,0 +1,150 @@
+"""
+Jointly trains one DistilBERT encoder with an emotion head and a crisis head
+from the existing emotion / crisis CSVs.
+
+Run from the project root:
+    python -m backend.training.train_multitask
+
+Then point the API at it:
+    MULTITASK_MODEL_PATH=backend/models/multitask
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.metrics import recall_score
+from sklearn.model_selection import train_test_split
+from torch.utils.data import Dataset
+from transformers import DistilBertModel, DistilBertTokenizerFast, Trainer, TrainingArguments
+
+from backend.services.multitask_model import DistilBertMultiTask
+
+_BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+BASE_MODEL   = "distilbert-base-uncased"
+EMOTION_CSV  = _BACKEND_DIR / "data" / "emotion_train.csv"
+CRISIS_CSV   = _BACKEND_DIR / "data" / "crisis_train.csv"
+OUTPUT_DIR   = _BACKEND_DIR / "models" / "multitask"
+
+EMOTION_LABELS = ["stress", "anxiety", "sadness", "anger", "fear", "neutral"]
+CRISIS_LABELS  = ["safe", "crisis"]   # index 1 = crisis, as in train_crisis.py
+EMOTION_POS_WEIGHT = [8.4, 46.8, 21.0, 8.0, 65.9, 2.8]   # same as train_emotion.py
+
+
+class MultiTaskDataset(Dataset):
+    """
+    Rows from both CSVs in one dataset. Each row only carries a label for
+    the task it came from; the other task is masked out of the loss.
+    """
+
+    def __init__(self, rows, tokenizer, max_len=128):
+        self.rows = rows
+        self.tokenizer = tokenizer
+        self.max_len = max_len
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, idx):
+        text, emotion, crisis = self.rows[idx]
+        enc = self.tokenizer(
+            text,
+            truncation=True,
+            padding="max_length",
+            max_length=self.max_len,
+            return_tensors="pt",
+        )
+        item = {k: v.squeeze(0) for k, v in enc.items() if k in ("input_ids", "attention_mask")}
+        item["emotion_labels"] = torch.tensor(emotion or [0] * len(EMOTION_LABELS), dtype=torch.float)
+        item["emotion_mask"]   = torch.tensor(1.0 if emotion is not None else 0.0)
+        item["crisis_labels"]  = torch.tensor(crisis if crisis is not None else -100, dtype=torch.long)
+        return item
+
+
+def load_data():
+    emo = pd.read_csv(EMOTION_CSV)
+    emo_rows = [
+        (str(text), [int(v) for v in labels], None)
+        for text, labels in zip(emo["text"], emo[EMOTION_LABELS].values.tolist())
+    ]
+
+    cri = pd.read_csv(CRISIS_CSV).dropna(subset=["label"])
+    cri_rows = [(str(text), None, int(label)) for text, label in zip(cri["text"], cri["label"])]
+
+    emo_train, emo_val = train_test_split(emo_rows, test_size=0.1, random_state=42)
+    cri_train, cri_val = train_test_split(
+        cri_rows, test_size=0.1, random_state=42, stratify=[r[2] for r in cri_rows],
+    )
+    return emo_train + cri_train, emo_val + cri_val
+
+
+class MultiTaskTrainer(Trainer):
+    def __init__(self, pos_weight, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pos_weight = pos_weight
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        outputs = model(**inputs, emotion_pos_weight=self.pos_weight.to(inputs["input_ids"].device))
+        return (outputs["loss"], outputs) if return_outputs else outputs["loss"]
+
+
+def compute_metrics(eval_pred):
+    (emotion_logits, crisis_logits), (emotion_labels, crisis_labels) = eval_pred
+    metrics = {}
+
+    crisis_rows = crisis_labels != -100
+    if crisis_rows.any():
+        preds = np.argmax(crisis_logits[crisis_rows], axis=1)
+        metrics["crisis_recall"] = recall_score(crisis_labels[crisis_rows], preds, zero_division=0)
+
+    emotion_rows = emotion_labels.sum(axis=1) > 0
+    if emotion_rows.any():
+        preds = np.argmax(emotion_logits[emotion_rows], axis=1)
+        gold = np.argmax(emotion_labels[emotion_rows], axis=1)
+        metrics["emotion_top1"] = float(np.mean(preds == gold))
+    return metrics
+
+
+def main():
+    tokenizer = DistilBertTokenizerFast.from_pretrained(BASE_MODEL)
+    model = DistilBertMultiTask(
+        DistilBertModel.from_pretrained(BASE_MODEL),
+        {"emotion": EMOTION_LABELS, "crisis": CRISIS_LABELS},
+    )
+
+    train_rows, val_rows = load_data()
+    train_ds = MultiTaskDataset(train_rows, tokenizer)
+    val_ds = MultiTaskDataset(val_rows, tokenizer)
+
+    args = TrainingArguments(
+        output_dir=str(OUTPUT_DIR / "checkpoints"),
+        evaluation_strategy="epoch",
+        save_strategy="no",
+        learning_rate=2e-5,
+        per_device_train_batch_size=32,
+        per_device_eval_batch_size=32,
+        num_train_epochs=4,
+        weight_decay=0.01,
+        label_names=["emotion_labels", "crisis_labels"],
+        logging_steps=50,
+    )
+
+    trainer = MultiTaskTrainer(
+        pos_weight=torch.tensor(EMOTION_POS_WEIGHT),
+        model=model,
+        args=args,
+        train_dataset=train_ds,
+        eval_dataset=val_ds,
+        compute_metrics=compute_metrics,
+    )
+
+    trainer.train()
+
+    model.save(OUTPUT_DIR)
+    tokenizer.save_pretrained(OUTPUT_DIR)
+    print(f"Saved multi-task model to {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
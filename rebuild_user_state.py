@@ -0,0 +1,52 @@
+"""
+Builds the materialised user_state document for every user (or one user)
+from the conversations collection. Each document is replaced wholesale
+with the state derived from the user's full history, so re-running it is
+safe once writes have stopped.
+
+Run it with the API stopped (or with no /chat traffic and the write-behind
+queue drained). UserStateService.rebuild() never overwrites a turn folded in
+while it runs, but a turn saved between reading ``conversations`` and its own
+user_state update can still be counted twice.
+
+    python rebuild_user_state.py
+    python rebuild_user_state.py --user 64f0c2...e1
+"""
+import argparse
+import asyncio
+import inspect
+
+from bson import ObjectId
+
+from backend.database.mongo_client import db
+from backend.services.user_state_service import UserStateService
+
+
+async def run(user: str | None) -> None:
+    if user:
+        user_ids = [ObjectId(user)]
+    else:
+        user_ids = db.db.conversations.distinct("user_id")   # awaitable with motor, a list with pymongo
+        if inspect.isawaitable(user_ids):
+            user_ids = await user_ids
+    service = UserStateService(db.user_state, db.conversations)
+
+    print(f"Rebuilding user_state for {len(user_ids)} user(s)...")
+    total = 0
+    for user_id in user_ids:
+        total += (await service.rebuild(user_id))["count"]
+    print(f"Done: {len(user_ids)} user(s), {total} turn(s) replayed.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="rebuild a single user (ObjectId)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.user))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()